@@ -8,8 +8,11 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-import pickle
 from sklearn.preprocessing import StandardScaler, LabelEncoder
+from eda_plots import DENSITY_THRESHOLD, categorical_columns, draw_density
+from eda_stats import summarize_numeric
+from housing_data import load_housing_data, yes_no_labels
+from prediction import FeatureEncoder, PredictionCache, artifact_version, load_predictor, sensitivity_grid
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -631,28 +634,44 @@ st.markdown("""
 # Load data and models
 @st.cache_data
 def load_data():
-    """Load the housing dataset"""
-    return pd.read_csv('Housing.csv')
+    """Load the housing dataset with compact dtypes (from the columnar cache when it is up to date)"""
+    return load_housing_data('Housing.csv')
 
-@st.cache_resource
-def load_model():
-    """Load the trained model and preprocessing objects"""
+@st.cache_data
+def load_numeric_summary():
+    """Moments, quantiles and IQR outlier counts of the numeric columns (one sort per column)"""
+    return summarize_numeric(load_data())
+
+@st.cache_resource(max_entries=1)
+def load_model(model_version):
+    """Load the trained model and preprocessing objects (reloaded when model_version changes)"""
     try:
-        with open('model.pkl', 'rb') as f:
-            model = pickle.load(f)
-        with open('scaler.pkl', 'rb') as f:
-            scaler = pickle.load(f)
-        with open('label_encoders.pkl', 'rb') as f:
-            label_encoders = pickle.load(f)
-        with open('feature_names.pkl', 'rb') as f:
-            feature_names = pickle.load(f)
-        return model, scaler, label_encoders, feature_names
+        predictor, label_encoders, feature_names = load_predictor()
+        return FeatureEncoder(label_encoders, feature_names), predictor
     except FileNotFoundError:
-        return None, None, None, None
+        return None, None
+
+PREDICTION_CACHE_SIZE = 4096
+
+@st.cache_resource(max_entries=1)
+def get_prediction_cache(model_version):
+    """Shared LRU cache of predictions, replaced whenever the model is retrained"""
+    return PredictionCache(maxsize=PREDICTION_CACHE_SIZE, model_version=model_version)
+
+WHAT_IF_AREA_STEPS = 50
+WHAT_IF_BEDROOMS = [1, 2, 3, 4, 5, 6]
+WHAT_IF_BATHROOMS = [1, 2, 3, 4]
+
+@st.cache_data(max_entries=256)
+def compute_what_if_grid(model_version, input_items, vary, areas, counts, _predictor, _feature_encoder):
+    """Price grid over areas x counts of `vary` around one property, cached per base input"""
+    return sensitivity_grid(_predictor, _feature_encoder, dict(input_items), areas, counts, vary=vary)
 
 # Load data
 df = load_data()
-model, scaler, label_encoders, feature_names = load_model()
+model_version = artifact_version()
+feature_encoder, predictor = load_model(model_version)
+prediction_cache = get_prediction_cache(model_version)
 
 # ============================================================================
 # PAGE SELECTION (Using URL hash or session state)
@@ -1376,7 +1395,7 @@ elif current_page == "Data Analysis":
     col1.metric("Total Records", f"{df.shape[0]:,}")
     col2.metric("Features", len(df.columns))
     col3.metric("Numerical", len(df.select_dtypes(include=[np.number]).columns))
-    col4.metric("Categorical", len(df.select_dtypes(include=['object']).columns))
+    col4.metric("Categorical", len(categorical_columns(df)))
     
     # Summary Statistics
     st.markdown("""
@@ -1387,7 +1406,8 @@ elif current_page == "Data Analysis":
     st.markdown("""
         <div class="premium-card fade-in">
     """, unsafe_allow_html=True)
-    st.dataframe(df.describe().style.background_gradient(cmap='viridis'), use_container_width=True)
+    st.dataframe(load_numeric_summary().to_frame().style.background_gradient(cmap='viridis')
+                 .format('{:,.2f}'), use_container_width=True)
     st.markdown("</div>", unsafe_allow_html=True)
     
     # Price Distribution
@@ -1452,12 +1472,18 @@ elif current_page == "Data Analysis":
         feature2 = st.selectbox("Y-axis Feature", numerical_cols, key='y_feature', index=0)
     
     fig, ax = plt.subplots(figsize=(12, 6))
-    scatter = ax.scatter(df[feature1], df[feature2], c=df['price'], cmap='viridis', 
-                        alpha=0.7, s=60, edgecolors='white', linewidth=0.5)
+    if len(df) > DENSITY_THRESHOLD:
+        # Too many rows for one marker each: colour a grid of cells by their mean price
+        scatter = draw_density(ax, df[feature1], df[feature2], values=df['price'])
+        price_label = 'Mean Price per Cell (PKR)'
+    else:
+        scatter = ax.scatter(df[feature1], df[feature2], c=df['price'], cmap='viridis', 
+                            alpha=0.7, s=60, edgecolors='white', linewidth=0.5)
+        price_label = 'Price (PKR)'
     ax.set_xlabel(feature1, fontsize=13, fontweight=600)
     ax.set_ylabel(feature2, fontsize=13, fontweight=600)
     ax.set_title(f'{feature2} vs {feature1} (Color = Price)', fontsize=15, fontweight=700, pad=20)
-    plt.colorbar(scatter, ax=ax, label='Price (PKR)')
+    plt.colorbar(scatter, ax=ax, label=price_label)
     ax.grid(alpha=0.2, linestyle='--')
     ax.set_facecolor('#f5f5f5')
     st.pyplot(fig)
@@ -1470,7 +1496,7 @@ elif current_page == "Data Analysis":
             <h2 class="section-header">Categorical Feature Analysis</h2>
         </div>
     """, unsafe_allow_html=True)
-    categorical_cols = df.select_dtypes(include=['object']).columns
+    categorical_cols = categorical_columns(df)
     selected_cat = st.selectbox("Select Categorical Feature", categorical_cols, key='cat_feature')
     
     col1, col2 = st.columns(2)
@@ -1479,7 +1505,7 @@ elif current_page == "Data Analysis":
         st.markdown("""
             <div class="premium-card fade-in">
         """, unsafe_allow_html=True)
-        value_counts = df[selected_cat].value_counts()
+        value_counts = yes_no_labels(df[selected_cat]).value_counts()
         fig, ax = plt.subplots(figsize=(10, 6))
         colors = ['#1abc9c', '#2c3e50', '#f1c40f', '#e67e22', '#3498db']
         bars = ax.bar(value_counts.index, value_counts.values, 
@@ -1502,7 +1528,7 @@ elif current_page == "Data Analysis":
         st.markdown("""
             <div class="premium-card fade-in">
         """, unsafe_allow_html=True)
-        price_by_cat = df.groupby(selected_cat)['price'].mean().sort_values(ascending=False)
+        price_by_cat = df.groupby(yes_no_labels(df[selected_cat]))['price'].mean().sort_values(ascending=False)
         fig, ax = plt.subplots(figsize=(10, 6))
         colors = ['#1abc9c', '#2c3e50', '#f1c40f', '#e67e22', '#3498db']
         bars = ax.bar(price_by_cat.index, price_by_cat.values, 
@@ -1532,7 +1558,7 @@ elif current_page == "Model Performance":
         </div>
     """, unsafe_allow_html=True)
     
-    if model is None:
+    if predictor is None:
         st.error("Model files not found. Please run 'housing_analysis.py' first to train the models.")
         st.info("To train the models, run: `python housing_analysis.py`")
     else:
@@ -1548,13 +1574,24 @@ elif current_page == "Model Performance":
                 <div class="premium-card fade-in">
             """, unsafe_allow_html=True)
             
-            styled_df = results_df.style.format({
+            column_formats = {
                 'Train_RMSE': '{:,.2f}',
                 'Test_RMSE': '{:,.2f}',
                 'Train_R2': '{:.4f}',
                 'Test_R2': '{:.4f}',
                 'Train_MAE': '{:,.2f}',
-                'Test_MAE': '{:,.2f}'
+                'Test_MAE': '{:,.2f}',
+                'Fit_Time_s': '{:.3f}',
+                'Predict_Latency_ms': '{:.3f}',
+                'Artifact_KB': '{:,.1f}',
+                'Total_Wall_Time_s': '{:.3f}',
+                'CV_R2_Mean': '{:.4f}',
+                'CV_R2_Std': '{:.4f}',
+                'CV_Selection_Score': '{:.4f}'
+            }
+            # Older model_results.csv files lack the timing columns
+            styled_df = results_df.style.format({
+                col: fmt for col, fmt in column_formats.items() if col in results_df.columns
             }).background_gradient(subset=['Test_R2'], cmap='Greens')
             
             st.dataframe(styled_df, use_container_width=True, height=200)
@@ -1633,8 +1670,18 @@ elif current_page == "Model Performance":
                 plt.close()
                 st.markdown("</div>", unsafe_allow_html=True)
             
-            # Best Model
-            best_model_idx = results_df['Test_R2'].idxmax()
+            # Best Model: the one housing_analysis.py deployed (best CV mean minus one std);
+            # result files written before cross-validation only have the test split
+            if 'CV_Selection_Score' in results_df.columns:
+                best_model_idx = results_df['CV_Selection_Score'].idxmax()
+                selection_text = (f"Selected by repeated k-fold cross-validation: highest mean validation R² minus one "
+                                  f"standard deviation ({results_df.loc[best_model_idx, 'CV_R2_Mean']:.4f} ± "
+                                  f"{results_df.loc[best_model_idx, 'CV_R2_Std']:.4f}), so it is accurate and "
+                                  f"consistent across folds.")
+            else:
+                best_model_idx = results_df['Test_R2'].idxmax()
+                selection_text = ("Selected as the best model based on highest Test R² score, "
+                                  "indicating superior predictive performance.")
             best_model_name = results_df.loc[best_model_idx, 'Model']
             
             st.markdown("""
@@ -1648,7 +1695,7 @@ elif current_page == "Model Performance":
                     {best_model_name}
                     </h3>
                     <p style='color: #7f8c8d; font-size: 1rem; line-height: 1.8; margin-bottom: 0;'>
-                    Selected as the best model based on highest Test R² score, indicating superior predictive performance.
+                    {selection_text}
                     </p>
                 </div>
             """, unsafe_allow_html=True)
@@ -1677,7 +1724,7 @@ elif current_page == "Price Prediction":
         </div>
     """, unsafe_allow_html=True)
     
-    if model is None:
+    if predictor is None:
         st.error("Model not found. Please run 'housing_analysis.py' first to train the model.")
         st.info("To train the model, run: `python housing_analysis.py`")
     else:
@@ -1752,38 +1799,17 @@ elif current_page == "Price Prediction":
                         'furnishingstatus': furnishingstatus
                     }
                     
-                    # Create DataFrame
-                    input_df = pd.DataFrame([input_data])
+                    # Encode straight into a feature row (training column order), then scale and
+                    # predict with the interval in the same pass; repeated inputs come from the cache
+                    prediction, lower_bound, upper_bound = prediction_cache.get_or_compute(
+                        input_data,
+                        lambda record: tuple(float(v[0]) for v in predictor.predict_interval(
+                            feature_encoder.transform_row(record))))
                     
-                    # Encode categorical variables
-                    for col in ['mainroad', 'guestroom', 'basement', 'hotwaterheating', 'airconditioning', 'prefarea']:
-                        if col in label_encoders:
-                            input_df[col] = label_encoders[col].transform([input_data[col]])[0]
-                    
-                    # One-hot encode furnishing status
-                    furnishing_dummies = pd.get_dummies(pd.DataFrame([{'furnishingstatus': furnishingstatus}]), 
-                                                       columns=['furnishingstatus'], 
-                                                       prefix='furnishing', 
-                                                       drop_first=True)
-                    input_df = pd.concat([input_df.drop('furnishingstatus', axis=1), furnishing_dummies], axis=1)
-                    
-                    # Ensure all feature columns are present
-                    for col in feature_names:
-                        if col not in input_df.columns:
-                            input_df[col] = 0
-                    
-                    # Reorder columns to match training data
-                    input_df = input_df[feature_names]
-                    
-                    # Scale features
-                    input_scaled = scaler.transform(input_df)
-                    
-                    # Make prediction
-                    prediction = model.predict(input_scaled)[0]
-                    
-                    # Calculate prediction range
-                    lower_bound = prediction * 0.9
-                    upper_bound = prediction * 1.1
+                    if np.isfinite(lower_bound):
+                        range_text = f"Estimated Range: PKR {lower_bound:,.0f} - PKR {upper_bound:,.0f}"
+                    else:
+                        range_text = "Estimated range unavailable: retrain with housing_analysis.py to calibrate it"
                 
                 # Display result
                 st.markdown("""
@@ -1794,10 +1820,13 @@ elif current_page == "Price Prediction":
                         <p class="prediction-label">Predicted House Price</p>
                         <h1 class="prediction-price">PKR {prediction:,.0f}</h1>
                         <p style='color: rgba(255,255,255,0.9); font-size: 1rem; margin-top: 1rem; position: relative; z-index: 1;'>
-                        Estimated Range: PKR {lower_bound:,.0f} - PKR {upper_bound:,.0f}
+                        {range_text}
                         </p>
                     </div>
                 """, unsafe_allow_html=True)
+                cache_stats = prediction_cache.stats()
+                st.caption(f"Prediction cache: {cache_stats['hits']:,} hits · {cache_stats['misses']:,} misses · "
+                           f"{cache_stats['size']:,}/{cache_stats['maxsize']:,} entries · model {cache_stats['model_version']}")
                 st.markdown("</div>", unsafe_allow_html=True)
                 
                 # Property Summary
@@ -1861,6 +1890,43 @@ elif current_page == "Price Prediction":
                                 delta=f"{price_diff_pct:.1f}% below average", delta_color="inverse")
                 st.markdown("</div>", unsafe_allow_html=True)
                 
+                # What-if sensitivity grid: every cell scored in one predict call
+                st.markdown("### What-If Analysis")
+                grid_areas = np.linspace(max(area, 100) * 0.5, max(area, 100) * 1.5, WHAT_IF_AREA_STEPS).round()
+                grid_tabs = st.tabs(["Area × Bedrooms", "Area × Bathrooms"])
+                for tab, vary, counts, current in zip(grid_tabs, ['bedrooms', 'bathrooms'],
+                                                      [WHAT_IF_BEDROOMS, WHAT_IF_BATHROOMS],
+                                                      [bedrooms, bathrooms]):
+                    with tab:
+                        grid = compute_what_if_grid(model_version, tuple(input_data.items()), vary,
+                                                    tuple(grid_areas), tuple(counts),
+                                                    _predictor=predictor, _feature_encoder=feature_encoder)
+                        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 5.5), gridspec_kw={'width_ratios': [3, 2]})
+                        image = ax1.imshow(grid / 1e6, aspect='auto', origin='lower', cmap='viridis',
+                                           extent=[grid_areas[0], grid_areas[-1], counts[0] - 0.5, counts[-1] + 0.5])
+                        ax1.scatter([area], [current], marker='*', s=250, color='#e67e22', edgecolors='white',
+                                    label='Your property', zorder=3)
+                        ax1.set_xlabel('Area (sq ft)', fontsize=12, fontweight=600)
+                        ax1.set_ylabel(vary.title(), fontsize=12, fontweight=600)
+                        ax1.set_yticks(counts)
+                        ax1.set_title(f'Predicted Price by Area and {vary.title()}', fontsize=14, fontweight=700, pad=15)
+                        ax1.legend(fontsize=10, frameon=True, fancybox=True, shadow=True, loc='upper left')
+                        plt.colorbar(image, ax=ax1, label='Predicted Price (PKR millions)')
+                        colors = plt.cm.viridis(np.linspace(0, 0.9, len(counts)))
+                        for count, row, color in zip(counts, grid, colors):
+                            ax2.plot(grid_areas, row / 1e6, color=color, linewidth=3 if count == current else 1.5,
+                                     label=f'{count} {vary}')
+                        ax2.axvline(area, color='#e67e22', linestyle='--', linewidth=2)
+                        ax2.set_xlabel('Area (sq ft)', fontsize=12, fontweight=600)
+                        ax2.set_ylabel('Predicted Price (PKR millions)', fontsize=12, fontweight=600)
+                        ax2.set_title('Price Curves', fontsize=14, fontweight=700, pad=15)
+                        ax2.legend(fontsize=9, frameon=True, fancybox=True, shadow=True)
+                        ax2.grid(alpha=0.2, linestyle='--')
+                        ax2.set_facecolor('#f5f5f5')
+                        plt.tight_layout()
+                        st.pyplot(fig)
+                        plt.close()
+                
             except Exception as e:
                 st.error(f"Error making prediction: {str(e)}")
                 st.info("Please ensure all fields are filled correctly and try again.")
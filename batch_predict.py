@@ -0,0 +1,265 @@
+"""
+Housing Price Prediction - Batch Scoring
+Scores whole CSV files of properties with the trained model, streaming the input in chunks.
+
+Usage:
+    python batch_predict.py listings.csv predictions.csv --chunk-size 50000
+
+    # very large files: split by byte range across 8 worker processes
+    python batch_predict.py listings.csv predictions.csv --workers 8
+
+    # report scaling efficiency for 1, 2, 4, ... 8 workers
+    python batch_predict.py listings.csv predictions.csv --workers 8 --scaling
+"""
+
+import argparse
+import io
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+from prediction import EXPORTABLE_PREDICTORS, INPUT_COLS, FeatureEncoder, load_predictor, predict_frame
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB (None if unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def peak_child_rss_mb():
+    """Return the peak RSS of the largest finished worker process in MB (None if unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def score_file(input_path, output_path, artifacts, chunk_size=50000):
+    """Score input_path chunk by chunk and write rows plus predicted_price and its interval
+    bounds (price_lower, price_upper) to output_path.
+
+    artifacts is (predictor, label_encoders, feature_names) as returned by load_predictor.
+    """
+    predictor, label_encoders, feature_names = artifacts
+    encoder = FeatureEncoder(label_encoders, feature_names)
+    rows = 0
+    start = time.perf_counter()
+    reader = pd.read_csv(input_path, chunksize=chunk_size)
+    for chunk_idx, chunk in enumerate(reader):
+        missing = [col for col in INPUT_COLS if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"Input is missing required columns: {missing}")
+        chunk['predicted_price'], chunk['price_lower'], chunk['price_upper'] = predict_frame(chunk, predictor, encoder)
+        chunk.to_csv(output_path, mode='w' if chunk_idx == 0 else 'a', header=chunk_idx == 0, index=False)
+        rows += len(chunk)
+    return rows, time.perf_counter() - start
+
+
+# ============================================================================
+# PARALLEL SCORING (byte ranges + shared-memory model)
+# ============================================================================
+
+def share_arrays(arrays):
+    """Copy named arrays into one shared-memory block; return the block and its layout"""
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        layout[name] = (offset, array.dtype.str, array.shape)
+        offset += -(-array.nbytes // 64) * 64  # keep every array 64-byte aligned
+    block = SharedMemory(create=True, size=max(offset, 1))
+    for name, array in arrays.items():
+        start, dtype, shape = layout[name]
+        np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)[...] = array
+    return block, layout
+
+
+def attach_arrays(block_name, layout):
+    """Map a shared-memory block created by share_arrays() as read-only NumPy views"""
+    # Workers share the parent's resource tracker; only the parent unlinks the block
+    block = SharedMemory(name=block_name)
+    arrays = {}
+    for name, (start, dtype, shape) in layout.items():
+        view = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)
+        view.flags.writeable = False
+        arrays[name] = view
+    return block, arrays
+
+
+def split_byte_ranges(path, n_ranges):
+    """Split a CSV into up to n_ranges (start, end) byte ranges aligned to line starts.
+
+    The header line is excluded. Assumes no quoted newlines inside fields.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.readline()
+        data_start = f.tell()
+        boundaries = [data_start]
+        for i in range(1, n_ranges):
+            f.seek(max(data_start, size * i // n_ranges))
+            f.readline()
+            boundaries.append(max(f.tell(), boundaries[-1]))
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+class ByteRangeReader(io.RawIOBase):
+    """A read-only file view limited to [start, end)"""
+
+    def __init__(self, path, start, end):
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self._remaining)
+        if n <= 0:
+            return 0
+        got = self._file.readinto(memoryview(buffer)[:n])
+        self._remaining -= got
+        return got
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+_worker = {}
+
+
+def _init_worker(block_name, layout, predictor_kind, predictor_params, label_encoders, feature_names, columns):
+    """Attach to the shared model once per worker process"""
+    block, arrays = attach_arrays(block_name, layout)
+    _worker['block'] = block
+    _worker['predictor'] = EXPORTABLE_PREDICTORS[predictor_kind].from_exported(arrays, predictor_params)
+    _worker['encoder'] = FeatureEncoder(label_encoders, feature_names)
+    _worker['columns'] = columns
+
+
+def _score_range(input_path, start, end, part_path, chunk_size):
+    """Score one byte range of the input into a headerless partial CSV"""
+    rows = 0
+    with io.BufferedReader(ByteRangeReader(input_path, start, end)) as source, open(part_path, 'w', newline='') as out:
+        for chunk in pd.read_csv(source, header=None, names=_worker['columns'], chunksize=chunk_size):
+            chunk['predicted_price'], chunk['price_lower'], chunk['price_upper'] = predict_frame(
+                chunk, _worker['predictor'], _worker['encoder'])
+            chunk.to_csv(out, header=False, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def score_file_parallel(input_path, output_path, artifacts, workers, chunk_size=50000):
+    """Score input_path with a pool of workers sharing one in-memory copy of the model.
+
+    The file is split into newline-aligned byte ranges; each worker parses its ranges
+    directly, writes a partial output, and the parts are concatenated in input order.
+    """
+    predictor, label_encoders, feature_names = artifacts
+    if type(predictor).__name__ not in EXPORTABLE_PREDICTORS:
+        raise ValueError(f"Parallel scoring needs a linear or tree model, not {type(predictor.model).__name__}")
+    arrays, params = predictor.export_arrays()
+
+    start = time.perf_counter()
+    with open(input_path) as f:
+        columns = pd.read_csv(f, nrows=0).columns.tolist()
+    missing = [col for col in INPUT_COLS if col not in columns]
+    if missing:
+        raise ValueError(f"Input is missing required columns: {missing}")
+    # A few ranges per worker so one slow range does not hold up the whole run
+    ranges = split_byte_ranges(input_path, workers * 4)
+    part_paths = [f'{output_path}.part{i:05d}' for i in range(len(ranges))]
+
+    block, layout = share_arrays(arrays)
+    try:
+        initargs = (block.name, layout, type(predictor).__name__, params, label_encoders, feature_names, columns)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            futures = [pool.submit(_score_range, input_path, range_start, range_end, part_path, chunk_size)
+                       for (range_start, range_end), part_path in zip(ranges, part_paths)]
+            rows = sum(future.result() for future in futures)
+        with open(output_path, 'w', newline='') as out:
+            out.write(','.join(columns + ['predicted_price', 'price_lower', 'price_upper']) + '\n')
+            for part_path in part_paths:
+                with open(part_path) as part:
+                    shutil.copyfileobj(part, out, 1 << 20)
+    finally:
+        block.close()
+        block.unlink()
+        for part_path in part_paths:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+    return rows, time.perf_counter() - start
+
+
+def report_scaling(input_path, output_path, artifacts, max_workers, chunk_size):
+    """Score the file with the single-process path and with 1, 2, 4, ... max_workers workers"""
+    rows, baseline = score_file(input_path, output_path, artifacts, chunk_size=chunk_size)
+    print("\nSCALING EFFICIENCY")
+    print("-" * 80)
+    print(f"  {'mode':<24} {'wall (s)':>10} {'rows/s':>14} {'speedup':>9} {'efficiency':>11}")
+    print(f"  {'single process':<24} {baseline:>10.2f} {rows / baseline:>14,.0f} {'-':>9} {'-':>11}")
+    counts = sorted({min(2 ** i, max_workers) for i in range(max_workers.bit_length() + 1)})
+    one_worker = None
+    for workers in counts:
+        rows, elapsed = score_file_parallel(input_path, output_path, artifacts, workers, chunk_size=chunk_size)
+        one_worker = one_worker or elapsed
+        speedup = one_worker / elapsed
+        print(f"  {f'{workers} worker(s)':<24} {elapsed:>10.2f} {rows / elapsed:>14,.0f} "
+              f"{speedup:>8.2f}x {speedup / workers:>10.0%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV of properties with the trained model.")
+    parser.add_argument('input', help="CSV with the same columns as Housing.csv (price is optional)")
+    parser.add_argument('output', help="Where to write the scored rows")
+    parser.add_argument('--chunk-size', type=int, default=50000, help="Rows encoded and scored per chunk")
+    parser.add_argument('--model-dir', default='.', help="Directory holding the trained artifacts")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes (byte-range parallel mode if > 1)")
+    parser.add_argument('--scaling', action='store_true', help="Report scaling efficiency from 1 to --workers")
+    args = parser.parse_args(argv)
+
+    print("Loading model and preprocessing objects...")
+    artifacts = load_predictor(args.model_dir)
+
+    if args.scaling:
+        report_scaling(args.input, args.output, artifacts, args.workers, args.chunk_size)
+        return
+
+    if args.workers > 1:
+        print(f"Scoring {args.input} with {args.workers} worker processes in chunks of {args.chunk_size:,} rows...")
+        rows, elapsed = score_file_parallel(args.input, args.output, artifacts, args.workers,
+                                            chunk_size=args.chunk_size)
+    else:
+        print(f"Scoring {args.input} in chunks of {args.chunk_size:,} rows...")
+        rows, elapsed = score_file(args.input, args.output, artifacts, chunk_size=args.chunk_size)
+
+    print(f"✓ {rows:,} predictions written to {args.output}")
+    print(f"  Elapsed: {elapsed:.2f}s")
+    print(f"  Throughput: {rows / elapsed if elapsed > 0 else 0:,.0f} rows/s")
+    peak = peak_rss_mb()
+    print(f"  Peak RSS: {peak:,.1f} MB" if peak is not None else "  Peak RSS: unavailable on this platform")
+    if args.workers > 1 and peak is not None:
+        print(f"  Peak RSS (largest worker): {peak_child_rss_mb():,.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Housing Price Prediction - Data Loading Benchmark
+Compares parsing the CSV text with the columnar cache in housing_data.py:
+
+    text parse   pd.read_csv on every load (the old behaviour)
+    cold         first load: parse + write the cache
+    warm         later loads: read the .npy columns and decode the categories
+
+and reports the memory of the parsed frame (int64 and string columns) against the
+frame with the compact HOUSING_SCHEMA dtypes that the cache returns.
+
+Usage:
+    python benchmark_data.py                   # Housing.csv and a 1M-row replica
+    python benchmark_data.py --rows 5000000 --repeat 3
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+from housing_data import apply_schema, load_housing_data, memory_usage
+
+
+def best_of(func, repeat):
+    """Return (best wall time in seconds, last result) over repeat calls"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def benchmark_file(path, repeat):
+    """Time text parse, cold cache build and warm cache load for one CSV"""
+    cache_root = tempfile.mkdtemp(prefix='housing-cache-')
+    try:
+        text_time, expected = best_of(lambda: pd.read_csv(path), repeat)
+        cold_times = []
+        for _ in range(repeat):
+            shutil.rmtree(cache_root)
+            start = time.perf_counter()
+            load_housing_data(path, cache_root=cache_root)
+            cold_times.append(time.perf_counter() - start)
+        warm_time, cached = best_of(lambda: load_housing_data(path, cache_root=cache_root), repeat)
+        compact = apply_schema(expected.copy())
+        pd.testing.assert_frame_equal(cached, compact)
+
+        cache_bytes = sum(os.path.getsize(os.path.join(dirpath, name))
+                          for dirpath, _, names in os.walk(cache_root) for name in names)
+        print(f"\n{os.path.basename(path)}: {len(expected):,} rows, CSV {os.path.getsize(path) / 1e6:,.1f} MB, "
+              f"cache {cache_bytes / 1e6:,.1f} MB")
+        print(f"  {'memory':<12} {memory_usage(expected) / 1e6:>10,.2f} MB parsed -> "
+              f"{memory_usage(cached) / 1e6:,.2f} MB compact ({memory_usage(expected) / memory_usage(cached):.1f}x smaller)")
+        print(f"  {'text parse':<12} {text_time * 1000:>10.1f} ms")
+        print(f"  {'cold':<12} {min(cold_times) * 1000:>10.1f} ms")
+        print(f"  {'warm':<12} {warm_time * 1000:>10.1f} ms   ({text_time / warm_time:.1f}x faster than text)")
+    finally:
+        shutil.rmtree(cache_root, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CSV parsing against the columnar data cache.")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Rows in the replicated dataset")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed repetitions (best is reported)")
+    args = parser.parse_args(argv)
+
+    print(f"DATA LOADING BENCHMARK (best of {args.repeat})")
+    print("-" * 80)
+    benchmark_file('Housing.csv', args.repeat)
+
+    workdir = tempfile.mkdtemp(prefix='housing-bench-')
+    try:
+        df = pd.read_csv('Housing.csv')
+        rng = np.random.default_rng(42)
+        big_path = os.path.join(workdir, f'Housing_{args.rows}.csv')
+        df.iloc[rng.integers(0, len(df), args.rows)].to_csv(big_path, index=False)
+        benchmark_file(big_path, args.repeat)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print("\n✓ Cached frames match pd.read_csv converted to the schema exactly")
+
+
+if __name__ == '__main__':
+    main()
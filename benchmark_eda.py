@@ -0,0 +1,85 @@
+"""
+Housing Price Prediction - EDA Statistics Benchmark
+Compares the per-column pandas calls of EDA sections 7, 8 and 12 (mean, median, mode,
+std, min, max, skew, two quantiles and an outlier sub-frame per column) with the single
+sort of eda_stats.summarize_numeric, and checks that both give the same numbers.
+
+Usage:
+    python benchmark_eda.py                      # 10M-row synthetic frame
+    python benchmark_eda.py --rows 1000000 --repeat 3
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from eda_stats import summarize_numeric
+from housing_data import HOUSING_SCHEMA, load_housing_data
+
+
+def pandas_statistics(df, columns):
+    """The statistics of sections 7, 8 and 12, one pandas scan per statistic"""
+    result = {}
+    for col in columns:
+        Q1 = df[col].quantile(0.25)
+        Q3 = df[col].quantile(0.75)
+        IQR = Q3 - Q1
+        outliers = df[(df[col] < Q1 - 1.5 * IQR) | (df[col] > Q3 + 1.5 * IQR)]
+        result[col] = {
+            'mean': df[col].mean(), 'median': df[col].median(), 'mode': df[col].mode()[0],
+            'std': df[col].std(), 'min': df[col].min(), 'max': df[col].max(), 'skew': df[col].skew(),
+            'q1': Q1, 'q3': Q3, 'n_outliers': len(outliers)
+        }
+    return result
+
+
+def synthetic_frame(n_rows, seed=42):
+    """A frame of n_rows with Housing.csv's numeric columns, dtypes and rough distributions"""
+    df = load_housing_data('Housing.csv')
+    rng = np.random.default_rng(seed)
+    data = {}
+    for col in df.select_dtypes(include=[np.number]).columns:
+        # Resample the observed values and add noise, so the columns are not just 545 distinct values
+        values = df[col].to_numpy()[rng.integers(0, len(df), n_rows)]
+        if col in ('price', 'area'):
+            values = values + rng.integers(-500, 500, n_rows) * (1000 if col == 'price' else 1)
+        data[col] = values.astype(HOUSING_SCHEMA[col])
+    return pd.DataFrame(data)
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-column pandas statistics against eda_stats.")
+    parser.add_argument('--rows', type=int, default=10_000_000, help="Rows in the synthetic frame")
+    parser.add_argument('--repeat', type=int, default=1, help="Timed repetitions (best is reported)")
+    args = parser.parse_args(argv)
+
+    df = synthetic_frame(args.rows)
+    columns = list(df.columns)
+    print(f"EDA STATISTICS BENCHMARK: {len(df):,} rows x {len(columns)} numeric columns "
+          f"({df.memory_usage().sum() / 1e6:,.0f} MB)")
+    print("-" * 80)
+
+    pandas_time, expected = best_of(lambda: pandas_statistics(df, columns), args.repeat)
+    engine_time, summary = best_of(lambda: summarize_numeric(df, columns), args.repeat)
+    for col in columns:
+        stats = summary[col]
+        for name, value in expected[col].items():
+            assert np.isclose(stats[name], value, rtol=1e-9, atol=1e-9), (col, name, stats[name], value)
+
+    print(f"  {'pandas, per column':<22} {pandas_time:>8.2f} s")
+    print(f"  {'eda_stats, one sort':<22} {engine_time:>8.2f} s   ({pandas_time / engine_time:.1f}x faster)")
+    print("\n✓ Mean, median, mode, std, min, max, skew, quartiles and outlier counts match pandas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Housing Price Prediction - Scatter Plot Rendering Benchmark
+Times the section 16 scatter plots and the section 17 pair plot drawn one marker per row
+against the density images that eda_plots switches to above DENSITY_THRESHOLD rows:
+
+    markers      plt.scatter of every row (pair plot: seaborn on a 100-row sample)
+    density      rows binned into a DENSITY_BINS grid and drawn with imshow
+
+on replicated datasets of growing size, to show that density rendering stays bounded by
+the grid while marker rendering grows with the rows. Before timing, density_grid is
+checked against np.histogram2d (counts) and a pandas groupby (mean price per cell).
+
+Usage:
+    python benchmark_plots.py                          # 100k, 1M and 4M rows
+    python benchmark_plots.py --rows 1000000 --dpi 300
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import warnings
+warnings.filterwarnings('ignore')
+
+from eda_plots import apply_style, density_grid, plot_pairplot, plot_scatter
+from housing_data import load_housing_data
+
+
+def check_density_grid(df):
+    """density_grid must agree with np.histogram2d and with a groupby over the same cells"""
+    counts, means, x_edges, y_edges = density_grid(df['area'], df['bedrooms'], values=df['price'])
+    expected, _, _ = np.histogram2d(df['area'], df['bedrooms'], bins=[x_edges, y_edges])
+    np.testing.assert_array_equal(counts, expected)
+    ix = np.clip(np.digitize(df['area'], x_edges) - 1, 0, len(x_edges) - 2)
+    iy = np.clip(np.digitize(df['bedrooms'], y_edges) - 1, 0, len(y_edges) - 2)
+    cell_means = df['price'].groupby([ix, iy]).mean()
+    np.testing.assert_allclose(means[cell_means.index.get_level_values(0), cell_means.index.get_level_values(1)],
+                               cell_means.to_numpy(), rtol=1e-12)
+    assert np.isnan(means[counts == 0]).all()
+    print(f"✓ density_grid matches np.histogram2d counts and groupby mean price "
+          f"({counts.shape[0]}x{counts.shape[1]} grid)")
+
+
+def time_plot(plot_func, df, path, dpi, density_threshold):
+    start = time.perf_counter()
+    plot_func(df, path, dpi=dpi, density_threshold=density_threshold)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark marker against density rendering of the scatter plots.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000, 4_000_000],
+                        help="Rows in each replicated dataset")
+    parser.add_argument('--dpi', type=int, default=100, help="Resolution of the saved figures")
+    args = parser.parse_args(argv)
+
+    df = load_housing_data('Housing.csv')
+    apply_style()
+    print("DENSITY GRID CHECK (Housing.csv)")
+    print("-" * 80)
+    check_density_grid(df)
+
+    print(f"\nRENDERING BENCHMARK (dpi={args.dpi})")
+    print("-" * 80)
+    print(f"  {'rows':>10} {'plot':<14} {'markers':>10} {'density':>10}")
+    workdir = tempfile.mkdtemp(prefix='housing-plots-')
+    rng = np.random.default_rng(42)
+    try:
+        for n_rows in args.rows:
+            big = df.iloc[rng.integers(0, len(df), n_rows)].reset_index(drop=True)
+            for label, plot_func in [('scatter (16)', plot_scatter), ('pair plot (17)', plot_pairplot)]:
+                path = os.path.join(workdir, 'plot.png')
+                markers = time_plot(plot_func, big, path, args.dpi, density_threshold=np.inf)
+                density = time_plot(plot_func, big, path, args.dpi, density_threshold=0)
+                print(f"  {n_rows:>10,} {label:<14} {markers:>8.2f} s {density:>8.2f} s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
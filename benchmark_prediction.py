@@ -0,0 +1,164 @@
+"""
+Housing Price Prediction - Prediction Microbenchmarks
+Measures per-request latency of the prediction path with the trained artifacts.
+
+Usage:
+    python benchmark_prediction.py --repeat 2000
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from forest_engine import ForestEngine
+from prediction import FeatureEncoder, FusedLinearPredictor, load_artifacts
+
+SAMPLE_INPUT = {
+    'area': 6000,
+    'bedrooms': 3,
+    'bathrooms': 2,
+    'stories': 2,
+    'mainroad': 'yes',
+    'guestroom': 'yes',
+    'basement': 'yes',
+    'hotwaterheating': 'no',
+    'airconditioning': 'yes',
+    'parking': 2,
+    'prefarea': 'yes',
+    'furnishingstatus': 'semi-furnished'
+}
+
+
+def legacy_encode(input_data, label_encoders, feature_names):
+    """The original pandas-based encoding from the Price Prediction page"""
+    input_df = pd.DataFrame([input_data])
+    for col in ['mainroad', 'guestroom', 'basement', 'hotwaterheating', 'airconditioning', 'prefarea']:
+        if col in label_encoders:
+            input_df[col] = label_encoders[col].transform([input_data[col]])[0]
+    furnishing_dummies = pd.get_dummies(pd.DataFrame([{'furnishingstatus': input_data['furnishingstatus']}]),
+                                        columns=['furnishingstatus'],
+                                        prefix='furnishing',
+                                        drop_first=True)
+    input_df = pd.concat([input_df.drop('furnishingstatus', axis=1), furnishing_dummies], axis=1)
+    for col in feature_names:
+        if col not in input_df.columns:
+            input_df[col] = 0
+    return input_df[feature_names]
+
+
+def time_call(func, repeat):
+    """Run func repeat times and return the median latency in microseconds"""
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings[i] = time.perf_counter() - start
+    return np.median(timings) * 1e6
+
+
+def report(title, rows):
+    """Print a latency table of (label, microseconds) rows relative to the first row"""
+    print(f"\n{title}")
+    print("-" * 80)
+    baseline = rows[0][1]
+    for label, micros in rows:
+        print(f"  {label:<40} {micros:>10.1f} µs   ({baseline / micros:5.1f}x)")
+
+
+def benchmark_encoding(artifacts, repeat):
+    """Compare the legacy pandas encoding with the compiled FeatureEncoder"""
+    model, scaler, label_encoders, feature_names = artifacts
+    encoder = FeatureEncoder(label_encoders, feature_names)
+    row = np.zeros((1, len(feature_names)))
+
+    report("SINGLE-ROW ENCODING", [
+        ("pandas (legacy)", time_call(lambda: legacy_encode(SAMPLE_INPUT, label_encoders, feature_names), repeat)),
+        ("FeatureEncoder.transform_row", time_call(lambda: encoder.transform_row(SAMPLE_INPUT, out=row), repeat)),
+    ])
+    report("SINGLE-ROW REQUEST (encode + scale + predict)", [
+        ("pandas (legacy)", time_call(
+            lambda: model.predict(scaler.transform(legacy_encode(SAMPLE_INPUT, label_encoders, feature_names))), repeat)),
+        ("FeatureEncoder.transform_row", time_call(
+            lambda: model.predict(scaler.transform(encoder.transform_row(SAMPLE_INPUT, out=row))), repeat)),
+    ])
+
+
+def benchmark_fused(artifacts, repeat):
+    """Compare scaler.transform + model.predict with the fused linear predictor"""
+    model, scaler, label_encoders, feature_names = artifacts
+    if not isinstance(model, LinearRegression):
+        print(f"\nSkipping fused predictor benchmark: model is {type(model).__name__}")
+        return
+    fused = FusedLinearPredictor.from_estimators(model, scaler)
+    encoder = FeatureEncoder(label_encoders, feature_names)
+    X_all = encoder.transform(pd.read_csv('Housing.csv'))
+
+    # Parity with the sklearn path before timing anything
+    np.testing.assert_allclose(fused.predict(X_all), model.predict(scaler.transform(X_all)), rtol=1e-9)
+    print("\n✓ Fused predictor matches scaler.transform + model.predict (rtol=1e-9)")
+
+    rng = np.random.default_rng(42)
+    for batch_size in [1, 100, 10000, 1000000]:
+        X = X_all[rng.integers(0, len(X_all), size=batch_size)]
+        batch_repeat = max(5, repeat // max(1, batch_size // 100))
+        rows = [
+            ("sklearn (scaler + model)", time_call(lambda: model.predict(scaler.transform(X)), batch_repeat)),
+            ("FusedLinearPredictor", time_call(lambda: fused.predict(X), batch_repeat)),
+        ]
+        report(f"FUSED PREDICTOR - batch of {batch_size:,} rows", rows)
+        if batch_size > 1:
+            print(f"  per row: {rows[0][1] / batch_size:.3f} µs -> {rows[1][1] / batch_size:.3f} µs")
+
+
+def benchmark_forest(artifacts, repeat, max_rows):
+    """Compare RandomForestRegressor.predict with the array-backed ForestEngine across batch sizes"""
+    model, scaler, label_encoders, feature_names = artifacts
+    df = pd.read_csv('Housing.csv')
+    X_all = scaler.transform(FeatureEncoder(label_encoders, feature_names).transform(df))
+    if isinstance(model, RandomForestRegressor):
+        forest = model
+    else:
+        # Same candidate as housing_analysis.py, so the benchmark runs whichever model won
+        forest = RandomForestRegressor(n_estimators=100, random_state=42, max_depth=10).fit(X_all, df['price'])
+    engine = ForestEngine.from_estimator(forest)
+
+    rng = np.random.default_rng(42)
+    X_check = X_all[rng.integers(0, len(X_all), size=10000)] + rng.normal(0, 0.5, size=(10000, X_all.shape[1]))
+    assert np.array_equal(engine.predict(X_check), forest.predict(X_check))
+    print(f"\n✓ ForestEngine matches RandomForestRegressor.predict exactly "
+          f"({engine.n_trees} trees, {len(engine.threshold):,} nodes, depth {engine.max_depth})")
+
+    batch_size = 1
+    while batch_size <= max_rows:
+        X = X_all[rng.integers(0, len(X_all), size=batch_size)]
+        batch_repeat = max(3, repeat // max(1, batch_size // 10))
+        rows = [
+            ("sklearn (100 tree objects)", time_call(lambda: forest.predict(X), batch_repeat)),
+            ("ForestEngine (level by level)", time_call(lambda: engine.predict(X), batch_repeat)),
+        ]
+        report(f"FOREST - batch of {batch_size:,} rows", rows)
+        if batch_size > 1:
+            print(f"  per row: {rows[0][1] / batch_size:.3f} µs -> {rows[1][1] / batch_size:.3f} µs")
+        batch_size *= 10
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-request prediction latency.")
+    parser.add_argument('--repeat', type=int, default=2000, help="Timed calls per measurement")
+    parser.add_argument('--model-dir', default='.', help="Directory holding the trained artifacts")
+    parser.add_argument('--max-rows', type=int, default=1000000, help="Largest forest batch size benchmarked")
+    args = parser.parse_args(argv)
+
+    artifacts = load_artifacts(args.model_dir)
+    benchmark_encoding(artifacts, args.repeat)
+    benchmark_fused(artifacts, args.repeat)
+    benchmark_forest(artifacts, args.repeat, args.max_rows)
+
+
+if __name__ == '__main__':
+    main()
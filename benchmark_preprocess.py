@@ -0,0 +1,139 @@
+"""
+Housing Price Prediction - Preprocessing Benchmark and float32 Parity Check
+Compares the original pandas preprocessing (copy, LabelEncoder, get_dummies, drop,
+fit_transform, DataFrame, train_test_split) with housing_analysis.preprocess, which
+writes the encoded and scaled rows once into a preallocated matrix:
+
+    pandas       the original chain of intermediate frames
+    float64      preallocated matrix, train/test as views
+    float32      the same in float32
+
+Time and peak traced memory are measured on a replicated dataset. The parity check on
+Housing.csv asserts that the float64 matrix matches the pandas one and that every
+candidate trained in float32 scores within R2_TOLERANCE of its float64 twin.
+
+Usage:
+    python benchmark_preprocess.py                  # parity check and a 1M-row replica
+    python benchmark_preprocess.py --rows 5000000
+"""
+
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+import warnings
+warnings.filterwarnings('ignore')
+
+from housing_analysis import candidate_models, preprocess, split_views
+from housing_data import FLAG_COLUMNS, load_housing_data, yes_no_labels
+from model_training import fit_and_score
+
+# Largest test R² difference accepted between float32 and float64 training (trees may
+# pick a different split where two candidates tie to float32 precision)
+R2_TOLERANCE = 0.02
+
+
+def pandas_preprocess(df):
+    """The original preprocessing: one intermediate frame per step"""
+    df_processed = df.copy()
+    label_encoders = {}
+    for col in FLAG_COLUMNS:
+        le = LabelEncoder()
+        df_processed[col] = le.fit_transform(yes_no_labels(df_processed[col]))
+        label_encoders[col] = le
+    df_processed = pd.get_dummies(df_processed, columns=['furnishingstatus'], prefix='furnishing', drop_first=True)
+    X = df_processed.drop('price', axis=1)
+    y = df_processed['price']
+    scaler = StandardScaler()
+    X_scaled = pd.DataFrame(scaler.fit_transform(X), columns=X.columns)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
+    return X_train, X_test, y_train, y_test
+
+
+def quiet_preprocess(df, dtype):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return preprocess(df, dtype=dtype)
+
+
+def measure(func):
+    """Return (wall time in seconds, peak traced memory in bytes) of func.
+
+    Timed and traced in separate calls, since tracing slows pandas down far more than NumPy.
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def parity_check(df):
+    """Check the preallocated pipeline against pandas and float32 training against float64"""
+    X_train_ref, X_test_ref, y_train_ref, y_test_ref = pandas_preprocess(df)
+    data64, data32 = quiet_preprocess(df, 'float64'), quiet_preprocess(df, 'float32')
+    X_train, X_test, y_train, y_test = split_views(data64)
+    np.testing.assert_allclose(X_train, X_train_ref.to_numpy(), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(X_test, X_test_ref.to_numpy(), rtol=1e-12, atol=1e-12)
+    np.testing.assert_array_equal(y_train, y_train_ref.to_numpy())
+    np.testing.assert_array_equal(y_test, y_test_ref.to_numpy())
+    assert data64['feature_names'] == list(X_train_ref.columns)
+    assert np.shares_memory(X_train, data64['X_scaled']) and np.shares_memory(X_test, data64['X_scaled'])
+    print("✓ float64 matrix matches the pandas pipeline (rtol=1e-12); train/test are views")
+
+    print(f"\n  {'Model':<34} {'R² float64':>11} {'R² float32':>11} {'difference':>11}")
+    for name, model in candidate_models().items():
+        X_train, X_test, y_train, y_test = split_views(data64)
+        _, res64 = fit_and_score(name, model, X_train, y_train, X_test, y_test)
+        X_train, X_test, y_train, y_test = split_views(data32)
+        _, res32 = fit_and_score(name, candidate_models()[name], X_train, y_train, X_test, y_test)
+        difference = res32['test_r2'] - res64['test_r2']
+        print(f"  {name:<34} {res64['test_r2']:>11.4f} {res32['test_r2']:>11.4f} {difference:>+11.4f}")
+        assert abs(difference) <= R2_TOLERANCE, f"{name}: float32 test R² differs by {difference:+.4f}"
+    print(f"\n✓ float32 training within {R2_TOLERANCE} test R² of float64 for every candidate")
+
+
+def benchmark(df):
+    """Time and peak memory of each preprocessing path on one frame"""
+    frame_mb = df.memory_usage(deep=True).sum() / 1e6
+    print(f"\n{len(df):,} rows (input frame {frame_mb:,.1f} MB)")
+    print(f"  {'path':<10} {'time':>10} {'peak memory':>14}")
+    paths = [('pandas', lambda: pandas_preprocess(df)),
+             ('float64', lambda: quiet_preprocess(df, 'float64')),
+             ('float32', lambda: quiet_preprocess(df, 'float32'))]
+    baseline = None
+    for label, func in paths:
+        elapsed, peak = measure(func)
+        if baseline is None:
+            baseline = (elapsed, peak)
+            print(f"  {label:<10} {elapsed * 1000:>8.0f} ms {peak / 1e6:>11,.1f} MB")
+        else:
+            print(f"  {label:<10} {elapsed * 1000:>8.0f} ms {peak / 1e6:>11,.1f} MB   "
+                  f"({baseline[0] / elapsed:.1f}x faster, {baseline[1] / peak:.1f}x less memory than pandas)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing paths and check float32 parity.")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Rows in the replicated dataset")
+    args = parser.parse_args(argv)
+
+    df = load_housing_data('Housing.csv')
+    print("PARITY CHECK (Housing.csv)")
+    print("-" * 80)
+    parity_check(df)
+
+    print("\nPREPROCESSING BENCHMARK")
+    print("-" * 80)
+    rng = np.random.default_rng(42)
+    benchmark(df.iloc[rng.integers(0, len(df), args.rows)].reset_index(drop=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Housing Price Prediction - Prediction Service Load Generator
+Fires concurrent requests at the HTTP prediction service and reports latency percentiles
+and throughput.
+
+Usage:
+    python prediction_service.py &
+    python benchmark_service.py --concurrency 32 --requests 5000
+
+    # or start a service in-process for a quick run
+    python benchmark_service.py --start-server --max-batch-size 64 --max-wait-ms 2
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+import numpy as np
+
+from benchmark_prediction import SAMPLE_INPUT
+
+
+def run_client(host, port, body, n_requests, latencies, errors):
+    """Send n_requests POSTs over one keep-alive connection, recording latency in seconds"""
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {'Content-Type': 'application/json'}
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        try:
+            conn.request('POST', '/predict', body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the prediction service on localhost.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--concurrency', type=int, default=32, help="Concurrent client connections")
+    parser.add_argument('--requests', type=int, default=5000, help="Total requests to send")
+    parser.add_argument('--rows-per-request', type=int, default=1, help="Send arrays of this many properties")
+    parser.add_argument('--start-server', action='store_true', help="Start a service in this process first")
+    parser.add_argument('--max-batch-size', type=int, default=64, help="Used with --start-server")
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help="Used with --start-server")
+    args = parser.parse_args(argv)
+
+    if args.start_server:
+        from prediction_service import create_server
+        server = create_server(args.host, args.port, max_batch_size=args.max_batch_size,
+                               max_wait_ms=args.max_wait_ms)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"✓ Started service on {args.host}:{args.port} "
+              f"(max batch {args.max_batch_size}, max wait {args.max_wait_ms} ms)")
+
+    payload = SAMPLE_INPUT if args.rows_per_request == 1 else [SAMPLE_INPUT] * args.rows_per_request
+    body = json.dumps(payload).encode()
+    per_client = [args.requests // args.concurrency + (i < args.requests % args.concurrency)
+                  for i in range(args.concurrency)]
+    latencies, errors = [], []
+
+    print(f"Sending {args.requests:,} requests with {args.concurrency} concurrent clients...")
+    start = time.perf_counter()
+    clients = [threading.Thread(target=run_client, args=(args.host, args.port, body, n, latencies, errors))
+               for n in per_client]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - start
+
+    print("\nLOAD TEST RESULTS")
+    print("-" * 80)
+    print(f"  Completed: {len(latencies):,} requests in {elapsed:.2f}s ({len(errors)} errors)")
+    print(f"  Throughput: {len(latencies) / elapsed:,.0f} requests/s "
+          f"({len(latencies) * args.rows_per_request / elapsed:,.0f} rows/s)")
+    if latencies:
+        p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        print(f"  Latency p50: {p50:.2f} ms   p95: {p95:.2f} ms   p99: {p99:.2f} ms")
+
+    if args.start_server:
+        print(f"  Batching: {server.batcher.stats()}")
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Housing Price Prediction - Parallel EDA over Partitioned Data
+Summary statistics, the correlation matrix and the grouped price means of the EDA report
+for a history stored as many partition files (e.g. one per month), computed as a
+map-reduce instead of on one concatenated frame.
+
+Each partition is reduced in a worker process to a PartialAggregate: its row count, the
+means, the centered co-moment matrix and third moments of the numeric columns, min/max,
+and the price count and sum per group. Partial aggregates merge exactly in any order
+(pairwise updates of Chan et al. and Pébay for the moments, plain sums for the groups),
+so only these small aggregates ever leave the workers.
+
+Usage:
+    python eda_partitions.py                                  # check against pandas on Housing.csv
+    python eda_partitions.py listings/2024-*.csv --n-jobs 8
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from functools import reduce
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from housing_data import load_housing_data, yes_no_labels
+from model_training import worker_budget
+
+TARGET = 'price'
+GROUP_COLUMNS = ['furnishingstatus', 'bedrooms', 'mainroad', 'prefarea']
+
+
+class PartialAggregate:
+    """Mergeable moments of the numeric columns and price sums per group of one or more partitions"""
+
+    def __init__(self, columns, n, mean, comoment, m3, minimum, maximum, groups):
+        self.columns = list(columns)
+        self.n = int(n)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.comoment = np.asarray(comoment, dtype=np.float64)
+        self.m3 = np.asarray(m3, dtype=np.float64)
+        self.minimum = np.asarray(minimum, dtype=np.float64)
+        self.maximum = np.asarray(maximum, dtype=np.float64)
+        # {group column: {value: [price count, price sum]}}
+        self.groups = groups
+
+    @classmethod
+    def from_frame(cls, df, columns=None, group_columns=GROUP_COLUMNS):
+        """Aggregate one partition (numeric columns default to all of them)"""
+        columns = list(df.select_dtypes(include=[np.number]).columns if columns is None else columns)
+        values = df[columns].to_numpy(dtype=np.float64)
+        mean = values.mean(axis=0) if len(values) else np.zeros(len(columns))
+        centered = values - mean
+        groups = {}
+        for col in group_columns:
+            grouped = df[TARGET].groupby(yes_no_labels(df[col]), observed=True).agg(['count', 'sum'])
+            groups[col] = {key: [int(row['count']), int(row['sum'])] for key, row in grouped.iterrows()}
+        return cls(columns, len(values), mean, centered.T @ centered, (centered ** 3).sum(axis=0),
+                   values.min(axis=0, initial=np.inf), values.max(axis=0, initial=-np.inf), groups)
+
+    def merge(self, other):
+        """Return the aggregate of both row sets combined"""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            return other
+        if other.columns != self.columns:
+            raise ValueError(f"Cannot merge aggregates of different columns: {self.columns} vs {other.columns}")
+        na, nb = self.n, other.n
+        n = na + nb
+        delta = other.mean - self.mean
+        mean = self.mean + delta * (nb / n)
+        comoment = self.comoment + other.comoment + np.outer(delta, delta) * (na * nb / n)
+        m2a, m2b = np.diag(self.comoment), np.diag(other.comoment)
+        m3 = (self.m3 + other.m3 + delta ** 3 * na * nb * (na - nb) / n ** 2
+              + 3 * delta * (na * m2b - nb * m2a) / n)
+        groups = {}
+        for col in self.groups.keys() | other.groups.keys():
+            merged = {key: list(counts) for key, counts in self.groups.get(col, {}).items()}
+            for key, (count, total) in other.groups.get(col, {}).items():
+                merged.setdefault(key, [0, 0])
+                merged[key][0] += count
+                merged[key][1] += total
+            groups[col] = merged
+        return PartialAggregate(self.columns, n, mean, comoment, m3, np.minimum(self.minimum, other.minimum),
+                                np.maximum(self.maximum, other.maximum), groups)
+
+    __add__ = merge
+
+    def summary(self):
+        """count, mean, std (ddof=1), min, max and skew (as pandas) per numeric column"""
+        m2 = np.diag(self.comoment)
+        n = self.n
+        std = np.sqrt(m2 / (n - 1)) if n > 1 else np.full(len(self.columns), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            skew = np.where(m2 == 0, 0.0, n * (n - 1) ** 0.5 / (n - 2) * self.m3 / m2 ** 1.5) if n > 2 else np.nan
+        return pd.DataFrame({'count': n, 'mean': self.mean, 'std': std, 'min': self.minimum,
+                             'max': self.maximum, 'skew': skew}, index=self.columns).T
+
+    def correlation(self):
+        """Pearson correlation matrix of the numeric columns (as DataFrame.corr())"""
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = self.comoment / np.outer(scale, scale)
+        np.fill_diagonal(corr, 1.0)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def group_means(self, col):
+        """Mean price per value of a group column, highest first"""
+        groups = self.groups[col]
+        means = pd.Series({key: total / count for key, (count, total) in groups.items()}, name=TARGET)
+        means.index.name = col
+        return means.sort_values(ascending=False)
+
+
+def partition_aggregate(path, use_cache=True):
+    """Load one partition file and reduce it to its partial aggregate (runs in a worker)"""
+    return PartialAggregate.from_frame(load_housing_data(path, use_cache=use_cache))
+
+
+def aggregate_partitions(paths, n_jobs=None, use_cache=True):
+    """Reduce every partition in a process pool and merge the partial aggregates"""
+    parts = Parallel(n_jobs=min(worker_budget(n_jobs), len(paths)), backend='loky')(
+        delayed(partition_aggregate)(path, use_cache) for path in paths)
+    return reduce(PartialAggregate.merge, parts)
+
+
+def print_report(aggregate):
+    """The partition-merged counterparts of EDA sections 4, 9 and 11"""
+    print("\nSUMMARY STATISTICS")
+    print("-" * 80)
+    print(aggregate.summary())
+    print("\nCORRELATION MATRIX")
+    print("-" * 80)
+    print(aggregate.correlation())
+    print("\nGROUPED AGGREGATIONS")
+    print("-" * 80)
+    for col in GROUP_COLUMNS:
+        print(f"\nAverage Price by {col}:")
+        print(aggregate.group_means(col))
+
+
+def parity_check(path='Housing.csv', n_partitions=4, n_jobs=None):
+    """Split a CSV into partition files, aggregate them in parallel and compare with pandas"""
+    df = load_housing_data(path)
+    workdir = tempfile.mkdtemp(prefix='housing-partitions-')
+    try:
+        paths = []
+        for i, rows in enumerate(np.array_split(np.arange(len(df)), n_partitions)):
+            paths.append(os.path.join(workdir, f'part_{i:02d}.csv'))
+            pd.read_csv(path).iloc[rows].to_csv(paths[-1], index=False)
+        aggregate = aggregate_partitions(paths, n_jobs=n_jobs, use_cache=False)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    numeric = df.select_dtypes(include=[np.number])
+    expected = pd.DataFrame({'count': numeric.count(), 'mean': numeric.mean(), 'std': numeric.std(),
+                             'min': numeric.min(), 'max': numeric.max(), 'skew': numeric.skew()}).T
+    pd.testing.assert_frame_equal(aggregate.summary(), expected.astype(np.float64), rtol=1e-10, check_dtype=False)
+    pd.testing.assert_frame_equal(aggregate.correlation(), numeric.corr(), rtol=1e-10)
+    print(f"✓ Summary statistics and correlation matrix from {n_partitions} partitions match pandas (rtol=1e-10)")
+    for col in GROUP_COLUMNS:
+        expected_means = df.groupby(yes_no_labels(df[col]), observed=True)[TARGET].mean()
+        merged = aggregate.group_means(col)
+        np.testing.assert_allclose(merged.to_numpy(), expected_means[merged.index].to_numpy(), rtol=1e-12)
+        assert len(merged) == len(expected_means)
+    print(f"✓ Price means by {', '.join(GROUP_COLUMNS)} match pandas groupby (rtol=1e-12)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EDA statistics over partition files as a parallel map-reduce.")
+    parser.add_argument('partitions', nargs='*', help="Partition CSV files with the Housing.csv columns")
+    parser.add_argument('--n-jobs', type=int, default=None, help="Worker processes (default: HOUSING_N_JOBS)")
+    parser.add_argument('--no-cache', action='store_true', help="Parse the CSVs without the columnar cache")
+    args = parser.parse_args(argv)
+
+    if not args.partitions:
+        print("Parity check on Housing.csv...")
+        parity_check(n_jobs=args.n_jobs)
+        return
+
+    start = time.perf_counter()
+    aggregate = aggregate_partitions(args.partitions, n_jobs=args.n_jobs, use_cache=not args.no_cache)
+    print(f"✓ Aggregated {aggregate.n:,} rows from {len(args.partitions)} partition(s) "
+          f"in {time.perf_counter() - start:.2f}s")
+    print_report(aggregate)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+"""
+Housing Price Prediction - EDA Plots
+One function per figure saved by housing_analysis.py. Every plot takes the raw dataset
+and an output path, so each figure can be fingerprinted and rebuilt on its own, and the
+figures can be drawn in parallel worker processes (with the non-interactive Agg backend).
+
+Above DENSITY_THRESHOLD rows the scatter and pair plots switch to density images: the
+points are binned into a fixed grid, so drawing time depends on the grid, not the rows.
+"""
+
+import numpy as np
+import pandas as pd
+import matplotlib
+import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
+import seaborn as sns
+
+from housing_data import yes_no_labels
+
+PLOT_DIR = 'plots'
+DPI = 300
+# Global style shared by every figure (part of each plot's fingerprint)
+PLOT_STYLE = {'seaborn_style': 'whitegrid', 'figure.figsize': (12, 6)}
+# Backend of the plot workers: renders to files only, needs no display or GUI event loop
+HEADLESS_BACKEND = 'Agg'
+# Above this many rows, scatter and pair plots draw a DENSITY_BINS x DENSITY_BINS grid of
+# counts (or mean price) as an image instead of one marker per row
+DENSITY_THRESHOLD = 200_000
+DENSITY_BINS = 200
+
+
+def apply_style(style=PLOT_STYLE):
+    """Set the seaborn/matplotlib style used by all plots"""
+    sns.set_style(style['seaborn_style'])
+    plt.rcParams['figure.figsize'] = style['figure.figsize']
+
+
+def use_headless_backend():
+    """Switch matplotlib to the file-only backend (called first in each plot worker)"""
+    matplotlib.use(HEADLESS_BACKEND, force=True)
+
+
+def bin_index(values, bins=DENSITY_BINS):
+    """Return (index, edges): each value's equal-width bin over the range (-1 for NaN).
+
+    Integer columns spanning fewer than bins values get one bin per value.
+    """
+    values = np.asarray(values)
+    missing = pd.isna(values)
+    present = values[~missing] if missing.any() else values
+    low, high = (float(np.min(present)), float(np.max(present))) if len(present) else (0.0, 0.0)
+    if np.issubdtype(values.dtype, np.integer) and high - low < bins:
+        edges = np.arange(low - 0.5, high + 1.5)
+    elif low == high:
+        edges = np.array([low - 0.5, high + 0.5])
+    else:
+        edges = np.linspace(low, high, bins + 1)
+    index = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 2)
+    index[missing] = -1
+    return index, edges
+
+
+def cell_grid(ix, iy, shape, values=None):
+    """Return (counts, means) over the grid cells (ix, iy): points per cell and the mean of
+    values per cell (NaN where empty; None without values), both filled with np.bincount"""
+    nx, ny = shape
+    keep = (ix >= 0) & (iy >= 0)
+    if not keep.all():
+        ix, iy = ix[keep], iy[keep]
+        values = None if values is None else np.asarray(values)[keep]
+    cell = ix * ny + iy
+    counts = np.bincount(cell, minlength=nx * ny).reshape(nx, ny)
+    means = None
+    if values is not None:
+        sums = np.bincount(cell, weights=np.asarray(values, dtype=np.float64), minlength=nx * ny).reshape(nx, ny)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = np.where(counts > 0, sums / counts, np.nan)
+    return counts, means
+
+
+def density_grid(x, y, values=None, bins=DENSITY_BINS):
+    """Bin the points (x, y) into a 2-D grid.
+
+    Returns (counts, means, x_edges, y_edges): counts[i, j] is the number of points in
+    x bin i and y bin j, means[i, j] the mean of values over those points. Each point's
+    cell is computed once, so the cost is linear in the rows and the result is the size
+    of the grid.
+    """
+    ix, x_edges = bin_index(x, bins)
+    iy, y_edges = bin_index(y, bins)
+    counts, means = cell_grid(ix, iy, (len(x_edges) - 1, len(y_edges) - 1), values)
+    return counts, means, x_edges, y_edges
+
+
+def show_grid(ax, counts, means, x_edges, y_edges, cmap='viridis'):
+    """Draw a density grid with imshow: mean values if given, else counts on a log scale;
+    empty cells are left blank. Returns the image (for a colorbar)."""
+    if means is None:
+        grid, norm = np.ma.masked_equal(counts, 0), LogNorm(vmin=1, vmax=max(int(counts.max()), 1))
+    else:
+        grid, norm = np.ma.masked_invalid(means), None
+    # imshow expects rows along y
+    return ax.imshow(grid.T, origin='lower', aspect='auto', interpolation='nearest', cmap=cmap, norm=norm,
+                     extent=(x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]))
+
+
+def draw_density(ax, x, y, values=None, bins=DENSITY_BINS, cmap='viridis'):
+    """Draw the points (x, y) as an image of their density grid instead of one marker each"""
+    return show_grid(ax, *density_grid(x, y, values, bins), cmap=cmap)
+
+
+def numerical_columns(df):
+    return df.select_dtypes(include=[np.number]).columns
+
+
+def categorical_columns(df):
+    # Text columns as parsed, or the bool flags and categoricals of the compact schema
+    return df.select_dtypes(include=['object', 'string', 'category', 'bool']).columns
+
+
+# 13. Histograms for Numerical Features
+def plot_histograms(df, path, dpi=DPI):
+    fig, axes = plt.subplots(2, 3, figsize=(18, 10))
+    axes = axes.ravel()
+    for idx, col in enumerate(numerical_columns(df)):
+        axes[idx].hist(df[col], bins=30, edgecolor='black', alpha=0.7)
+        axes[idx].set_title(f'Distribution of {col}', fontsize=12, fontweight='bold')
+        axes[idx].set_xlabel(col)
+        axes[idx].set_ylabel('Frequency')
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+# 14. Box Plots for Outlier Detection
+def plot_boxplots(df, path, dpi=DPI):
+    fig, axes = plt.subplots(2, 3, figsize=(18, 10))
+    axes = axes.ravel()
+    for idx, col in enumerate(numerical_columns(df)):
+        axes[idx].boxplot(df[col])
+        axes[idx].set_title(f'Box Plot of {col}', fontsize=12, fontweight='bold')
+        axes[idx].set_ylabel(col)
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+# 15. Correlation Heatmap
+def plot_correlation_heatmap(df, path, dpi=DPI):
+    correlation_matrix = df[numerical_columns(df)].corr()
+    plt.figure(figsize=(10, 8))
+    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0,
+                square=True, linewidths=1, cbar_kws={"shrink": 0.8}, fmt='.2f')
+    plt.title('Correlation Matrix Heatmap', fontsize=14, fontweight='bold', pad=20)
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+# 16. Scatter Plots for Feature Relationships
+SCATTER_PANELS = [('area', 'Area (sq ft)', 'Price vs Area'),
+                  ('bedrooms', 'Number of Bedrooms', 'Price vs Bedrooms'),
+                  ('bathrooms', 'Number of Bathrooms', 'Price vs Bathrooms'),
+                  ('parking', 'Number of Parking Spaces', 'Price vs Parking')]
+
+
+def plot_scatter(df, path, dpi=DPI, density_threshold=DENSITY_THRESHOLD):
+    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+    dense = len(df) > density_threshold
+    for ax, (col, xlabel, title) in zip(axes.flat, SCATTER_PANELS):
+        if dense:
+            image = draw_density(ax, df[col], df['price'])
+            fig.colorbar(image, ax=ax, label='Listings per cell')
+        else:
+            ax.scatter(df[col], df['price'], alpha=0.5)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel('Price (PKR)')
+        ax.set_title(title)
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+# 17. Pairwise Feature Relationships
+def plot_pairplot(df, path, dpi=DPI, density_threshold=DENSITY_THRESHOLD):
+    if len(df) > density_threshold:
+        plot_density_pairs(df[numerical_columns(df)])
+        plt.savefig(path, dpi=dpi, bbox_inches='tight')
+        plt.close()
+        return
+    # Sample data for pair plot (too many points can be slow)
+    sample_df = df.sample(min(100, len(df)), random_state=42)
+    sns.pairplot(sample_df[numerical_columns(df)], diag_kind='kde')
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def plot_density_pairs(df, bins=DENSITY_BINS):
+    """Pair plot of every row as density images, with a histogram of each column on the diagonal"""
+    columns = list(df.columns)
+    k = len(columns)
+    # Bin each column once; every panel is then one bincount over its two index arrays
+    binned = {col: bin_index(df[col].to_numpy(), bins) for col in columns}
+    fig, axes = plt.subplots(k, k, figsize=(2.5 * k, 2.5 * k), squeeze=False)
+    for i, y_col in enumerate(columns):
+        iy, y_edges = binned[y_col]
+        for j, x_col in enumerate(columns):
+            ix, x_edges = binned[x_col]
+            ax = axes[i, j]
+            if i == j:
+                counts = np.bincount(ix[ix >= 0], minlength=len(x_edges) - 1)
+                ax.stairs(counts, x_edges, fill=True, alpha=0.7)
+            else:
+                counts, _ = cell_grid(ix, iy, (len(x_edges) - 1, len(y_edges) - 1))
+                show_grid(ax, counts, None, x_edges, y_edges)
+            ax.set_xlabel(x_col if i == k - 1 else '')
+            ax.set_ylabel(y_col if j == 0 else '')
+    fig.tight_layout()
+    return fig
+
+
+# 18. Price Distribution
+def plot_price_distribution(df, path, dpi=DPI):
+    plt.figure(figsize=(10, 6))
+    plt.hist(df['price'], bins=50, edgecolor='black', alpha=0.7, color='skyblue')
+    plt.xlabel('Price (PKR)', fontsize=12)
+    plt.ylabel('Frequency', fontsize=12)
+    plt.title('Distribution of House Prices', fontsize=14, fontweight='bold')
+    plt.axvline(df['price'].mean(), color='red', linestyle='--', linewidth=2, label=f'Mean: PKR {df["price"].mean():,.0f}')
+    plt.axvline(df['price'].median(), color='green', linestyle='--', linewidth=2, label=f'Median: PKR {df["price"].median():,.0f}')
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+# 19. Categorical Feature Analysis
+def plot_categorical_distribution(df, path, dpi=DPI):
+    categorical_cols = categorical_columns(df)
+    n_cats = len(categorical_cols)
+    n_cols = 3
+    n_rows = (n_cats + n_cols - 1) // n_cols  # Ceiling division
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(18, 6*n_rows))
+    axes = np.array(axes).flatten()  # Ensure axes is always a 1D array
+    for idx, col in enumerate(categorical_cols):
+        value_counts = yes_no_labels(df[col]).value_counts()
+        axes[idx].bar(value_counts.index, value_counts.values, color='steelblue')
+        axes[idx].set_title(f'{col} Distribution', fontsize=12, fontweight='bold')
+        axes[idx].set_xlabel(col)
+        axes[idx].set_ylabel('Count')
+        axes[idx].tick_params(axis='x', rotation=45)
+    # Hide unused subplots
+    for idx in range(n_cats, len(axes)):
+        axes[idx].axis('off')
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+# 20. Price by Categorical Features
+def plot_price_by_categorical(df, path, dpi=DPI):
+    categorical_cols = categorical_columns(df)
+    n_cats = len(categorical_cols)
+    n_cols = 3
+    n_rows = (n_cats + n_cols - 1) // n_cols  # Ceiling division
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(18, 6*n_rows))
+    axes = np.array(axes).flatten()  # Ensure axes is always a 1D array
+    for idx, col in enumerate(categorical_cols):
+        price_by_cat = df.groupby(yes_no_labels(df[col]))['price'].mean().sort_values(ascending=False)
+        axes[idx].bar(price_by_cat.index, price_by_cat.values, color='coral')
+        axes[idx].set_title(f'Average Price by {col}', fontsize=12, fontweight='bold')
+        axes[idx].set_xlabel(col)
+        axes[idx].set_ylabel('Average Price (PKR)')
+        axes[idx].tick_params(axis='x', rotation=45)
+        # Add value labels on bars
+        for i, v in enumerate(price_by_cat.values):
+            axes[idx].text(i, v, f'PKR {v/1e6:.1f}M', ha='center', va='bottom', fontsize=9)
+    # Hide unused subplots
+    for idx in range(n_cats, len(axes)):
+        axes[idx].axis('off')
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+# (section number, progress label, plot function, file name, saved message)
+PLOTS = [
+    (13, 'Histograms', plot_histograms, 'histograms.png', 'Histograms'),
+    (14, 'Box Plots', plot_boxplots, 'boxplots.png', 'Box plots'),
+    (15, 'Correlation Heatmap', plot_correlation_heatmap, 'correlation_heatmap.png', 'Correlation heatmap'),
+    (16, 'Scatter Plots', plot_scatter, 'scatter_plots.png', 'Scatter plots'),
+    (17, 'Pair Plot (sample)', plot_pairplot, 'pairplot.png', 'Pair plot'),
+    (18, 'Price Distribution', plot_price_distribution, 'price_distribution.png', 'Price distribution'),
+    (19, 'Categorical Feature Analysis', plot_categorical_distribution, 'categorical_distribution.png',
+     'Categorical distributions'),
+    (20, 'Price by Categorical Features', plot_price_by_categorical, 'price_by_categorical.png',
+     'Price by categorical features'),
+]
+# Progress labels of the plots whose content changes above DENSITY_THRESHOLD rows
+DENSITY_LABELS = {17: 'Pair Plot (density of all rows)'}
+
+
+def plot_label(section, label, n_rows, density_threshold=DENSITY_THRESHOLD):
+    """The PLOTS progress label, or its DENSITY_LABELS variant when the plot bins every row"""
+    return DENSITY_LABELS.get(section, label) if n_rows > density_threshold else label
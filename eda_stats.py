@@ -0,0 +1,156 @@
+"""
+Housing Price Prediction - Vectorized EDA Statistics
+Computes the per-column statistics of the EDA report (moments, mode, quantiles, IQR
+outlier bounds and counts) for every numeric column from one sort of a 2-D array,
+instead of a separate pandas scan per statistic and an outlier sub-frame per column.
+
+The numeric columns are copied once into a column-major array of their common dtype and
+sorted in place. Min, max, quartiles and median are then row lookups, the mode is the
+longest run of equal values, and the outlier counts are binary searches. Results match
+pandas (quantiles interpolate linearly, std has ddof=1, skew is the adjusted
+Fisher-Pearson coefficient, NaNs are skipped).
+"""
+
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+IQR_MULTIPLIER = 1.5
+
+
+@dataclass
+class NumericSummary:
+    """Statistics of the numeric columns, one array entry per column"""
+    columns: list
+    count: np.ndarray
+    mean: np.ndarray
+    std: np.ndarray
+    skew: np.ndarray
+    min: list
+    q1: np.ndarray
+    median: np.ndarray
+    q3: np.ndarray
+    max: list
+    mode: list
+    lower_bound: np.ndarray
+    upper_bound: np.ndarray
+    n_outliers: np.ndarray
+
+    @property
+    def iqr(self):
+        return self.q3 - self.q1
+
+    @property
+    def outlier_percent(self):
+        return self.n_outliers / np.maximum(self.count, 1) * 100
+
+    def __getitem__(self, col):
+        """The statistics of one column as a dict"""
+        j = self.columns.index(col)
+        return {
+            'count': int(self.count[j]), 'mean': self.mean[j], 'std': self.std[j], 'skew': self.skew[j],
+            'min': self.min[j], 'q1': self.q1[j], 'median': self.median[j], 'q3': self.q3[j],
+            'max': self.max[j], 'mode': self.mode[j], 'iqr': self.iqr[j], 'lower_bound': self.lower_bound[j],
+            'upper_bound': self.upper_bound[j], 'n_outliers': int(self.n_outliers[j]),
+            'outlier_percent': self.outlier_percent[j]
+        }
+
+    def to_frame(self):
+        """A DataFrame laid out like DataFrame.describe(), extended with the other statistics"""
+        rows = {
+            'count': self.count, 'mean': self.mean, 'std': self.std, 'min': self.min, '25%': self.q1,
+            '50%': self.median, '75%': self.q3, 'max': self.max, 'mode': self.mode, 'skew': self.skew,
+            'IQR': self.iqr, 'lower bound': self.lower_bound, 'upper bound': self.upper_bound,
+            'outliers': self.n_outliers, 'outliers %': self.outlier_percent
+        }
+        return pd.DataFrame({name: np.asarray(values, dtype=np.float64) for name, values in rows.items()},
+                            index=self.columns).T
+
+
+def _interpolate(low, high, fraction):
+    """Linear interpolation as numpy.quantile computes it (exact at both ends)"""
+    diff = high - low
+    return np.where(fraction >= 0.5, high - diff * (1 - fraction), low + diff * fraction)
+
+
+def _sorted_quantile(S, count, q):
+    """Quantile q of each column of the sorted array S (the first count[j] rows of column j)"""
+    position = q * (count - 1)
+    below = np.floor(position).astype(np.intp)
+    above = np.minimum(below + 1, count - 1)
+    cols = np.arange(S.shape[1])
+    return _interpolate(S[below, cols].astype(np.float64), S[above, cols].astype(np.float64), position - below)
+
+
+def summarize_array(X, columns, iqr_multiplier=IQR_MULTIPLIER):
+    """Summarize the columns of a 2-D array (the array is sorted in place along axis 0)"""
+    S = X
+    S.sort(axis=0)
+    n_rows, n_cols = S.shape
+    if np.issubdtype(S.dtype, np.floating):
+        count = n_rows - np.isnan(S).sum(axis=0)  # NaNs sort to the end
+    else:
+        count = np.full(n_cols, n_rows)
+
+    mean, std, skew = np.full(n_cols, np.nan), np.full(n_cols, np.nan), np.full(n_cols, np.nan)
+    minimum, maximum, mode = [np.nan] * n_cols, [np.nan] * n_cols, [np.nan] * n_cols
+    n_outliers = np.zeros(n_cols, dtype=np.int64)
+    valid = count > 0
+    q1, median, q3 = (np.full(n_cols, np.nan) for _ in range(3))
+    if valid.any():
+        safe_count = np.maximum(count, 1)
+        q1 = np.where(valid, _sorted_quantile(S, safe_count, 0.25), np.nan)
+        median = np.where(valid, _sorted_quantile(S, safe_count, 0.5), np.nan)
+        q3 = np.where(valid, _sorted_quantile(S, safe_count, 0.75), np.nan)
+    iqr = q3 - q1
+    lower_bound, upper_bound = q1 - iqr_multiplier * iqr, q3 + iqr_multiplier * iqr
+
+    for j in range(n_cols):
+        n = int(count[j])
+        if n == 0:
+            continue
+        values = S[:n, j]
+        minimum[j], maximum[j] = values[0].item(), values[-1].item()
+
+        # Mode: the longest run of equal values (the smallest value among ties, like pandas)
+        starts = np.concatenate([[0], np.flatnonzero(values[1:] != values[:-1]) + 1])
+        lengths = np.diff(np.append(starts, n))
+        mode[j] = values[starts[np.argmax(lengths)]].item()
+
+        # Outliers: values strictly outside the bounds, found by binary search
+        n_outliers[j] = (np.searchsorted(values, lower_bound[j], side='left')
+                         + n - np.searchsorted(values, upper_bound[j], side='right'))
+
+        # Central moments (skew as pandas: adjusted Fisher-Pearson, 0 for a constant column)
+        centered = values.astype(np.float64)
+        mean[j] = centered.mean()
+        centered -= mean[j]
+        m2 = np.dot(centered, centered)
+        m3 = np.dot(centered * centered, centered)
+        m2 = 0.0 if abs(m2) < 1e-14 else m2
+        m3 = 0.0 if abs(m3) < 1e-14 else m3
+        if n > 1:
+            std[j] = np.sqrt(m2 / (n - 1))
+        if n > 2:
+            skew[j] = 0.0 if m2 == 0 else n * (n - 1) ** 0.5 / (n - 2) * m3 / m2 ** 1.5
+
+    return NumericSummary(list(columns), count, mean, std, skew, minimum, q1, median, q3, maximum, mode,
+                          lower_bound, upper_bound, n_outliers)
+
+
+def summarize_numeric(df, columns=None, iqr_multiplier=IQR_MULTIPLIER):
+    """Summarize the numeric columns of a DataFrame (all of them by default)"""
+    columns = list(df.select_dtypes(include=[np.number]).columns if columns is None else columns)
+    dtype = np.result_type(*[df[col].dtype for col in columns]) if columns else np.float64
+    # Column-major, so each column is sorted in one contiguous block
+    X = np.empty((len(df), len(columns)), dtype=dtype, order='F')
+    for j, col in enumerate(columns):
+        X[:, j] = df[col].to_numpy()
+    summary = summarize_array(X, columns, iqr_multiplier)
+    # Report min, max and mode in each column's own type (e.g. ints stay ints)
+    for j, col in enumerate(columns):
+        kind = df[col].dtype.type
+        for values in (summary.min, summary.max, summary.mode):
+            if not pd.isna(values[j]):
+                values[j] = kind(values[j]).item()
+    return summary
@@ -0,0 +1,114 @@
+"""
+Housing Price Prediction - Array-Backed Tree Ensemble Inference
+Evaluates a fitted RandomForestRegressor (or a single DecisionTreeRegressor) from flat
+NumPy node arrays, walking every tree for a whole batch of rows one level at a time.
+"""
+
+import numpy as np
+
+from model_bundle import tree_arrays
+
+# Upper bound on rows x trees handled per block, to keep the node-index matrix small
+BLOCK_CELLS = 1 << 15
+
+
+class ForestEngine:
+    """A tree ensemble flattened into contiguous node arrays.
+
+    All trees share one set of arrays (feature, threshold, left, right, value); child
+    indices are absolute and -1 marks a leaf. Predictions match sklearn exactly: inputs
+    are compared as float32 like sklearn's trees, and per-tree outputs are summed in tree
+    order before dividing by the number of trees, as RandomForestRegressor.predict does.
+    """
+
+    def __init__(self, tree_offsets, feature, threshold, left, right, value):
+        # int32 node indices halve the memory traffic of the per-level gathers
+        index_dtype = np.int32 if len(left) < np.iinfo(np.int32).max // 2 else np.int64
+        self.roots = np.asarray(tree_offsets[:-1], dtype=index_dtype)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.n_trees = len(self.roots)
+        # Leaves point to themselves so finished rows stay put while deeper trees continue
+        is_leaf = np.asarray(left) == -1
+        nodes = np.arange(len(is_leaf), dtype=index_dtype)
+        self.left = np.where(is_leaf, nodes, left).astype(index_dtype)
+        self.right = np.where(is_leaf, nodes, right).astype(index_dtype)
+        self.feature = np.where(is_leaf, 0, feature).astype(index_dtype)
+        # children[2 * node + went_right] is the next node, so one gather replaces two
+        self.children = np.column_stack([self.left, self.right]).ravel()
+        self.max_depth = self._max_depth(is_leaf)
+
+    @classmethod
+    def from_estimator(cls, model):
+        """Flatten a fitted RandomForestRegressor or DecisionTreeRegressor"""
+        return cls.from_arrays(tree_arrays(model))
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Build from tree_* arrays, e.g. those stored in a model bundle"""
+        return cls(arrays['tree_offsets'], arrays['tree_feature'], arrays['tree_threshold'],
+                   arrays['tree_left'], arrays['tree_right'], arrays['tree_value'])
+
+    def compiled_arrays(self):
+        """Return the arrays apply() needs, for sharing the engine between processes"""
+        return {'roots': self.roots, 'feature': self.feature, 'threshold': self.threshold,
+                'children': self.children, 'value': self.value}
+
+    @classmethod
+    def from_compiled(cls, arrays, max_depth):
+        """Rebuild from compiled_arrays() without copying them (e.g. shared-memory views)"""
+        engine = cls.__new__(cls)
+        engine.roots = arrays['roots']
+        engine.feature = arrays['feature']
+        engine.threshold = arrays['threshold']
+        engine.children = arrays['children']
+        engine.value = arrays['value']
+        engine.left = engine.children[0::2]
+        engine.right = engine.children[1::2]
+        engine.n_trees = len(engine.roots)
+        engine.max_depth = max_depth
+        return engine
+
+    def _max_depth(self, is_leaf):
+        """Number of levels needed for every root to reach a leaf"""
+        depth = 0
+        frontier = self.roots[~is_leaf[self.roots]]
+        while len(frontier):
+            depth += 1
+            children = np.concatenate([self.left[frontier], self.right[frontier]])
+            frontier = children[~is_leaf[children]]
+        return depth
+
+    def apply(self, X):
+        """Return the leaf index reached in every tree, shape (n_rows, n_trees)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        leaves = np.empty((n_rows, self.n_trees), dtype=np.int64)
+        block = max(1, BLOCK_CELLS // self.n_trees)
+        for start in range(0, n_rows, block):
+            X_block = X[start:start + block]
+            # Offset of each row in the flattened block, broadcast against the tree axis
+            row_offset = (np.arange(len(X_block), dtype=self.roots.dtype) * n_features)[:, None]
+            X_flat = X_block.ravel()
+            nodes = np.broadcast_to(self.roots, (len(X_block), self.n_trees)).copy()
+            for _ in range(self.max_depth):
+                went_right = X_flat[row_offset + self.feature[nodes]] > self.threshold[nodes]
+                nodes = self.children[2 * nodes + went_right]
+            leaves[start:start + block] = nodes
+        return leaves
+
+    def predict_trees(self, X):
+        """Return every tree's prediction, shape (n_rows, n_trees)"""
+        return self.value[self.apply(X)]
+
+    def predict(self, X):
+        """Return the ensemble mean prediction, identical to model.predict"""
+        return self.aggregate(self.predict_trees(X))
+
+    def aggregate(self, per_tree):
+        """Average per-tree predictions in tree order (sklearn's accumulation order)"""
+        total = np.zeros(len(per_tree))
+        for t in range(self.n_trees):
+            total += per_tree[:, t]
+        total /= self.n_trees
+        return total
@@ -1,460 +1,530 @@
 """
 Housing Price Prediction - EDA and Model Training Script
 This script performs comprehensive EDA and trains ML models for house price prediction.
+
+The work is split into named stages (eda, plots, preprocess, train, export). Each stage
+is fingerprinted by its code and inputs and cached under .cache/stages/, so a rerun only
+recomputes the stages that changed (see stage_cache.py):
+
+    python housing_analysis.py                  # reuse unchanged stages
+    python housing_analysis.py --rerun train    # force some stages to run again
+    python housing_analysis.py --no-cache       # run everything, write no cache
 """
 
+import argparse
+import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
 from sklearn.tree import DecisionTreeRegressor
-from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
-import pickle
+import eda_stats
+import model_bundle
+import model_training
+import prediction
+from eda_stats import summarize_numeric
+from eda_plots import (DENSITY_BINS, DENSITY_THRESHOLD, DPI, PLOT_DIR, PLOT_STYLE, PLOTS, SCATTER_PANELS, apply_style,
+                       bin_index, categorical_columns, cell_grid, density_grid, draw_density, numerical_columns,
+                       plot_density_pairs, plot_label, show_grid, use_headless_backend)
+import housing_data
+from housing_data import FLAG_COLUMNS, load_housing_data, memory_usage, yes_no_labels
+from prediction import (DEFAULT_INTERVAL_ALPHA, FURNISHING_COL, FURNISHING_PREFIX, FeatureEncoder, FusedLinearPredictor,
+                        conformal_quantile)
+from model_bundle import BUNDLE_ROOT, file_sha256, latest_version, save_bundle
+from model_training import (N_JOBS_ENV, cross_validate_candidates, prepare_folds, summarize_cv, train_candidates,
+                            worker_budget)
+from stage_cache import StageRunner
 import warnings
 warnings.filterwarnings('ignore')
 
-# Set style for better visualizations
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 6)
+# One 80/20 split of 545 rows is noisy; select on repeated k-fold scores instead
+CV_FOLDS = 5
+CV_REPEATS = 3
+
+
+def candidate_models():
+    """The models compared in the train stage (their parameters are part of its fingerprint)"""
+    return {
+        'Linear Regression': LinearRegression(),
+        'Random Forest Regressor': RandomForestRegressor(n_estimators=100, random_state=42, max_depth=10),
+        'Decision Tree Regressor': DecisionTreeRegressor(random_state=42, max_depth=10),
+        # Features binned into at most 255 histogram bins; boosting stops once the
+        # internal validation score has not improved for 10 iterations
+        'Hist Gradient Boosting Regressor': HistGradientBoostingRegressor(
+            max_iter=500, learning_rate=0.05, early_stopping=True, validation_fraction=0.1,
+            n_iter_no_change=10, random_state=42)
+    }
 
-# Load the dataset
-print("Loading dataset...")
-df = pd.read_csv('Housing.csv')
 
 # ============================================================================
 # EXPLORATORY DATA ANALYSIS (EDA)
 # ============================================================================
 
-print("\n" + "="*80)
-print("EXPLORATORY DATA ANALYSIS (EDA)")
-print("="*80)
-
-# 1. Dataset Shape and Structure
-print("\n1. DATASET SHAPE AND STRUCTURE")
-print("-" * 80)
-print(f"Dataset Shape: {df.shape}")
-print(f"Number of Rows: {df.shape[0]}")
-print(f"Number of Columns: {df.shape[1]}")
-print(f"\nColumn Names: {list(df.columns)}")
-
-# 2. Data Types
-print("\n2. DATA TYPES")
-print("-" * 80)
-print(df.dtypes)
-
-# 3. First Few Rows
-print("\n3. FIRST FEW ROWS")
-print("-" * 80)
-print(df.head())
-
-# 4. Summary Statistics
-print("\n4. SUMMARY STATISTICS")
-print("-" * 80)
-print(df.describe())
-
-# 5. Missing Value Analysis
-print("\n5. MISSING VALUE ANALYSIS")
-print("-" * 80)
-missing_values = df.isnull().sum()
-missing_percent = (missing_values / len(df)) * 100
-missing_df = pd.DataFrame({
-    'Missing Count': missing_values,
-    'Missing Percentage': missing_percent
-})
-print(missing_df[missing_df['Missing Count'] > 0])
-if missing_df[missing_df['Missing Count'] > 0].empty:
-    print("No missing values found in the dataset!")
-
-# 6. Unique Value Counts
-print("\n6. UNIQUE VALUE COUNTS")
-print("-" * 80)
-for col in df.columns:
-    unique_count = df[col].nunique()
-    print(f"{col}: {unique_count} unique values")
-    if unique_count <= 10:
-        print(f"  Values: {df[col].unique()}")
-
-# 7. Feature Distribution Analysis
-print("\n7. FEATURE DISTRIBUTION ANALYSIS")
-print("-" * 80)
-numerical_cols = df.select_dtypes(include=[np.number]).columns
-print(f"Numerical Features: {list(numerical_cols)}")
-categorical_cols = df.select_dtypes(include=['object']).columns
-print(f"Categorical Features: {list(categorical_cols)}")
-
-# Calculate statistics for numerical features
-print("\nNumerical Feature Statistics:")
-for col in numerical_cols:
-    print(f"\n{col}:")
-    print(f"  Mean: {df[col].mean():.2f}")
-    print(f"  Median: {df[col].median():.2f}")
-    print(f"  Mode: {df[col].mode()[0] if not df[col].mode().empty else 'N/A'}")
-    print(f"  Std Dev: {df[col].std():.2f}")
-    print(f"  Min: {df[col].min()}")
-    print(f"  Max: {df[col].max()}")
-
-# 8. Skewness Analysis
-print("\n8. SKEWNESS ANALYSIS")
-print("-" * 80)
-for col in numerical_cols:
-    skewness = df[col].skew()
-    print(f"{col}: {skewness:.4f} ({'Right skewed' if skewness > 0 else 'Left skewed' if skewness < 0 else 'Normal'})")
-
-# 9. Correlation Matrix
-print("\n9. CORRELATION MATRIX")
-print("-" * 80)
-correlation_matrix = df[numerical_cols].corr()
-print(correlation_matrix)
-
-# 10. Price Analysis
-print("\n10. PRICE ANALYSIS")
-print("-" * 80)
-print(f"Price Statistics:")
-print(f"  Mean Price: PKR {df['price'].mean():,.2f}")
-print(f"  Median Price: PKR {df['price'].median():,.2f}")
-print(f"  Min Price: PKR {df['price'].min():,.2f}")
-print(f"  Max Price: PKR {df['price'].max():,.2f}")
-print(f"  Price Range: PKR {df['price'].max() - df['price'].min():,.2f}")
-
-# 11. Grouped Aggregations
-print("\n11. GROUPED AGGREGATIONS")
-print("-" * 80)
-print("\nAverage Price by Furnishing Status:")
-print(df.groupby('furnishingstatus')['price'].mean().sort_values(ascending=False))
-
-print("\nAverage Price by Number of Bedrooms:")
-print(df.groupby('bedrooms')['price'].mean().sort_values(ascending=False))
-
-print("\nAverage Price by Main Road Access:")
-print(df.groupby('mainroad')['price'].mean())
-
-print("\nAverage Price by Preferred Area:")
-print(df.groupby('prefarea')['price'].mean())
-
-# 12. Outlier Detection (using IQR method)
-print("\n12. OUTLIER DETECTION")
-print("-" * 80)
-for col in numerical_cols:
-    Q1 = df[col].quantile(0.25)
-    Q3 = df[col].quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
-    outliers = df[(df[col] < lower_bound) | (df[col] > upper_bound)]
-    print(f"{col}: {len(outliers)} outliers ({len(outliers)/len(df)*100:.2f}%)")
+def run_eda(df):
+    """Print the console EDA report (sections 1-12)"""
+    # 1. Dataset Shape and Structure
+    print("\n1. DATASET SHAPE AND STRUCTURE")
+    print("-" * 80)
+    print(f"Dataset Shape: {df.shape}")
+    print(f"Number of Rows: {df.shape[0]}")
+    print(f"Number of Columns: {df.shape[1]}")
+    print(f"\nColumn Names: {list(df.columns)}")
+
+    # 2. Data Types
+    print("\n2. DATA TYPES")
+    print("-" * 80)
+    print(df.dtypes)
+    print(f"\nMemory Usage: {memory_usage(df) / 1024:,.1f} KB")
+
+    # 3. First Few Rows
+    print("\n3. FIRST FEW ROWS")
+    print("-" * 80)
+    print(df.head())
+
+    # 4. Summary Statistics
+    print("\n4. SUMMARY STATISTICS")
+    print("-" * 80)
+    print(df.describe())
+
+    # 5. Missing Value Analysis
+    print("\n5. MISSING VALUE ANALYSIS")
+    print("-" * 80)
+    missing_values = df.isnull().sum()
+    missing_percent = (missing_values / len(df)) * 100
+    missing_df = pd.DataFrame({
+        'Missing Count': missing_values,
+        'Missing Percentage': missing_percent
+    })
+    print(missing_df[missing_df['Missing Count'] > 0])
+    if missing_df[missing_df['Missing Count'] > 0].empty:
+        print("No missing values found in the dataset!")
+
+    # 6. Unique Value Counts
+    print("\n6. UNIQUE VALUE COUNTS")
+    print("-" * 80)
+    for col in df.columns:
+        unique_count = df[col].nunique()
+        print(f"{col}: {unique_count} unique values")
+        if unique_count <= 10:
+            print(f"  Values: {df[col].unique()}")
+
+    # 7. Feature Distribution Analysis
+    print("\n7. FEATURE DISTRIBUTION ANALYSIS")
+    print("-" * 80)
+    numerical_cols = df.select_dtypes(include=[np.number]).columns
+    print(f"Numerical Features: {list(numerical_cols)}")
+    categorical_cols = categorical_columns(df)
+    print(f"Categorical Features: {list(categorical_cols)}")
+
+    # Calculate statistics for numerical features (all of sections 7, 8 and 12 from one sort)
+    stats = summarize_numeric(df, numerical_cols)
+    print("\nNumerical Feature Statistics:")
+    for col in numerical_cols:
+        col_stats = stats[col]
+        print(f"\n{col}:")
+        print(f"  Mean: {col_stats['mean']:.2f}")
+        print(f"  Median: {col_stats['median']:.2f}")
+        print(f"  Mode: {col_stats['mode'] if col_stats['count'] else 'N/A'}")
+        print(f"  Std Dev: {col_stats['std']:.2f}")
+        print(f"  Min: {col_stats['min']}")
+        print(f"  Max: {col_stats['max']}")
+
+    # 8. Skewness Analysis
+    print("\n8. SKEWNESS ANALYSIS")
+    print("-" * 80)
+    for col in numerical_cols:
+        skewness = stats[col]['skew']
+        print(f"{col}: {skewness:.4f} ({'Right skewed' if skewness > 0 else 'Left skewed' if skewness < 0 else 'Normal'})")
+
+    # 9. Correlation Matrix
+    print("\n9. CORRELATION MATRIX")
+    print("-" * 80)
+    correlation_matrix = df[numerical_cols].corr()
+    print(correlation_matrix)
+
+    # 10. Price Analysis
+    print("\n10. PRICE ANALYSIS")
+    print("-" * 80)
+    print(f"Price Statistics:")
+    print(f"  Mean Price: PKR {df['price'].mean():,.2f}")
+    print(f"  Median Price: PKR {df['price'].median():,.2f}")
+    print(f"  Min Price: PKR {df['price'].min():,.2f}")
+    print(f"  Max Price: PKR {df['price'].max():,.2f}")
+    print(f"  Price Range: PKR {df['price'].max() - df['price'].min():,.2f}")
+
+    # 11. Grouped Aggregations
+    print("\n11. GROUPED AGGREGATIONS")
+    print("-" * 80)
+    print("\nAverage Price by Furnishing Status:")
+    print(df.groupby('furnishingstatus')['price'].mean().sort_values(ascending=False))
+
+    print("\nAverage Price by Number of Bedrooms:")
+    print(df.groupby('bedrooms')['price'].mean().sort_values(ascending=False))
+
+    print("\nAverage Price by Main Road Access:")
+    print(df.groupby(yes_no_labels(df['mainroad']))['price'].mean())
+
+    print("\nAverage Price by Preferred Area:")
+    print(df.groupby(yes_no_labels(df['prefarea']))['price'].mean())
+
+    # 12. Outlier Detection (using IQR method)
+    print("\n12. OUTLIER DETECTION")
+    print("-" * 80)
+    for col in numerical_cols:
+        n_outliers = stats[col]['n_outliers']
+        print(f"{col}: {n_outliers} outliers ({n_outliers/len(df)*100:.2f}%)")
+
 
 # ============================================================================
 # DATA VISUALIZATIONS
 # ============================================================================
 
-print("\n" + "="*80)
-print("GENERATING VISUALIZATIONS...")
-print("="*80)
+def render_plot(df, section, label, plot_func, path, message, dpi, style):
+    """Draw one EDA figure (sections 13-20) to path"""
+    print(f"\n{section}. Generating {label}...")
+    apply_style(style)
+    plot_func(df, path, dpi=dpi)
+    print(f"✓ {message} saved to {path}")
 
-# Create a directory for saving plots
-import os
-os.makedirs('plots', exist_ok=True)
-
-# 13. Histograms for Numerical Features
-print("\n13. Generating Histograms...")
-fig, axes = plt.subplots(2, 3, figsize=(18, 10))
-axes = axes.ravel()
-for idx, col in enumerate(numerical_cols):
-    axes[idx].hist(df[col], bins=30, edgecolor='black', alpha=0.7)
-    axes[idx].set_title(f'Distribution of {col}', fontsize=12, fontweight='bold')
-    axes[idx].set_xlabel(col)
-    axes[idx].set_ylabel('Frequency')
-plt.tight_layout()
-plt.savefig('plots/histograms.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✓ Histograms saved to plots/histograms.png")
-
-# 14. Box Plots for Outlier Detection
-print("\n14. Generating Box Plots...")
-fig, axes = plt.subplots(2, 3, figsize=(18, 10))
-axes = axes.ravel()
-for idx, col in enumerate(numerical_cols):
-    axes[idx].boxplot(df[col])
-    axes[idx].set_title(f'Box Plot of {col}', fontsize=12, fontweight='bold')
-    axes[idx].set_ylabel(col)
-plt.tight_layout()
-plt.savefig('plots/boxplots.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✓ Box plots saved to plots/boxplots.png")
-
-# 15. Correlation Heatmap
-print("\n15. Generating Correlation Heatmap...")
-plt.figure(figsize=(10, 8))
-sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0, 
-            square=True, linewidths=1, cbar_kws={"shrink": 0.8}, fmt='.2f')
-plt.title('Correlation Matrix Heatmap', fontsize=14, fontweight='bold', pad=20)
-plt.tight_layout()
-plt.savefig('plots/correlation_heatmap.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✓ Correlation heatmap saved to plots/correlation_heatmap.png")
-
-# 16. Scatter Plots for Feature Relationships
-print("\n16. Generating Scatter Plots...")
-fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-# Price vs Area
-axes[0, 0].scatter(df['area'], df['price'], alpha=0.5)
-axes[0, 0].set_xlabel('Area (sq ft)')
-axes[0, 0].set_ylabel('Price (PKR)')
-axes[0, 0].set_title('Price vs Area')
-
-# Price vs Bedrooms
-axes[0, 1].scatter(df['bedrooms'], df['price'], alpha=0.5)
-axes[0, 1].set_xlabel('Number of Bedrooms')
-axes[0, 1].set_ylabel('Price (PKR)')
-axes[0, 1].set_title('Price vs Bedrooms')
-
-# Price vs Bathrooms
-axes[1, 0].scatter(df['bathrooms'], df['price'], alpha=0.5)
-axes[1, 0].set_xlabel('Number of Bathrooms')
-axes[1, 0].set_ylabel('Price (PKR)')
-axes[1, 0].set_title('Price vs Bathrooms')
-
-# Price vs Parking
-axes[1, 1].scatter(df['parking'], df['price'], alpha=0.5)
-axes[1, 1].set_xlabel('Number of Parking Spaces')
-axes[1, 1].set_ylabel('Price (PKR)')
-axes[1, 1].set_title('Price vs Parking')
-plt.tight_layout()
-plt.savefig('plots/scatter_plots.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✓ Scatter plots saved to plots/scatter_plots.png")
-
-# 17. Pairwise Feature Relationships
-print("\n17. Generating Pair Plot (sample)...")
-# Sample data for pair plot (too many points can be slow)
-sample_df = df.sample(min(100, len(df)), random_state=42)
-sns.pairplot(sample_df[numerical_cols], diag_kind='kde')
-plt.savefig('plots/pairplot.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✓ Pair plot saved to plots/pairplot.png")
-
-# 18. Price Distribution
-print("\n18. Generating Price Distribution...")
-plt.figure(figsize=(10, 6))
-plt.hist(df['price'], bins=50, edgecolor='black', alpha=0.7, color='skyblue')
-plt.xlabel('Price (PKR)', fontsize=12)
-plt.ylabel('Frequency', fontsize=12)
-plt.title('Distribution of House Prices', fontsize=14, fontweight='bold')
-plt.axvline(df['price'].mean(), color='red', linestyle='--', linewidth=2, label=f'Mean: PKR {df["price"].mean():,.0f}')
-plt.axvline(df['price'].median(), color='green', linestyle='--', linewidth=2, label=f'Median: PKR {df["price"].median():,.0f}')
-plt.legend()
-plt.tight_layout()
-plt.savefig('plots/price_distribution.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✓ Price distribution saved to plots/price_distribution.png")
-
-# 19. Categorical Feature Analysis
-print("\n19. Generating Categorical Feature Analysis...")
-n_cats = len(categorical_cols)
-n_cols = 3
-n_rows = (n_cats + n_cols - 1) // n_cols  # Ceiling division
-fig, axes = plt.subplots(n_rows, n_cols, figsize=(18, 6*n_rows))
-axes = np.array(axes).flatten()  # Ensure axes is always a 1D array
-for idx, col in enumerate(categorical_cols):
-    value_counts = df[col].value_counts()
-    axes[idx].bar(value_counts.index, value_counts.values, color='steelblue')
-    axes[idx].set_title(f'{col} Distribution', fontsize=12, fontweight='bold')
-    axes[idx].set_xlabel(col)
-    axes[idx].set_ylabel('Count')
-    axes[idx].tick_params(axis='x', rotation=45)
-# Hide unused subplots
-for idx in range(n_cats, len(axes)):
-    axes[idx].axis('off')
-plt.tight_layout()
-plt.savefig('plots/categorical_distribution.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✓ Categorical distributions saved to plots/categorical_distribution.png")
-
-# 20. Price by Categorical Features
-print("\n20. Generating Price by Categorical Features...")
-n_cats = len(categorical_cols)
-n_cols = 3
-n_rows = (n_cats + n_cols - 1) // n_cols  # Ceiling division
-fig, axes = plt.subplots(n_rows, n_cols, figsize=(18, 6*n_rows))
-axes = np.array(axes).flatten()  # Ensure axes is always a 1D array
-for idx, col in enumerate(categorical_cols):
-    price_by_cat = df.groupby(col)['price'].mean().sort_values(ascending=False)
-    axes[idx].bar(price_by_cat.index, price_by_cat.values, color='coral')
-    axes[idx].set_title(f'Average Price by {col}', fontsize=12, fontweight='bold')
-    axes[idx].set_xlabel(col)
-    axes[idx].set_ylabel('Average Price (PKR)')
-    axes[idx].tick_params(axis='x', rotation=45)
-    # Add value labels on bars
-    for i, v in enumerate(price_by_cat.values):
-        axes[idx].text(i, v, f'PKR {v/1e6:.1f}M', ha='center', va='bottom', fontsize=9)
-# Hide unused subplots
-for idx in range(n_cats, len(axes)):
-    axes[idx].axis('off')
-plt.tight_layout()
-plt.savefig('plots/price_by_categorical.png', dpi=300, bbox_inches='tight')
-plt.close()
-print("✓ Price by categorical features saved to plots/price_by_categorical.png")
-
-print("\n" + "="*80)
-print("EDA COMPLETE! All visualizations saved to 'plots' directory.")
-print("="*80)
 
 # ============================================================================
 # DATA PREPROCESSING
 # ============================================================================
 
-print("\n" + "="*80)
-print("DATA PREPROCESSING")
-print("="*80)
+def feature_names(df):
+    """Training column order: the inputs as they appear, with furnishingstatus one-hot
+    encoded after them (first category dropped, as pd.get_dummies(drop_first=True))"""
+    furnishing = df[FURNISHING_COL]
+    if isinstance(furnishing.dtype, pd.CategoricalDtype):
+        categories = list(furnishing.cat.categories)
+    else:
+        categories = sorted(furnishing.dropna().unique())
+    inputs = [col for col in df.columns if col not in ('price', FURNISHING_COL)]
+    return inputs + [f'{FURNISHING_PREFIX}{value}' for value in categories[1:]]
+
+
+def scale_in_place(X, names):
+    """Standardize the columns of X in place and return the equivalent fitted StandardScaler.
+
+    Means and variances are accumulated per column in float64, so fitting needs one
+    column of scratch memory rather than StandardScaler.fit's full-size temporaries.
+    """
+    n_rows, n_features = X.shape
+    mean, var = np.empty(n_features), np.empty(n_features)
+    for j in range(n_features):
+        column = X[:, j].astype(np.float64)
+        mean[j] = column.mean()
+        column -= mean[j]
+        var[j] = np.dot(column, column) / n_rows
+    scale = np.sqrt(var)
+    scale[scale < 10 * np.finfo(np.float64).eps] = 1.0  # constant columns are left unscaled, as in sklearn
+    X -= mean
+    X /= scale
+    scaler = StandardScaler()
+    scaler.mean_, scaler.var_, scaler.scale_ = mean, var, scale
+    scaler.n_samples_seen_ = n_rows
+    scaler.n_features_in_ = n_features
+    scaler.feature_names_in_ = np.asarray(names, dtype=object)
+    return scaler
+
+
+def preprocess(df, dtype='float64', test_size=0.2, random_state=42):
+    """Encode, scale and split the dataset into one preallocated feature matrix.
+
+    The rows are written in split order (training rows first), so X_train and X_test are
+    views of X_scaled and no intermediate frames are built. dtype='float32' halves the
+    matrix for large inputs.
+    """
+    numerical_cols = numerical_columns(df)
+    categorical_cols = categorical_columns(df)
+
+    # Handle missing values (if any); the frame is only copied when something is filled
+    print("\n1. Handling Missing Values...")
+    if df.isnull().sum().sum() > 0:
+        df = df.copy()
+        # For numerical columns, fill with median
+        for col in numerical_cols:
+            if df[col].isnull().sum() > 0:
+                df[col] = df[col].fillna(df[col].median())
+        # For categorical columns, fill with mode
+        for col in categorical_cols:
+            if df[col].isnull().sum() > 0:
+                df[col] = df[col].fillna(df[col].mode()[0])
+        print("✓ Missing values handled")
+    else:
+        print("✓ No missing values to handle")
+
+    # Split the row indices first, so encoding can write the rows in split order
+    train_idx, test_idx = train_test_split(np.arange(len(df)), test_size=test_size, random_state=random_state)
+    order = np.concatenate([train_idx, test_idx])
+    positions = np.empty_like(order)
+    positions[order] = np.arange(len(order))
+
+    # Encode categorical variables
+    print("\n2. Encoding Categorical Variables...")
+    # Binary categorical variables (yes/no) - Label Encoding on the 'no'/'yes' labels, so the
+    # saved encoders keep the classes the app and the API encode with
+    label_encoders = {col: LabelEncoder().fit(yes_no_labels(df[col]).unique()) for col in FLAG_COLUMNS}
+    # Multi-category variable (furnishingstatus) - One-Hot Encoding
+    names = feature_names(df)
+    encoder = FeatureEncoder(label_encoders, names)
+    X_scaled = encoder.transform(df, out=np.empty((len(df), len(names)), dtype=dtype), rows=order)
+    y = df['price'].to_numpy(dtype=np.float64)[order]
+    print("✓ Categorical variables encoded")
+
+    print(f"\nFeatures shape: {X_scaled.shape}")
+    print(f"Target shape: {y.shape}")
+
+    # Feature Scaling, in place
+    print("\n3. Feature Scaling...")
+    scaler = scale_in_place(X_scaled, names)
+    print(f"✓ Features scaled using StandardScaler ({X_scaled.dtype}, {X_scaled.nbytes / 1e6:,.2f} MB)")
+
+    # Train-Test Split: the matrix is already in split order
+    print("\n4. Train-Test Split...")
+    print(f"Training set: {len(train_idx)} samples")
+    print(f"Testing set: {len(test_idx)} samples")
+    print("✓ Data split completed")
+
+    return {
+        'feature_names': names, 'X_scaled': X_scaled, 'y': y, 'n_train': len(train_idx), 'positions': positions,
+        'scaler': scaler, 'label_encoders': label_encoders
+    }
 
-# Create a copy for preprocessing
-df_processed = df.copy()
 
-# Handle missing values (if any)
-print("\n1. Handling Missing Values...")
-if df_processed.isnull().sum().sum() > 0:
-    # For numerical columns, fill with median
-    for col in numerical_cols:
-        if df_processed[col].isnull().sum() > 0:
-            df_processed[col].fillna(df_processed[col].median(), inplace=True)
-    # For categorical columns, fill with mode
-    for col in categorical_cols:
-        if df_processed[col].isnull().sum() > 0:
-            df_processed[col].fillna(df_processed[col].mode()[0], inplace=True)
-    print("✓ Missing values handled")
-else:
-    print("✓ No missing values to handle")
-
-# Encode categorical variables
-print("\n2. Encoding Categorical Variables...")
-label_encoders = {}
-
-# Binary categorical variables (yes/no) - use Label Encoding
-binary_cols = ['mainroad', 'guestroom', 'basement', 'hotwaterheating', 'airconditioning', 'prefarea']
-for col in binary_cols:
-    le = LabelEncoder()
-    df_processed[col] = le.fit_transform(df_processed[col])
-    label_encoders[col] = le
-
-# Multi-category variable (furnishingstatus) - use One-Hot Encoding
-df_processed = pd.get_dummies(df_processed, columns=['furnishingstatus'], prefix='furnishing', drop_first=True)
-print("✓ Categorical variables encoded")
-
-# Separate features and target
-X = df_processed.drop('price', axis=1)
-y = df_processed['price']
-
-print(f"\nFeatures shape: {X.shape}")
-print(f"Target shape: {y.shape}")
-
-# Feature Scaling
-print("\n3. Feature Scaling...")
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-X_scaled = pd.DataFrame(X_scaled, columns=X.columns)
-print("✓ Features scaled using StandardScaler")
-
-# Train-Test Split
-print("\n4. Train-Test Split...")
-X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
-print(f"Training set: {X_train.shape[0]} samples")
-print(f"Testing set: {X_test.shape[0]} samples")
-print("✓ Data split completed")
+def split_views(data):
+    """(X_train, X_test, y_train, y_test) as views of the preprocessed arrays.
+
+    Built on use rather than stored, so a preprocess result loaded from the stage cache
+    does not hold separate copies of the training and test rows.
+    """
+    n_train = data['n_train']
+    return data['X_scaled'][:n_train], data['X_scaled'][n_train:], data['y'][:n_train], data['y'][n_train:]
+
 
 # ============================================================================
 # MACHINE LEARNING MODEL TRAINING
 # ============================================================================
 
-print("\n" + "="*80)
-print("MACHINE LEARNING MODEL TRAINING")
-print("="*80)
-
-models = {
-    'Linear Regression': LinearRegression(),
-    'Random Forest Regressor': RandomForestRegressor(n_estimators=100, random_state=42, max_depth=10),
-    'Decision Tree Regressor': DecisionTreeRegressor(random_state=42, max_depth=10)
-}
-
-results = {}
-
-for name, model in models.items():
-    print(f"\nTraining {name}...")
-    model.fit(X_train, y_train)
-    
-    # Predictions
-    y_train_pred = model.predict(X_train)
-    y_test_pred = model.predict(X_test)
-    
-    # Metrics
-    train_rmse = np.sqrt(mean_squared_error(y_train, y_train_pred))
-    test_rmse = np.sqrt(mean_squared_error(y_test, y_test_pred))
-    train_r2 = r2_score(y_train, y_train_pred)
-    test_r2 = r2_score(y_test, y_test_pred)
-    train_mae = mean_absolute_error(y_train, y_train_pred)
-    test_mae = mean_absolute_error(y_test, y_test_pred)
-    
-    results[name] = {
-        'model': model,
-        'train_rmse': train_rmse,
-        'test_rmse': test_rmse,
-        'train_r2': train_r2,
-        'test_r2': test_r2,
-        'train_mae': train_mae,
-        'test_mae': test_mae
+def train(data, models, cv_folds, cv_repeats):
+    """Fit every candidate on the holdout split, cross-validate them and pick the best"""
+    X_train, X_test, y_train, y_test = split_views(data)
+
+    print(f"\nTraining {len(models)} candidate models in parallel...")
+    results, training_wall_time, model_workers, tree_jobs = train_candidates(models, X_train, y_train, X_test, y_test)
+    print(f"  Worker budget: {worker_budget()} CPU(s) -> {model_workers} model worker(s), "
+          f"{tree_jobs} thread(s) per forest/boosting model (set {N_JOBS_ENV} to change)")
+
+    for name, res in results.items():
+        print(f"\n{name}:")
+        print(f"  Training RMSE: {res['train_rmse']:,.2f}")
+        print(f"  Testing RMSE: {res['test_rmse']:,.2f}")
+        print(f"  Training R²: {res['train_r2']:.4f}")
+        print(f"  Testing R²: {res['test_r2']:.4f}")
+        print(f"  Training MAE: {res['train_mae']:,.2f}")
+        print(f"  Testing MAE: {res['test_mae']:,.2f}")
+        print(f"  Fit time: {res['fit_time']:.3f}s")
+        print(f"  Predict latency: {res['predict_latency_ms']:.3f} ms/row (single-row calls)")
+        print(f"  Artifact size: {res['artifact_bytes'] / 1024:,.1f} KB")
+
+    total_fit_time = sum(res['fit_time'] for res in results.values())
+    print(f"\n✓ Trained {len(results)} models in {training_wall_time:.2f}s wall time "
+          f"(sum of fit times {total_fit_time:.2f}s)")
+
+    # K-fold cross-validation
+    print("\n" + "="*80)
+    print("K-FOLD CROSS-VALIDATION")
+    print("="*80)
+
+    # Folds over the original row order; each fold's scaler re-standardizes its own rows
+    folds = prepare_folds(data['X_scaled'], data['y'], n_splits=cv_folds, n_repeats=cv_repeats, random_state=42,
+                          positions=data['positions'])
+    print(f"\n✓ Preprocessed {len(folds)} folds ({cv_repeats} x {cv_folds}-fold, scaler fitted per fold) "
+          f"in {sum(fold['preprocess_time'] for fold in folds):.3f}s")
+    cv_results, cv_wall_time = cross_validate_candidates(models, folds)
+    cv_summary = summarize_cv(cv_results)
+    print(f"✓ Evaluated {len(cv_results)} (model, fold) pairs in {cv_wall_time:.2f}s wall time")
+
+    print(f"\n  {'Model':<33} {'R² mean':>9} {'R² std':>8} {'mean - std':>11} {'RMSE mean':>14}")
+    for name, row in cv_summary.iterrows():
+        print(f"  {name:<33} {row['CV_R2_Mean']:>9.4f} {row['CV_R2_Std']:>8.4f} "
+              f"{row['CV_Selection_Score']:>11.4f} {row['CV_RMSE_Mean']:>14,.0f}")
+
+    cv_results.to_csv('cv_results.csv', index=False)
+    print("\n✓ Per-fold scores and timings saved to cv_results.csv")
+
+    # Select best model (highest mean cross-validated R² minus one standard deviation)
+    best_model_name = cv_summary.index[0]
+
+    print("\n" + "="*80)
+    print(f"BEST MODEL: {best_model_name}")
+    print(f"CV R² Score: {cv_summary.loc[best_model_name, 'CV_R2_Mean']:.4f} "
+          f"± {cv_summary.loc[best_model_name, 'CV_R2_Std']:.4f}")
+    print(f"Test R² Score: {results[best_model_name]['test_r2']:.4f}")
+    print(f"Test RMSE: {results[best_model_name]['test_rmse']:,.2f}")
+    print("="*80)
+
+    return {
+        'results': results,
+        'training_wall_time': training_wall_time,
+        'cv_folds': cv_folds,
+        'cv_repeats': cv_repeats,
+        'cv_summary': cv_summary,
+        'best_model_name': best_model_name
     }
-    
-    print(f"  Training RMSE: {train_rmse:,.2f}")
-    print(f"  Testing RMSE: {test_rmse:,.2f}")
-    print(f"  Training R²: {train_r2:.4f}")
-    print(f"  Testing R²: {test_r2:.4f}")
-    print(f"  Training MAE: {train_mae:,.2f}")
-    print(f"  Testing MAE: {test_mae:,.2f}")
-
-# Select best model (based on test R² score)
-best_model_name = max(results.keys(), key=lambda x: results[x]['test_r2'])
-best_model = results[best_model_name]['model']
-
-print("\n" + "="*80)
-print(f"BEST MODEL: {best_model_name}")
-print(f"Test R² Score: {results[best_model_name]['test_r2']:.4f}")
-print(f"Test RMSE: {results[best_model_name]['test_rmse']:,.2f}")
-print("="*80)
-
-# Save the best model and preprocessing objects
-print("\nSaving model and preprocessing objects...")
-with open('model.pkl', 'wb') as f:
-    pickle.dump(best_model, f)
-
-with open('scaler.pkl', 'wb') as f:
-    pickle.dump(scaler, f)
-
-with open('label_encoders.pkl', 'wb') as f:
-    pickle.dump(label_encoders, f)
-
-# Save feature names
-with open('feature_names.pkl', 'wb') as f:
-    pickle.dump(list(X.columns), f)
-
-print("✓ Model and preprocessing objects saved")
-
-# Save results to CSV
-results_df = pd.DataFrame({
-    'Model': list(results.keys()),
-    'Train_RMSE': [results[m]['train_rmse'] for m in results.keys()],
-    'Test_RMSE': [results[m]['test_rmse'] for m in results.keys()],
-    'Train_R2': [results[m]['train_r2'] for m in results.keys()],
-    'Test_R2': [results[m]['test_r2'] for m in results.keys()],
-    'Train_MAE': [results[m]['train_mae'] for m in results.keys()],
-    'Test_MAE': [results[m]['test_mae'] for m in results.keys()]
-})
-results_df.to_csv('model_results.csv', index=False)
-print("✓ Model results saved to model_results.csv")
-
-print("\n" + "="*80)
-print("MODEL TRAINING COMPLETE!")
-print("="*80)
 
+
+# ============================================================================
+# MODEL EXPORT
+# ============================================================================
+
+def export(data, trained, data_hash):
+    """Check, calibrate and save the best model as a bundle and write model_results.csv"""
+    X_scaled, scaler = data['X_scaled'], data['scaler']
+    label_encoders = data['label_encoders']
+    _, X_test, _, y_test = split_views(data)
+    results, cv_summary = trained['results'], trained['cv_summary']
+    training_wall_time = trained['training_wall_time']
+    best_model_name = trained['best_model_name']
+    best_model = results[best_model_name]['model']
+
+    # Check the fused scaler + linear model against sklearn before exporting it: the scaler's
+    # mean_/scale_ are folded into the coefficients so serving needs one dot product
+    if isinstance(best_model, LinearRegression):
+        fused_model = FusedLinearPredictor.from_estimators(best_model, scaler)
+        # A float32 model was fitted on rounded inputs, so it is only checked to float32 precision
+        rtol, rtol_label = (1e-9, '1e-9') if X_scaled.dtype == np.float64 else (1e-5, '1e-5')
+        X_raw = scaler.inverse_transform(X_scaled.astype(np.float64))
+        np.testing.assert_allclose(fused_model.predict(X_raw), best_model.predict(X_scaled), rtol=rtol)
+        print(f"\n✓ Fused scaler + linear model matches sklearn (rtol={rtol_label})")
+
+    # Calibrate prediction intervals: split-conformal quantile of the absolute residuals on the
+    # held-out test set (forests use the spread of their per-tree predictions at serving time)
+    residual_quantile = conformal_quantile(y_test - best_model.predict(X_test), DEFAULT_INTERVAL_ALPHA)
+    calibration = {
+        'method': 'split_conformal',
+        'alpha': DEFAULT_INTERVAL_ALPHA,
+        'residual_quantile': residual_quantile,
+        'n_calibration': len(y_test)
+    }
+    print(f"\n✓ {1 - DEFAULT_INTERVAL_ALPHA:.0%} prediction interval half-width (split conformal): PKR {residual_quantile:,.0f}")
+
+    # Save the best model and preprocessing objects as one versioned bundle
+    print("\nSaving model bundle...")
+    bundle_metrics = {
+        'best_model': best_model_name,
+        'models': {name: {k: v for k, v in res.items() if k != 'model'} for name, res in results.items()},
+        'training_wall_time': training_wall_time,
+        'selection': 'cv_r2_mean_minus_std',
+        'cv': {'folds': trained['cv_folds'], 'repeats': trained['cv_repeats'],
+               'models': cv_summary.reset_index().to_dict(orient='records')}
+    }
+    bundle_version = save_bundle(best_model, scaler, label_encoders, data['feature_names'],
+                                 metrics=bundle_metrics, data_hash=data_hash,
+                                 extra={'calibration': calibration})
+    print(f"✓ Model bundle saved to {BUNDLE_ROOT}/{bundle_version} ({BUNDLE_ROOT}/LATEST updated)")
+
+    # Save results to CSV
+    results_df = pd.DataFrame({
+        'Model': list(results.keys()),
+        'Train_RMSE': [results[m]['train_rmse'] for m in results.keys()],
+        'Test_RMSE': [results[m]['test_rmse'] for m in results.keys()],
+        'Train_R2': [results[m]['train_r2'] for m in results.keys()],
+        'Test_R2': [results[m]['test_r2'] for m in results.keys()],
+        'Train_MAE': [results[m]['train_mae'] for m in results.keys()],
+        'Test_MAE': [results[m]['test_mae'] for m in results.keys()],
+        'Fit_Time_s': [results[m]['fit_time'] for m in results.keys()],
+        'Predict_Latency_ms': [results[m]['predict_latency_ms'] for m in results.keys()],
+        'Artifact_KB': [results[m]['artifact_bytes'] / 1024 for m in results.keys()],
+        'Total_Wall_Time_s': training_wall_time,
+        'CV_R2_Mean': [cv_summary.loc[m, 'CV_R2_Mean'] for m in results.keys()],
+        'CV_R2_Std': [cv_summary.loc[m, 'CV_R2_Std'] for m in results.keys()],
+        'CV_Selection_Score': [cv_summary.loc[m, 'CV_Selection_Score'] for m in results.keys()]
+    })
+    results_df.to_csv('model_results.csv', index=False)
+    print("✓ Model results saved to model_results.csv")
+
+    return bundle_version
+
+
+def bundle_is_current(version):
+    """A cached export is only reusable while its bundle is still the one LATEST points at"""
+    return latest_version(BUNDLE_ROOT) == version and os.path.isdir(os.path.join(BUNDLE_ROOT, version))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the EDA and train the house price models.")
+    parser.add_argument('--rerun', nargs='+', default=[], metavar='STAGE',
+                        help="Stages to run even if cached (eda, plots, plots/<name>, preprocess, train, export)")
+    parser.add_argument('--no-cache', action='store_true', help="Run every stage and write no cache")
+    parser.add_argument('--plot-jobs', type=int, default=None,
+                        help="Processes drawing the figures in parallel (default: HOUSING_N_JOBS)")
+    parser.add_argument('--float32', action='store_true',
+                        help="Build the feature matrix and train in float32 (half the memory on large inputs)")
+    args = parser.parse_args(argv)
+    runner = StageRunner(enabled=not args.no_cache, rerun=args.rerun)
+
+    # Load the dataset
+    print("Loading dataset...")
+    df = load_housing_data('Housing.csv')
+
+    print("\n" + "="*80)
+    print("EXPLORATORY DATA ANALYSIS (EDA)")
+    print("="*80)
+    runner.run('eda', run_eda, {'df': df}, code=[categorical_columns, housing_data, eda_stats])
+
+    print("\n" + "="*80)
+    print("GENERATING VISUALIZATIONS...")
+    print("="*80)
+
+    # Create a directory for saving plots
+    os.makedirs(PLOT_DIR, exist_ok=True)
+    # Each figure has its own fingerprint, so editing one plot only redraws that plot; the
+    # figures that need drawing are independent jobs in a process pool, and one that fails
+    # is reported without stopping the others
+    stages = []
+    for section, label, plot_func, file_name, message in PLOTS:
+        path = f'{PLOT_DIR}/{file_name}'
+        stages.append({'name': f'plots/{os.path.splitext(file_name)[0]}', 'func': render_plot,
+                       'inputs': {'df': df, 'section': section, 'label': plot_label(section, label, len(df)),
+                                  'plot_func': plot_func,
+                                  'path': path, 'message': message, 'dpi': DPI, 'style': PLOT_STYLE},
+                       'code': [apply_style, numerical_columns, categorical_columns, yes_no_labels, SCATTER_PANELS,
+                                DENSITY_THRESHOLD, DENSITY_BINS, bin_index, cell_grid, density_grid, show_grid,
+                                draw_density, plot_density_pairs],
+                       'files': [path]})
+    runner.run_parallel(stages, n_jobs=worker_budget(args.plot_jobs), setup=use_headless_backend, label='plots')
+
+    print("\n" + "="*80)
+    print(f"EDA COMPLETE! All visualizations saved to '{PLOT_DIR}' directory.")
+    print("="*80)
+
+    print("\n" + "="*80)
+    print("DATA PREPROCESSING")
+    print("="*80)
+    data = runner.run('preprocess', preprocess, {'df': df, 'dtype': 'float32' if args.float32 else 'float64'},
+                      code=[numerical_columns, categorical_columns, feature_names, scale_in_place, housing_data,
+                            FeatureEncoder])
+
+    print("\n" + "="*80)
+    print("MACHINE LEARNING MODEL TRAINING")
+    print("="*80)
+    trained = runner.run('train', train,
+                         {'data': data, 'models': candidate_models(), 'cv_folds': CV_FOLDS, 'cv_repeats': CV_REPEATS},
+                         code=[model_training, split_views], upstream={'data': 'preprocess'},
+                         files=['cv_results.csv'])
+
+    runner.run('export', export, {'data': data, 'trained': trained, 'data_hash': file_sha256('Housing.csv')},
+               code=[prediction, model_bundle, split_views], upstream={'data': 'preprocess', 'trained': 'train'},
+               files=['model_results.csv'], is_valid=bundle_is_current)
+
+    print("\n" + "="*80)
+    print("MODEL TRAINING COMPLETE!")
+    print("="*80)
+    runner.report()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""
+Housing Price Prediction - Columnar Data Cache
+Loads Housing.csv (or any CSV) through an on-disk cache of one .npy file per column, so
+only the first read after a change pays for the text parse.
+
+Layout:
+    .cache/data/Housing-<path hash>/meta.json     source size, mtime, SHA-256 and column specs
+    .cache/data/Housing-<path hash>/NNN.npy       one per column: numeric values, or category / flag codes
+
+Loaded frames follow HOUSING_SCHEMA: narrow integers, bool for the yes/no flags (pandas'
+nullable boolean when a flag has missing values) and a categorical furnishingstatus, about a seventh of the memory of the int64 and string
+columns pd.read_csv produces. The cache stores the converted columns (categoricals as
+their codes), so a warm load does no conversion at all. The cache is trusted while the
+source's size and mtime and the schema are unchanged; if only the mtime moved, the
+SHA-256 decides whether it is rebuilt.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+from model_bundle import file_sha256
+
+CACHE_ROOT = '.cache'
+CACHE_FORMAT_VERSION = 2
+
+FLAG_COLUMNS = ['mainroad', 'guestroom', 'basement', 'hotwaterheating', 'airconditioning', 'prefarea']
+FLAG_LABELS = ['no', 'yes']
+FURNISHING_DTYPE = pd.CategoricalDtype(['furnished', 'semi-furnished', 'unfurnished'])
+# Column dtypes of a loaded Housing.csv. Integer columns whose values do not fit are
+# widened to int64 instead of failing; columns missing from a file are skipped.
+HOUSING_SCHEMA = {
+    'price': np.dtype(np.int32),
+    'area': np.dtype(np.int32),
+    'bedrooms': np.dtype(np.int8),
+    'bathrooms': np.dtype(np.int8),
+    'stories': np.dtype(np.int8),
+    **{col: np.dtype(bool) for col in FLAG_COLUMNS},
+    'parking': np.dtype(np.int8),
+    'furnishingstatus': FURNISHING_DTYPE
+}
+
+
+def cache_dir(path, cache_root=CACHE_ROOT):
+    """Return the cache directory for a source file"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    path_hash = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:8]
+    return os.path.join(cache_root, 'data', f'{name}-{path_hash}')
+
+
+def apply_schema(frame, schema=HOUSING_SCHEMA):
+    """Convert the columns of a parsed frame to the schema's dtypes (in place; returns the frame).
+
+    Missing values are kept (a flag column with any becomes pandas' nullable boolean);
+    raises ValueError for yes/no or category values present but outside the schema.
+    """
+    for col, dtype in schema.items():
+        if col not in frame.columns:
+            continue
+        values = frame[col]
+        if dtype == np.dtype(bool):
+            flags = values.map({FLAG_LABELS[0]: False, FLAG_LABELS[1]: True})
+            unknown = flags.isna() & values.notna()
+            if unknown.any():
+                raise ValueError(f"Column '{col}' must contain only {FLAG_LABELS}, "
+                                 f"found {sorted(values[unknown].astype(str).unique())}")
+            frame[col] = flags.astype('boolean' if flags.isna().any() else bool)
+        elif isinstance(dtype, pd.CategoricalDtype):
+            categorical = values.astype(dtype)
+            unknown = categorical.isna() & values.notna()
+            if unknown.any():
+                raise ValueError(f"Column '{col}' has values outside {list(dtype.categories)}: "
+                                 f"{sorted(values[unknown].astype(str).unique())}")
+            frame[col] = categorical
+        elif np.issubdtype(dtype, np.integer) and pd.api.types.is_integer_dtype(values):
+            info = np.iinfo(dtype)
+            fits = len(values) == 0 or (info.min <= values.min() and values.max() <= info.max)
+            frame[col] = values.astype(dtype if fits else np.int64)
+    return frame
+
+
+def memory_usage(frame):
+    """Deep memory usage of a DataFrame in bytes (index included)"""
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def yes_no_labels(values):
+    """A bool flag column as a categorical of 'no'/'yes' for display and grouping (others unchanged)"""
+    if not pd.api.types.is_bool_dtype(values.dtype):
+        return values
+    codes = values.to_numpy(dtype=np.int8, na_value=-1)  # -1: missing in a nullable flag
+    return pd.Series(pd.Categorical.from_codes(codes, FLAG_LABELS), index=values.index, name=values.name)
+
+
+def _schema_meta(schema):
+    """JSON form of a schema, stored in the cache metadata"""
+    if schema is None:
+        return None
+    return {col: {'categories': dtype.categories.tolist()} if isinstance(dtype, pd.CategoricalDtype) else str(dtype)
+            for col, dtype in schema.items()}
+
+
+def _code_dtype(n_categories):
+    """Smallest signed integer type holding the codes (and -1 for missing)"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _read_meta(directory):
+    try:
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return meta if meta.get('format_version') == CACHE_FORMAT_VERSION else None
+
+
+def _write_meta(directory, meta):
+    pointer = os.path.join(directory, f'.meta.{os.getpid()}')
+    with open(pointer, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(pointer, os.path.join(directory, 'meta.json'))
+
+
+def _cache_is_valid(meta, directory, path, stat, schema=HOUSING_SCHEMA):
+    """Check the cache against the source: schema, size and mtime first, SHA-256 if only the mtime changed"""
+    if meta is None or meta['size'] != stat.st_size or meta.get('schema') != _schema_meta(schema):
+        return False
+    if meta['mtime_ns'] == stat.st_mtime_ns:
+        return True
+    if file_sha256(path) != meta['sha256']:
+        return False
+    # Same content, touched file: remember the new mtime so the next load is fast again
+    meta['mtime_ns'] = stat.st_mtime_ns
+    try:
+        _write_meta(directory, meta)
+    except OSError:
+        pass
+    return True
+
+
+def build_cache(path, cache_root=CACHE_ROOT, frame=None, schema=HOUSING_SCHEMA):
+    """Parse the CSV (unless a frame already converted to the schema is given) and write its
+    columnar cache; return the frame"""
+    stat = os.stat(path)
+    if frame is None:
+        frame = pd.read_csv(path)
+        if schema is not None:
+            apply_schema(frame, schema)
+    directory = cache_dir(path, cache_root)
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=os.path.dirname(directory))
+    try:
+        columns = []
+        for i, col in enumerate(frame.columns):
+            file_name = f'{i:03d}.npy'
+            if isinstance(frame[col].dtype, pd.CategoricalDtype):
+                dtype = frame[col].dtype
+                np.save(os.path.join(staging, file_name), frame[col].cat.codes.to_numpy())
+                columns.append({'name': col, 'file': file_name, 'kind': 'categorical',
+                                'categories': dtype.categories.tolist(), 'ordered': bool(dtype.ordered)})
+            elif isinstance(frame[col].dtype, pd.BooleanDtype):
+                np.save(os.path.join(staging, file_name), frame[col].to_numpy(dtype=np.int8, na_value=-1))
+                columns.append({'name': col, 'file': file_name, 'kind': 'boolean'})
+            elif not pd.api.types.is_numeric_dtype(frame[col]):
+                codes, categories = pd.factorize(frame[col], sort=True)
+                np.save(os.path.join(staging, file_name), codes.astype(_code_dtype(len(categories))))
+                columns.append({'name': col, 'file': file_name, 'kind': 'category',
+                                'dtype': str(frame[col].dtype), 'categories': categories.tolist()})
+            else:
+                np.save(os.path.join(staging, file_name), frame[col].to_numpy())
+                columns.append({'name': col, 'file': file_name, 'kind': 'numeric'})
+        _write_meta(staging, {
+            'format_version': CACHE_FORMAT_VERSION,
+            'source': os.path.abspath(path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_sha256(path),
+            'n_rows': len(frame),
+            'schema': _schema_meta(schema),
+            'columns': columns
+        })
+        shutil.rmtree(directory, ignore_errors=True)
+        os.rename(staging, directory)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return frame
+
+
+def read_cache(directory, meta):
+    """Rebuild the DataFrame from a cache directory"""
+    data = {}
+    for spec in meta['columns']:
+        values = np.load(os.path.join(directory, spec['file']))
+        if spec['kind'] == 'categorical':
+            values = pd.Categorical.from_codes(values, spec['categories'], ordered=spec['ordered'])
+        elif spec['kind'] == 'category':
+            # One trailing NaN slot so code -1 (missing) decodes to NaN; take() on the small
+            # category array is much cheaper than converting a decoded object column
+            categories = pd.array(spec['categories'] + [np.nan], dtype=spec['dtype'])
+            values = categories.take(values.astype(np.intp))
+        elif spec['kind'] == 'boolean':
+            values = pd.arrays.BooleanArray(values == 1, values < 0)
+        data[spec['name']] = values
+    return pd.DataFrame(data)
+
+
+def load_housing_data(path='Housing.csv', cache_root=CACHE_ROOT, use_cache=True, schema=HOUSING_SCHEMA):
+    """Load a CSV as a DataFrame with the schema's dtypes, from the columnar cache when it is up to date.
+
+    The first load (or the first after the file or schema changes) parses the CSV and
+    writes the cache; a cache that cannot be written is skipped rather than failing the
+    load. schema=None keeps pd.read_csv's dtypes.
+    """
+    if not use_cache:
+        frame = pd.read_csv(path)
+        return frame if schema is None else apply_schema(frame, schema)
+    directory = cache_dir(path, cache_root)
+    meta = _read_meta(directory)
+    if _cache_is_valid(meta, directory, path, os.stat(path), schema):
+        return read_cache(directory, meta)
+    frame = pd.read_csv(path)
+    if schema is not None:
+        apply_schema(frame, schema)
+    try:
+        build_cache(path, cache_root, frame=frame, schema=schema)
+    except OSError:
+        pass  # read-only checkout: serve the parsed frame uncached
+    return frame
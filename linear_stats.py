@@ -0,0 +1,282 @@
+"""
+Housing Price Prediction - Mergeable Sufficient Statistics for Linear Regression
+A StandardScaler + LinearRegression fit only needs the row count, the means and the
+centered co-moment matrix of [features, price]. These statistics are computed per shard
+(in separate processes or on separate machines), merged exactly, and the normal equations
+are solved on the merged result, so a file of any size is fitted in one streaming pass.
+Every holdout_every-th row of a CSV shard is left out of its statistics; a second pass
+over those rows calibrates the split-conformal prediction interval of a saved bundle.
+
+Merging uses the pairwise update of Chan et al.: with delta = mean_b - mean_a,
+    mean = mean_a + delta * n_b / n
+    C    = C_a + C_b + outer(delta, delta) * n_a * n_b / n
+which stays accurate where accumulating raw X^T X would lose precision to large means.
+
+Usage:
+    python linear_stats.py                                  # parity check against sklearn on Housing.csv
+    python linear_stats.py shard_*.csv --n-jobs 8 --save    # fit shards in parallel, write a bundle
+    python linear_stats.py shard_03.csv --dump-stats s03.npz   # on another machine
+    python linear_stats.py s*.npz --alpha 1.0 --save --calibrate-on shard_*.csv
+                                                            # merge statistics files and fit (ridge)
+"""
+
+import argparse
+import hashlib
+import time
+from functools import reduce
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+import warnings
+warnings.filterwarnings('ignore')
+
+from model_bundle import BUNDLE_ROOT, file_sha256, save_bundle
+from model_training import worker_budget
+from prediction import DEFAULT_INTERVAL_ALPHA, FeatureEncoder, conformal_quantile
+from streaming_training import (FEATURE_NAMES, RESIDUAL_SAMPLE_SIZE, ResidualReservoir, fixed_label_encoders,
+                                holdout_mask, iter_chunks)
+
+
+class LinearStats:
+    """Row count, means and centered co-moments of the columns [x_1 .. x_p, y]"""
+
+    def __init__(self, n, mean, comoment):
+        self.n = int(n)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.comoment = np.asarray(comoment, dtype=np.float64)
+
+    @classmethod
+    def empty(cls, n_features):
+        return cls(0, np.zeros(n_features + 1), np.zeros((n_features + 1, n_features + 1)))
+
+    @classmethod
+    def from_arrays(cls, X, y):
+        """Statistics of one block of rows"""
+        values = np.column_stack([np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)])
+        mean = values.mean(axis=0)
+        centered = values - mean
+        return cls(len(values), mean, centered.T @ centered)
+
+    @property
+    def n_features(self):
+        return len(self.mean) - 1
+
+    def merge(self, other):
+        """Return the statistics of both row sets combined"""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            return other
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        mean = self.mean + delta * (other.n / n)
+        comoment = self.comoment + other.comoment + np.outer(delta, delta) * (self.n * other.n / n)
+        return LinearStats(n, mean, comoment)
+
+    __add__ = merge
+
+    def save(self, path):
+        np.savez(path, n=self.n, mean=self.mean, comoment=self.comoment)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(int(data['n']), data['mean'], data['comoment'])
+
+
+def fit_scaler(stats):
+    """A fitted StandardScaler from the feature moments (population variance, like sklearn)"""
+    p = stats.n_features
+    var = np.diag(stats.comoment)[:p] / stats.n
+    scale = np.sqrt(var)
+    scale[scale < 10 * np.finfo(np.float64).eps] = 1.0  # constant columns are left unscaled, as in sklearn
+    scaler = StandardScaler()
+    scaler.mean_ = stats.mean[:p].copy()
+    scaler.var_ = var
+    scaler.scale_ = scale
+    scaler.n_samples_seen_ = stats.n
+    scaler.n_features_in_ = p
+    return scaler
+
+
+def fit_linear(stats, scaler=None, alpha=0.0, feature_names=FEATURE_NAMES):
+    """Solve the normal equations for a linear model on standardized features.
+
+    scaler defaults to one fitted on the same statistics; pass another (e.g. fitted on all
+    rows while stats covers the training rows only, as housing_analysis.py does). alpha > 0
+    adds an L2 penalty on the scaled coefficients, matching sklearn's Ridge; the result is
+    still returned as a LinearRegression so it is served by the fused linear predictor.
+    Returns (model, scaler), ready for model_bundle.save_bundle.
+    """
+    scaler = scaler if scaler is not None else fit_scaler(stats)
+    p = stats.n_features
+    scale = scaler.scale_
+    # Centering does not depend on the scaler's mean, so only the scale enters the co-moments
+    zz = stats.comoment[:p, :p] / np.outer(scale, scale)
+    zy = stats.comoment[:p, p] / scale
+    if alpha > 0:
+        coef = np.linalg.solve(zz + alpha * np.eye(p), zy)
+    else:
+        # Least squares (minimum norm if singular), like LinearRegression
+        coef = np.linalg.lstsq(zz, zy, rcond=None)[0]
+    z_mean = (stats.mean[:p] - scaler.mean_) / scale
+    model = LinearRegression()
+    model.coef_ = coef
+    model.intercept_ = float(stats.mean[p] - z_mean @ coef)
+    model.n_features_in_ = p
+    model.feature_names_in_ = np.asarray(feature_names, dtype=object)
+    scaler.feature_names_in_ = np.asarray(feature_names, dtype=object)
+    return model, scaler
+
+
+def shard_stats(path, chunk_size=100000, holdout_every=10):
+    """Stream the training rows of one CSV shard (Housing.csv schema) into their statistics"""
+    encoder = FeatureEncoder(fixed_label_encoders(), FEATURE_NAMES)
+    stats = LinearStats.empty(len(FEATURE_NAMES))
+    for offset, X, y in iter_chunks(path, encoder, chunk_size):
+        train = ~holdout_mask(offset, len(y), holdout_every)
+        if train.any():
+            stats = stats.merge(LinearStats.from_arrays(X[train], y[train]))
+    return stats
+
+
+def collect_stats(paths, n_jobs=None, chunk_size=100000, holdout_every=10):
+    """Statistics of every shard (CSV files processed in parallel, .npz files loaded) merged"""
+    csv_paths = [path for path in paths if not path.endswith('.npz')]
+    parts = [LinearStats.load(path) for path in paths if path.endswith('.npz')]
+    parts += Parallel(n_jobs=min(worker_budget(n_jobs), max(len(csv_paths), 1)))(
+        delayed(shard_stats)(path, chunk_size, holdout_every) for path in csv_paths)
+    return reduce(LinearStats.merge, parts)
+
+
+def shard_residuals(path, model, scaler, chunk_size=100000, holdout_every=10, random_state=42):
+    """Residuals of the fitted model on the holdout rows of one CSV shard: (sample, rows seen)"""
+    encoder = FeatureEncoder(fixed_label_encoders(), FEATURE_NAMES)
+    reservoir = ResidualReservoir(RESIDUAL_SAMPLE_SIZE, np.random.default_rng(random_state))
+    for offset, X, y in iter_chunks(path, encoder, chunk_size):
+        holdout = holdout_mask(offset, len(y), holdout_every)
+        if holdout.any():
+            reservoir.update(y[holdout] - model.predict(scaler.transform(X[holdout])))
+    return reservoir.values(), reservoir.seen
+
+
+def collect_residuals(paths, model, scaler, n_jobs=None, chunk_size=100000, holdout_every=10, random_state=42):
+    """Holdout residuals of every CSV shard, subsampled to RESIDUAL_SAMPLE_SIZE in proportion to shard size"""
+    parts = Parallel(n_jobs=min(worker_budget(n_jobs), max(len(paths), 1)))(
+        delayed(shard_residuals)(path, model, scaler, chunk_size, holdout_every, random_state) for path in paths)
+    total = sum(seen for _, seen in parts)
+    if total <= RESIDUAL_SAMPLE_SIZE:
+        return np.concatenate([sample for sample, _ in parts] or [np.empty(0)])
+    # Each shard's sample is uniform over its holdout rows, so a proportional draw from each is uniform overall
+    rng = np.random.default_rng(random_state)
+    return np.concatenate([rng.choice(sample, size=RESIDUAL_SAMPLE_SIZE * seen // total, replace=False)
+                           for sample, seen in parts])
+
+
+def shards_sha256(paths):
+    """One digest for a set of shards: SHA-256 over their sorted per-file digests"""
+    digest = hashlib.sha256()
+    for file_hash in sorted(file_sha256(path) for path in paths):
+        digest.update(file_hash.encode('ascii'))
+    return digest.hexdigest()
+
+
+def parity_check(path='Housing.csv', n_shards=4, n_jobs=None):
+    """Fit the housing_analysis.py model from sharded statistics and compare with sklearn"""
+    df = pd.read_csv(path)
+    encoder = FeatureEncoder(fixed_label_encoders(), FEATURE_NAMES)
+    X = encoder.transform(df)
+    y = df['price'].to_numpy(dtype=np.float64)
+
+    # The reference: scaler on all rows, model on the 80% training split
+    scaler_ref = StandardScaler().fit(X)
+    X_train, _, y_train, _ = train_test_split(scaler_ref.transform(X), y, test_size=0.2, random_state=42)
+    train_idx, _ = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42)
+
+    shards = np.array_split(np.arange(len(y)), n_shards)
+    train_shards = np.array_split(np.sort(train_idx), n_shards)
+    workers = Parallel(n_jobs=min(worker_budget(n_jobs), n_shards))
+    all_stats = reduce(LinearStats.merge, workers(delayed(LinearStats.from_arrays)(X[s], y[s]) for s in shards))
+    train_stats = reduce(LinearStats.merge,
+                         workers(delayed(LinearStats.from_arrays)(X[s], y[s]) for s in train_shards))
+
+    scaler = fit_scaler(all_stats)
+    np.testing.assert_allclose(scaler.mean_, scaler_ref.mean_, rtol=1e-12)
+    np.testing.assert_allclose(scaler.scale_, scaler_ref.scale_, rtol=1e-12)
+    print(f"✓ Scaler from {n_shards} merged shards matches StandardScaler (rtol=1e-12)")
+
+    for alpha, reference in [(0.0, LinearRegression()), (1.0, Ridge(alpha=1.0))]:
+        reference.fit(X_train, y_train)
+        model, _ = fit_linear(train_stats, scaler=fit_scaler(all_stats), alpha=alpha)
+        np.testing.assert_allclose(model.coef_, reference.coef_, rtol=1e-9)
+        np.testing.assert_allclose(model.intercept_, reference.intercept_, rtol=1e-9)
+        np.testing.assert_allclose(model.predict(scaler.transform(X)), reference.predict(scaler_ref.transform(X)),
+                                   rtol=1e-9)
+        print(f"✓ {type(reference).__name__}(alpha={alpha:g}) from merged statistics matches sklearn (rtol=1e-9)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit the linear price model from mergeable per-shard statistics.")
+    parser.add_argument('shards', nargs='*', help="CSV shards (Housing.csv schema) and/or .npz statistics files")
+    parser.add_argument('--alpha', type=float, default=0.0, help="L2 penalty on the scaled coefficients (0 = OLS)")
+    parser.add_argument('--n-jobs', type=int, default=None, help="Shards processed in parallel (default: HOUSING_N_JOBS)")
+    parser.add_argument('--chunk-size', type=int, default=100000, help="Rows read per chunk within a shard")
+    parser.add_argument('--holdout-every', type=int, default=10,
+                        help="Hold out every N-th row of each CSV shard to calibrate the prediction interval")
+    parser.add_argument('--calibrate-on', nargs='+', default=[],
+                        help="CSV shards behind .npz inputs, whose holdout rows calibrate the interval")
+    parser.add_argument('--dump-stats', help="Write the merged statistics to this .npz file")
+    parser.add_argument('--save', action='store_true', help="Write the fitted model as a new bundle version")
+    parser.add_argument('--model-root', default=BUNDLE_ROOT)
+    args = parser.parse_args(argv)
+
+    if not args.shards:
+        print("Parity check on Housing.csv...")
+        parity_check(n_jobs=args.n_jobs)
+        return
+
+    start = time.perf_counter()
+    stats = collect_stats(args.shards, n_jobs=args.n_jobs, chunk_size=args.chunk_size,
+                          holdout_every=args.holdout_every)
+    print(f"✓ Statistics of {stats.n:,} training rows from {len(args.shards)} shard(s) "
+          f"in {time.perf_counter() - start:.2f}s")
+    if args.dump_stats:
+        stats.save(args.dump_stats)
+        print(f"✓ Statistics saved to {args.dump_stats}")
+
+    model, scaler = fit_linear(stats, alpha=args.alpha)
+    print(f"✓ Solved the normal equations ({'ridge' if args.alpha else 'least squares'}, alpha={args.alpha:g})")
+    for name, coef in zip(FEATURE_NAMES, model.coef_):
+        print(f"  {name:<32} {coef:>14,.2f}")
+    print(f"  {'intercept':<32} {model.intercept_:>14,.2f}")
+
+    if args.save:
+        extra = {'training': {'mode': 'sufficient_statistics', 'alpha': args.alpha, 'n_rows': stats.n,
+                              'holdout_every': args.holdout_every, 'shards': args.shards}}
+        csv_paths = [path for path in args.shards if not path.endswith('.npz')]
+        residuals = collect_residuals(list(dict.fromkeys(csv_paths + args.calibrate_on)), model, scaler,
+                                      n_jobs=args.n_jobs, chunk_size=args.chunk_size,
+                                      holdout_every=args.holdout_every)
+        if len(residuals):
+            residual_quantile = conformal_quantile(residuals, DEFAULT_INTERVAL_ALPHA)
+            extra['calibration'] = {
+                'method': 'split_conformal',
+                'alpha': DEFAULT_INTERVAL_ALPHA,
+                'residual_quantile': residual_quantile,
+                'n_calibration': len(residuals)
+            }
+            print(f"  {1 - DEFAULT_INTERVAL_ALPHA:.0%} prediction interval half-width: PKR {residual_quantile:,.0f} "
+                  f"({len(residuals):,} holdout rows)")
+        else:
+            print("  No CSV holdout rows (pass --calibrate-on); the bundle has no prediction interval")
+        version = save_bundle(model, scaler, fixed_label_encoders(), FEATURE_NAMES,
+                              metrics={'best_model': 'Linear Regression (sufficient statistics)'},
+                              data_hash=shards_sha256(args.shards), root=args.model_root, extra=extra)
+        print(f"✓ Model bundle saved to {args.model_root}/{version} ({args.model_root}/LATEST updated)")
+
+
+if __name__ == '__main__':
+    main()
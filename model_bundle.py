@@ -0,0 +1,336 @@
+"""
+Housing Price Prediction - Versioned Model Bundle
+One directory per training run holding the model, preprocessing state, feature order,
+training metrics, a data hash and a checksum over every file.
+
+Layout:
+    models/LATEST                  name of the current version, e.g. v0003
+    models/v0003/manifest.json     metadata, metrics and per-file SHA-256 checksums
+    models/v0003/arrays/*.npy      numeric arrays (coefficients, scaler stats, tree nodes)
+    models/v0003/estimator.pkl     only for models that cannot be rebuilt from arrays
+                                   (neither linear nor a regression tree/forest)
+
+The .npy files are uncompressed so they can be memory-mapped: cold start does not copy
+them into memory and several processes loading the same bundle share one page-cache copy.
+Linear models and regression trees/forests are served from these arrays alone (see
+prediction.load_predictor). ModelBundle.model only rebuilds the sklearn estimator (or
+unpickles estimator.pkl) when first accessed, e.g. to refresh a forest.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+from sklearn.tree._tree import NODE_DTYPE, Tree
+
+BUNDLE_ROOT = 'models'
+# Version 2 stores regression trees/forests as arrays only (version 1 also pickled them)
+FORMAT_VERSION = 2
+READABLE_FORMATS = (1, 2)
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Return the SHA-256 hex digest of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def tree_arrays(model):
+    """Flatten a fitted regression tree or forest into concatenated node arrays.
+
+    Child indices are absolute positions in the concatenated arrays (-1 marks a leaf) and
+    tree_offsets[i] is the root of tree i.
+    """
+    estimators = getattr(model, 'estimators_', [model])
+    trees = [est.tree_ for est in estimators]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+
+    def shifted(children, offset):
+        return np.where(children == -1, -1, children + offset)
+
+    return {
+        'tree_offsets': offsets.astype(np.int64),
+        'tree_feature': np.concatenate([tree.feature for tree in trees]).astype(np.int32),
+        'tree_threshold': np.concatenate([tree.threshold for tree in trees]).astype(np.float64),
+        'tree_left': np.concatenate([shifted(tree.children_left, off) for tree, off in zip(trees, offsets)]).astype(np.int64),
+        'tree_right': np.concatenate([shifted(tree.children_right, off) for tree, off in zip(trees, offsets)]).astype(np.int64),
+        'tree_value': np.concatenate([tree.value[:, 0, 0] for tree in trees]).astype(np.float64)
+    }
+
+
+def _tree_state_arrays(model):
+    """The node and per-tree fields sklearn needs besides tree_arrays() to rebuild the estimator"""
+    estimators = getattr(model, 'estimators_', [model])
+    trees = [est.tree_ for est in estimators]
+    return {
+        'tree_impurity': np.concatenate([tree.impurity for tree in trees]).astype(np.float64),
+        'tree_n_node_samples': np.concatenate([tree.n_node_samples for tree in trees]).astype(np.int64),
+        'tree_weighted_n_node_samples': np.concatenate([tree.weighted_n_node_samples
+                                                        for tree in trees]).astype(np.float64),
+        'tree_missing_go_to_left': np.concatenate([tree.missing_go_to_left for tree in trees]).astype(np.uint8),
+        'tree_max_depth': np.array([tree.max_depth for tree in trees], dtype=np.int64),
+        'tree_max_features': np.array([est.max_features_ for est in estimators], dtype=np.int64),
+        'tree_random_state': np.array([est.random_state if isinstance(est.random_state, int) else -1
+                                       for est in estimators], dtype=np.int64)
+    }
+
+
+def _simple_params(model):
+    return {k: v for k, v in model.get_params().items() if isinstance(v, (int, float, str, bool, type(None)))}
+
+
+def _stored_as_trees(model):
+    """True for a single-output regression tree/forest whose parameters all fit in the manifest"""
+    return (isinstance(model, (RandomForestRegressor, DecisionTreeRegressor)) and model.n_outputs_ == 1
+            and len(_simple_params(model)) == len(model.get_params()))
+
+
+def _rebuild_tree_model(manifest, arrays):
+    """Rebuild a fitted RandomForestRegressor or DecisionTreeRegressor from its bundle arrays"""
+    params = manifest['model_params']
+    n_features = len(manifest['feature_names'])
+    offsets = arrays['tree_offsets']
+    estimators = []
+    for i in range(len(offsets) - 1):
+        start, end = int(offsets[i]), int(offsets[i + 1])
+        nodes = np.zeros(end - start, dtype=NODE_DTYPE)
+        # Child indices are stored absolute (-1 for leaves); sklearn's are per tree
+        for field, name in [('left_child', 'tree_left'), ('right_child', 'tree_right')]:
+            children = arrays[name][start:end]
+            nodes[field] = np.where(children == -1, -1, children - start)
+        for field, name in [('feature', 'tree_feature'), ('threshold', 'tree_threshold'),
+                            ('impurity', 'tree_impurity'), ('n_node_samples', 'tree_n_node_samples'),
+                            ('weighted_n_node_samples', 'tree_weighted_n_node_samples'),
+                            ('missing_go_to_left', 'tree_missing_go_to_left')]:
+            nodes[field] = arrays[name][start:end]
+        tree = Tree(n_features, np.array([1], dtype=np.intp), 1)
+        tree.__setstate__({'max_depth': int(arrays['tree_max_depth'][i]), 'node_count': end - start, 'nodes': nodes,
+                           'values': np.ascontiguousarray(arrays['tree_value'][start:end], dtype=np.float64)
+                           .reshape(-1, 1, 1)})
+        if manifest['model_type'] == 'DecisionTreeRegressor':
+            estimator = DecisionTreeRegressor(**params)
+        else:
+            seed = int(arrays['tree_random_state'][i])
+            estimator = DecisionTreeRegressor(**{name: params[name] for name in RandomForestRegressor().estimator_params
+                                                 if name != 'random_state'},
+                                              random_state=None if seed < 0 else seed)
+        estimator.tree_ = tree
+        estimator.n_features_in_ = n_features
+        estimator.n_outputs_ = 1
+        estimator.max_features_ = int(arrays['tree_max_features'][i])
+        estimators.append(estimator)
+
+    if manifest['model_type'] == 'DecisionTreeRegressor':
+        return estimators[0]
+    forest = RandomForestRegressor(**params)
+    forest.estimator_ = DecisionTreeRegressor()
+    forest.estimators_ = estimators
+    forest.n_features_in_ = n_features
+    forest.n_outputs_ = 1
+    return forest
+
+
+def _model_arrays(model, scaler):
+    """Collect the numeric state of the model and scaler as named arrays"""
+    arrays = {
+        'scaler_mean': np.asarray(scaler.mean_, dtype=np.float64),
+        'scaler_scale': np.asarray(scaler.scale_, dtype=np.float64),
+        'scaler_var': np.asarray(scaler.var_, dtype=np.float64)
+    }
+    if isinstance(model, LinearRegression):
+        arrays['coef'] = np.asarray(model.coef_, dtype=np.float64)
+        arrays['intercept'] = np.atleast_1d(np.asarray(model.intercept_, dtype=np.float64))
+        # The scaler folded into the coefficients (see prediction.FusedLinearPredictor)
+        arrays['fused_coef'] = arrays['coef'] / arrays['scaler_scale']
+        arrays['fused_intercept'] = arrays['intercept'] - np.dot(arrays['scaler_mean'], arrays['fused_coef'])
+    elif _stored_as_trees(model):
+        arrays.update(tree_arrays(model))
+        arrays.update(_tree_state_arrays(model))
+    return arrays
+
+
+def _next_version(root):
+    """Return the next free vNNNN name under root"""
+    existing = [int(name[1:]) for name in os.listdir(root) if name.startswith('v') and name[1:].isdigit()]
+    return f'v{max(existing, default=0) + 1:04d}'
+
+
+def save_bundle(model, scaler, label_encoders, feature_names, metrics=None, data_hash=None,
+                root=BUNDLE_ROOT, extra=None):
+    """Write a new bundle version under root, point LATEST at it and return its version"""
+    os.makedirs(root, exist_ok=True)
+    version = _next_version(root)
+    staging = tempfile.mkdtemp(prefix=f'.{version}-', dir=root)
+    try:
+        os.makedirs(os.path.join(staging, 'arrays'))
+        files = {}
+        array_specs = {}
+        for name, array in _model_arrays(model, scaler).items():
+            rel_path = f'arrays/{name}.npy'
+            np.save(os.path.join(staging, rel_path), np.ascontiguousarray(array))
+            array_specs[name] = {'file': rel_path, 'dtype': str(array.dtype), 'shape': list(array.shape)}
+            files[rel_path] = file_sha256(os.path.join(staging, rel_path))
+
+        needs_pickle = not (isinstance(model, LinearRegression) or _stored_as_trees(model))
+        if needs_pickle:
+            with open(os.path.join(staging, 'estimator.pkl'), 'wb') as f:
+                pickle.dump(model, f)
+            files['estimator.pkl'] = file_sha256(os.path.join(staging, 'estimator.pkl'))
+
+        manifest = {
+            'format_version': FORMAT_VERSION,
+            'version': version,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'model_type': type(model).__name__,
+            'model_params': _simple_params(model),
+            'feature_names': list(feature_names),
+            'label_classes': {col: [str(c) for c in le.classes_] for col, le in label_encoders.items()},
+            'n_samples_seen': int(np.max(scaler.n_samples_seen_)),
+            'metrics': metrics or {},
+            'data_hash': data_hash,
+            'arrays': array_specs,
+            'estimator_file': 'estimator.pkl' if needs_pickle else None,
+            'files': files,
+            'checksum': hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()
+        }
+        if extra:
+            manifest.update(extra)
+        with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2, default=float)
+
+        os.rename(staging, os.path.join(root, version))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    # Switch LATEST atomically so readers never see a half-written pointer
+    pointer = os.path.join(root, f'.LATEST.{os.getpid()}')
+    with open(pointer, 'w') as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(root, 'LATEST'))
+    return version
+
+
+def latest_version(root=BUNDLE_ROOT):
+    """Return the version LATEST points at, or None if there is no bundle"""
+    try:
+        with open(os.path.join(root, 'LATEST')) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class ModelBundle:
+    """A loaded bundle: the manifest, memory-mapped arrays and the rebuilt estimators"""
+
+    def __init__(self, path, manifest, arrays, model, scaler, label_encoders):
+        self.path = path
+        self.manifest = manifest
+        self.arrays = arrays
+        self._model = model
+        self.scaler = scaler
+        self.label_encoders = label_encoders
+
+    @property
+    def model(self):
+        """The fitted estimator, rebuilt from the tree arrays or unpickled on first access"""
+        if self._model is None:
+            if self.manifest['estimator_file']:
+                with open(os.path.join(self.path, self.manifest['estimator_file']), 'rb') as f:
+                    self._model = pickle.load(f)
+            else:
+                self._model = _rebuild_tree_model(self.manifest, self.arrays)
+        return self._model
+
+    @property
+    def version(self):
+        return self.manifest['version']
+
+    @property
+    def feature_names(self):
+        return self.manifest['feature_names']
+
+    @property
+    def metrics(self):
+        return self.manifest['metrics']
+
+
+def check_manifest(path, manifest):
+    """Raise ValueError if the manifest's file list does not match its checksum"""
+    if hashlib.sha256(json.dumps(manifest['files'], sort_keys=True).encode()).hexdigest() != manifest['checksum']:
+        raise ValueError(f"Bundle {path} manifest checksum mismatch")
+
+
+def verify_bundle(path, manifest):
+    """Raise ValueError if any bundle file does not match its recorded checksum"""
+    files = manifest['files']
+    check_manifest(path, manifest)
+    for rel_path, expected in files.items():
+        if file_sha256(os.path.join(path, rel_path)) != expected:
+            raise ValueError(f"Bundle {path} file {rel_path} is corrupted (checksum mismatch)")
+
+
+def read_manifest(root=BUNDLE_ROOT, version=None):
+    """Return (path, manifest) of a bundle version (LATEST by default) without loading it"""
+    version = version or latest_version(root)
+    if version is None:
+        raise FileNotFoundError(f"No model bundle found under {root}/")
+    path = os.path.join(root, version)
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') not in READABLE_FORMATS:
+        raise ValueError(f"Unsupported bundle format {manifest.get('format_version')} in {path}")
+    return path, manifest
+
+
+def load_bundle(root=BUNDLE_ROOT, version=None, mmap=True, verify=False):
+    """Load a bundle version (LATEST by default) with its arrays memory-mapped.
+
+    The manifest checksum is always checked; verify=True also hashes every file, which
+    reads the whole bundle and is left to tools that need it (e.g. before a refresh).
+    """
+    path, manifest = read_manifest(root, version)
+    if verify:
+        verify_bundle(path, manifest)
+    else:
+        check_manifest(path, manifest)
+
+    arrays = {name: np.load(os.path.join(path, spec['file']), mmap_mode='r' if mmap else None)
+              for name, spec in manifest['arrays'].items()}
+    feature_names = np.asarray(manifest['feature_names'], dtype=object)
+
+    scaler = StandardScaler()
+    scaler.mean_ = arrays['scaler_mean']
+    scaler.scale_ = arrays['scaler_scale']
+    scaler.var_ = arrays['scaler_var']
+    scaler.n_samples_seen_ = manifest['n_samples_seen']
+    scaler.n_features_in_ = len(feature_names)
+    scaler.feature_names_in_ = feature_names
+
+    label_encoders = {}
+    for col, classes in manifest['label_classes'].items():
+        le = LabelEncoder()
+        le.classes_ = np.asarray(classes, dtype=object)
+        label_encoders[col] = le
+
+    if manifest['estimator_file'] or 'tree_offsets' in arrays:
+        model = None  # rebuilt or unpickled by ModelBundle.model when needed
+    else:
+        model = LinearRegression(**manifest['model_params'])
+        model.coef_ = arrays['coef']
+        model.intercept_ = float(arrays['intercept'][0])
+        model.n_features_in_ = len(feature_names)
+        model.feature_names_in_ = feature_names
+
+    return ModelBundle(path, manifest, arrays, model, scaler, label_encoders)
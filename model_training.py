@@ -0,0 +1,233 @@
+"""
+Housing Price Prediction - Parallel Candidate Training and Cross-Validation
+Fits and scores the candidate models in a joblib process pool and splits a worker
+budget between model-level parallelism and the threads of the multi-threaded models:
+the forests' tree-level n_jobs and the OpenMP threads of histogram gradient boosting.
+Cross-validation preprocesses each fold once and evaluates every (candidate, fold)
+pair as its own task. After fitting, each candidate's serving cost (single-row predict
+latency and pickled size) is measured in the parent process, one model at a time.
+
+The budget comes from the HOUSING_N_JOBS environment variable (default: all CPUs).
+"""
+
+import contextlib
+import os
+import pickle
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import HistGradientBoostingClassifier, HistGradientBoostingRegressor
+from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+from sklearn.model_selection import RepeatedKFold
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+N_JOBS_ENV = 'HOUSING_N_JOBS'
+# Single-row predict calls timed per candidate (the median is reported)
+LATENCY_ROWS = 200
+
+
+def worker_budget(n_jobs=None):
+    """Return the number of CPUs training may use (argument, then HOUSING_N_JOBS, then all)"""
+    if n_jobs is None:
+        n_jobs = int(os.environ.get(N_JOBS_ENV, 0)) or os.cpu_count() or 1
+    elif n_jobs < 0:
+        n_jobs = max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return max(1, n_jobs)
+
+
+def _uses_threads(model):
+    """True for ensembles that parallelize over their own estimators (n_jobs)"""
+    return hasattr(model, 'n_estimators') and 'n_jobs' in model.get_params()
+
+
+def _uses_openmp(model):
+    """True for models that start their own OpenMP threads and have no n_jobs to limit them"""
+    return isinstance(model, (HistGradientBoostingRegressor, HistGradientBoostingClassifier))
+
+
+def _thread_limit(model, threads):
+    """Context limiting an OpenMP model to its share of the budget (a no-op for the others)"""
+    if _uses_openmp(model) and threads is not None:
+        return threadpool_limits(limits=threads, user_api='openmp')
+    return contextlib.nullcontext()
+
+
+def split_budget(models, budget, n_tasks=None):
+    """Divide the budget into (model workers, threads per multi-threaded model).
+
+    Every task (by default one per candidate) gets its own worker while the budget
+    allows. The single-threaded candidates finish quickly, so the CPUs left over go to
+    the multi-threaded models (the forests' n_jobs, the OpenMP threads of histogram
+    gradient boosting), keeping the total near the budget.
+    """
+    model_workers = min(n_tasks or len(models), budget)
+    n_threaded = sum(_uses_threads(model) or _uses_openmp(model) for model in models.values())
+    spare = budget - model_workers
+    tree_jobs = 1 + spare // n_threaded if n_threaded else 1
+    return model_workers, tree_jobs
+
+
+def fit_and_score(name, model, X_train, y_train, X_test, y_test, threads=None):
+    """Fit one candidate and return its name and results dict (metrics, fit and score time).
+
+    threads caps the OpenMP threads of histogram gradient boosting (None: no cap).
+    """
+    with _thread_limit(model, threads):
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        y_train_pred = model.predict(X_train)
+        y_test_pred = model.predict(X_test)
+        score_time = time.perf_counter() - start
+
+    # Serving does not depend on the training machine's thread budget
+    if _uses_threads(model):
+        model.set_params(n_jobs=None)
+
+    return name, {
+        'model': model,
+        'train_rmse': np.sqrt(mean_squared_error(y_train, y_train_pred)),
+        'test_rmse': np.sqrt(mean_squared_error(y_test, y_test_pred)),
+        'train_r2': r2_score(y_train, y_train_pred),
+        'test_r2': r2_score(y_test, y_test_pred),
+        'train_mae': mean_absolute_error(y_train, y_train_pred),
+        'test_mae': mean_absolute_error(y_test, y_test_pred),
+        'fit_time': fit_time,
+        'score_time': score_time
+    }
+
+
+def train_candidates(models, X_train, y_train, X_test, y_test, n_jobs=None):
+    """Fit every candidate in parallel; return (results in input order, wall time, workers, threads per
+    multi-threaded model)"""
+    budget = worker_budget(n_jobs)
+    model_workers, tree_jobs = split_budget(models, budget)
+    for model in models.values():
+        if _uses_threads(model):
+            model.set_params(n_jobs=tree_jobs)
+
+    start = time.perf_counter()
+    # loky workers are spawned fresh and never re-import the calling script
+    fitted = Parallel(n_jobs=model_workers, backend='loky')(
+        delayed(fit_and_score)(name, model, X_train, y_train, X_test, y_test, tree_jobs)
+        for name, model in models.items())
+    wall_time = time.perf_counter() - start
+    results = dict(fitted)
+    # Timed after the pool has finished so the candidates do not compete for CPUs
+    for res in results.values():
+        res.update(serving_cost(res['model'], X_test))
+    return results, wall_time, model_workers, tree_jobs
+
+
+def serving_cost(model, X, n_rows=LATENCY_ROWS):
+    """Median single-row predict latency (ms) and pickled artifact size (bytes) of a fitted model"""
+    X = np.asarray(X, dtype=np.float64)
+    rows = [X[i:i + 1] for i in range(min(n_rows, len(X)))]
+    model.predict(rows[0])  # warm-up
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - start)
+    return {
+        'predict_latency_ms': float(np.median(timings)) * 1000,
+        'artifact_bytes': len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    }
+
+
+# ============================================================================
+# K-FOLD CROSS-VALIDATION
+# ============================================================================
+
+def prepare_folds(X, y, n_splits=5, n_repeats=1, random_state=42, positions=None):
+    """Split into k folds and preprocess each one once.
+
+    The scaler is fitted on each fold's training rows only, so validation rows never
+    leak into the preprocessing. Returns a list of dicts with the fold's scaled arrays,
+    shared by every candidate evaluated on that fold. float32 input stays float32.
+    positions[i] is the row of X holding row i of the original data, so the folds are
+    the same whatever order the rows were stored in.
+    """
+    X = np.asarray(X)
+    if X.dtype != np.float32:
+        X = X.astype(np.float64, copy=False)
+    y = np.asarray(y, dtype=np.float64)
+    splitter = RepeatedKFold(n_splits=n_splits, n_repeats=n_repeats, random_state=random_state)
+    folds = []
+    for i, (train_idx, val_idx) in enumerate(splitter.split(X)):
+        if positions is not None:
+            train_idx, val_idx = positions[train_idx], positions[val_idx]
+        start = time.perf_counter()
+        scaler = StandardScaler().fit(X[train_idx])
+        folds.append({
+            'repeat': i // n_splits,
+            'fold': i % n_splits,
+            'X_train': scaler.transform(X[train_idx]),
+            'y_train': y[train_idx],
+            'X_val': scaler.transform(X[val_idx]),
+            'y_val': y[val_idx],
+            'preprocess_time': time.perf_counter() - start
+        })
+    return folds
+
+
+def _evaluate_fold(name, model, fold, threads=None):
+    """Fit a fresh copy of one candidate on one fold and return its per-fold record"""
+    model = clone(model)
+    with _thread_limit(model, threads):
+        start = time.perf_counter()
+        model.fit(fold['X_train'], fold['y_train'])
+        fit_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        y_train_pred = model.predict(fold['X_train'])
+        y_val_pred = model.predict(fold['X_val'])
+        score_time = time.perf_counter() - start
+
+    return {
+        'Model': name,
+        'Repeat': fold['repeat'],
+        'Fold': fold['fold'],
+        'Train_R2': r2_score(fold['y_train'], y_train_pred),
+        'Val_R2': r2_score(fold['y_val'], y_val_pred),
+        'Val_RMSE': np.sqrt(mean_squared_error(fold['y_val'], y_val_pred)),
+        'Val_MAE': mean_absolute_error(fold['y_val'], y_val_pred),
+        'Preprocess_Time_s': fold['preprocess_time'],
+        'Fit_Time_s': fit_time,
+        'Score_Time_s': score_time
+    }
+
+
+def cross_validate_candidates(models, folds, n_jobs=None):
+    """Evaluate every candidate on every fold in parallel; return (per-fold DataFrame, wall time)"""
+    budget = worker_budget(n_jobs)
+    workers, tree_jobs = split_budget(models, budget, n_tasks=len(models) * len(folds))
+    models = {name: clone(model).set_params(n_jobs=tree_jobs) if _uses_threads(model) else model
+              for name, model in models.items()}
+
+    start = time.perf_counter()
+    records = Parallel(n_jobs=workers, backend='loky')(
+        delayed(_evaluate_fold)(name, model, fold, tree_jobs)
+        for name, model in models.items() for fold in folds)
+    return pd.DataFrame(records), time.perf_counter() - start
+
+
+def summarize_cv(cv_results, spread_penalty=1.0):
+    """Per-model mean and spread of the fold scores, best first.
+
+    Models are ranked by mean validation R² minus spread_penalty standard deviations,
+    so a candidate that only wins on some folds does not beat a consistent one.
+    """
+    summary = cv_results.groupby('Model', sort=False).agg(
+        CV_R2_Mean=('Val_R2', 'mean'),
+        CV_R2_Std=('Val_R2', 'std'),
+        CV_RMSE_Mean=('Val_RMSE', 'mean'),
+        CV_Fit_Time_s=('Fit_Time_s', 'mean'))
+    summary['CV_R2_Std'] = summary['CV_R2_Std'].fillna(0.0)
+    summary['CV_Selection_Score'] = summary['CV_R2_Mean'] - spread_penalty * summary['CV_R2_Std']
+    return summary.sort_values('CV_Selection_Score', ascending=False)
@@ -0,0 +1,477 @@
+"""
+Housing Price Prediction - Shared Prediction Helpers
+Loads the trained artifacts and turns raw property records into model-ready features.
+"""
+
+import hashlib
+import math
+import numbers
+import os
+import pickle
+import threading
+from collections import OrderedDict
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeRegressor
+from forest_engine import ForestEngine
+from housing_data import FURNISHING_DTYPE, load_housing_data
+from model_bundle import BUNDLE_ROOT, latest_version, load_bundle, read_manifest
+
+# Raw input schema (same columns as Housing.csv, minus the target)
+NUMERIC_COLS = ['area', 'bedrooms', 'bathrooms', 'stories', 'parking']
+BINARY_COLS = ['mainroad', 'guestroom', 'basement', 'hotwaterheating', 'airconditioning', 'prefarea']
+FURNISHING_COL = 'furnishingstatus'
+FURNISHING_PREFIX = 'furnishing_'
+# LabelEncoder classes of a yes/no column; a bool False/True encodes to the same 0/1
+BOOL_CLASSES = ['no', 'yes']
+INPUT_COLS = ['area', 'bedrooms', 'bathrooms', 'stories', 'mainroad', 'guestroom', 'basement',
+              'hotwaterheating', 'airconditioning', 'parking', 'prefarea', 'furnishingstatus']
+ARTIFACT_FILES = ['model.pkl', 'scaler.pkl', 'label_encoders.pkl', 'feature_names.pkl']
+# Training data and holdout split of housing_analysis.py, used to calibrate the intervals
+# of legacy pickles, which were saved without a calibration
+DATA_FILE = 'Housing.csv'
+HOLDOUT_TEST_SIZE = 0.2
+HOLDOUT_RANDOM_STATE = 42
+
+
+def artifact_version(directory='.'):
+    """Return the bundle version with its manifest checksum, or a short fingerprint of the legacy pickles.
+
+    The checksum tells apart bundles that reuse a version name, e.g. v0001 retrained after
+    models/ was deleted, so caches keyed on the result never serve the old model.
+    """
+    root = os.path.join(directory, BUNDLE_ROOT)
+    bundle_version = latest_version(root)
+    if bundle_version is not None:
+        try:
+            _, manifest = read_manifest(root, bundle_version)
+        except (FileNotFoundError, ValueError):
+            return bundle_version  # unreadable: loading the bundle reports the error
+        return f"{bundle_version}-{manifest['checksum'][:12]}"
+    digest = hashlib.sha256()
+    try:
+        for name in ARTIFACT_FILES:
+            stat = os.stat(f'{directory}/{name}')
+            digest.update(f'{name}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()[:12]
+
+
+def load_artifacts(directory='.'):
+    """Load the trained model and preprocessing objects.
+
+    Uses the latest versioned bundle under models/ when there is one, and falls back to the
+    four legacy pickles otherwise.
+    """
+    if latest_version(os.path.join(directory, BUNDLE_ROOT)) is not None:
+        bundle = load_bundle(os.path.join(directory, BUNDLE_ROOT))
+        return bundle.model, bundle.scaler, bundle.label_encoders, bundle.feature_names
+    with open(f'{directory}/model.pkl', 'rb') as f:
+        model = pickle.load(f)
+    with open(f'{directory}/scaler.pkl', 'rb') as f:
+        scaler = pickle.load(f)
+    with open(f'{directory}/label_encoders.pkl', 'rb') as f:
+        label_encoders = pickle.load(f)
+    with open(f'{directory}/feature_names.pkl', 'rb') as f:
+        feature_names = pickle.load(f)
+    return model, scaler, label_encoders, feature_names
+
+
+class FeatureEncoder:
+    """Feature encoder compiled once from the fitted label encoders and feature order.
+
+    The LabelEncoder classes and the one-hot furnishing columns are resolved into fixed
+    column indices and lookup tables up front, so a raw property dict is written straight
+    into a NumPy row without building any pandas objects.
+    """
+
+    def __init__(self, label_encoders, feature_names, furnishing_categories=FURNISHING_DTYPE.categories):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        self.numeric_index = []
+        self.binary_index = []
+        self.binary_classes = {}
+        self.binary_lookup = {}
+        self.furnishing_index = {}
+        for idx, col in enumerate(self.feature_names):
+            if col in label_encoders:
+                classes = np.asarray(label_encoders[col].classes_)
+                self.binary_index.append((col, idx))
+                self.binary_classes[col] = classes
+                self.binary_lookup[col] = {label: code for code, label in enumerate(classes)}
+            elif col.startswith(FURNISHING_PREFIX):
+                self.furnishing_index[col[len(FURNISHING_PREFIX):]] = idx
+            else:
+                self.numeric_index.append((col, idx))
+        self.furnishing_columns = list(self.furnishing_index.values())
+        # The category dropped by get_dummies(drop_first=True) is encoded as all zeros;
+        # any other value without a column is unknown and rejected
+        baseline = [value for value in furnishing_categories if value not in self.furnishing_index]
+        self.furnishing_baseline = baseline[0] if baseline and self.furnishing_index else None
+
+    def transform_row(self, record, out=None):
+        """Encode a single raw property dict into a (1, n_features) row.
+
+        Pass a preallocated ``out`` row to reuse it across calls.
+        """
+        row = np.zeros((1, self.n_features)) if out is None else out
+        values = row[0]
+        for col, idx in self.numeric_index:
+            value = record[col]
+            if isinstance(value, bool) or not isinstance(value, numbers.Real) or not math.isfinite(value):
+                raise ValueError(f"{col} must be a finite number, got {value!r}")
+            values[idx] = value
+        for col, idx in self.binary_index:
+            try:
+                values[idx] = self.binary_lookup[col][record[col]]
+            except KeyError:
+                raise ValueError(f"Unknown value {record[col]!r} for {col}") from None
+        values[self.furnishing_columns] = 0
+        furnishing = record[FURNISHING_COL]
+        furnishing_idx = self.furnishing_index.get(furnishing)
+        if furnishing_idx is not None:
+            values[furnishing_idx] = 1
+        elif self.furnishing_index and furnishing != self.furnishing_baseline:
+            raise ValueError(f"Unknown value {furnishing!r} for {FURNISHING_COL}")
+        return row
+
+    def transform(self, frame, out=None, rows=None):
+        """Encode a raw property DataFrame into a feature matrix in training column order.
+
+        Every column is encoded as a whole array, so the cost per row is a handful of
+        vectorized operations instead of a pandas round trip per property. ``out`` is a
+        preallocated (n_rows, n_features) matrix of any float dtype to write into, and
+        ``rows`` selects and orders the frame's rows (out[i] encodes frame row rows[i]).
+        Accepts both text yes/no columns and the bool flags of housing_data's schema.
+        """
+        n_rows = len(frame) if rows is None else len(rows)
+        X = np.empty((n_rows, self.n_features), dtype=np.float64) if out is None else out
+
+        def column(col):
+            values = frame[col].to_numpy()
+            return values if rows is None else values[rows]
+
+        for col, idx in self.numeric_index:
+            X[:, idx] = column(col)
+        for col, idx in self.binary_index:
+            classes = self.binary_classes[col]
+            values = column(col)
+            if values.dtype == np.bool_ and list(classes) == BOOL_CLASSES:
+                X[:, idx] = values
+                continue
+            codes = np.searchsorted(classes, values).clip(max=len(classes) - 1)
+            unknown = classes[codes] != values
+            if unknown.any():
+                raise ValueError(f"Unknown values {sorted(set(values[unknown]))!r} for {col}")
+            X[:, idx] = codes
+        furnishing = frame[FURNISHING_COL]
+        if hasattr(furnishing, 'cat'):
+            # Categorical column: compare its integer codes instead of the labels
+            codes = furnishing.cat.codes.to_numpy()
+            codes = codes if rows is None else codes[rows]
+            lookup = {value: code for code, value in enumerate(furnishing.cat.categories)}
+            for value, idx in self.furnishing_index.items():
+                X[:, idx] = codes == lookup.get(value, -2)
+            if self.furnishing_index:
+                known = [lookup[value] for value in [*self.furnishing_index, self.furnishing_baseline]
+                         if value in lookup]
+                unknown = ~np.isin(codes, known)
+                if unknown.any():
+                    labels = [furnishing.cat.categories[code] if code >= 0 else None
+                              for code in np.unique(codes[unknown])]
+                    raise ValueError(f"Unknown values {labels!r} for {FURNISHING_COL}")
+        else:
+            furnishing = column(FURNISHING_COL)
+            for value, idx in self.furnishing_index.items():
+                X[:, idx] = furnishing == value
+            if self.furnishing_index:
+                unknown = furnishing != self.furnishing_baseline
+                for idx in self.furnishing_columns:
+                    unknown &= X[:, idx] == 0
+                if unknown.any():
+                    labels = sorted(set(furnishing[unknown]), key=repr)
+                    raise ValueError(f"Unknown values {labels!r} for {FURNISHING_COL}")
+        return X
+
+
+DEFAULT_INTERVAL_ALPHA = 0.1
+
+
+def conformal_quantile(residuals, alpha=DEFAULT_INTERVAL_ALPHA):
+    """Split-conformal half-width: the ceil((n + 1)(1 - alpha))-th smallest absolute residual
+    on held-out data, giving intervals with at least 1 - alpha coverage"""
+    residuals = np.sort(np.abs(np.asarray(residuals, dtype=np.float64)))
+    rank = int(np.ceil((len(residuals) + 1) * (1 - alpha)))
+    return float(residuals[min(rank, len(residuals)) - 1])
+
+
+def conformal_interval(prediction, residual_quantile):
+    """Return (lower, upper) as prediction -/+ the stored residual quantile (NaN if uncalibrated)"""
+    if residual_quantile is None:
+        nan = np.full_like(prediction, np.nan)
+        return nan, nan
+    return prediction - residual_quantile, prediction + residual_quantile
+
+
+class FusedLinearPredictor:
+    """A StandardScaler and a linear model folded into one set of coefficients.
+
+    Since ((x - mean) / scale) . w + b == x . (w / scale) + (b - (mean / scale) . w),
+    a prediction on raw encoded features is a single dot product.
+    """
+
+    def __init__(self, coef, intercept, residual_quantile=None):
+        self.coef_ = np.asarray(coef, dtype=np.float64)
+        self.intercept_ = float(intercept)
+        self.residual_quantile = residual_quantile
+
+    @classmethod
+    def from_estimators(cls, model, scaler, residual_quantile=None):
+        """Fold a fitted StandardScaler into a fitted linear model"""
+        n_features = len(model.coef_)
+        mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+        coef = model.coef_ / scale
+        return cls(coef, model.intercept_ - np.dot(mean, coef), residual_quantile)
+
+    def predict(self, X):
+        """Predict from raw (unscaled) encoded features"""
+        return np.asarray(X) @ self.coef_ + self.intercept_
+
+    def predict_interval(self, X):
+        """Return (prediction, lower, upper) using the split-conformal residual quantile"""
+        prediction = self.predict(X)
+        return (prediction, *conformal_interval(prediction, self.residual_quantile))
+
+    def export_arrays(self):
+        """Return (arrays, params) from which from_exported() rebuilds this predictor"""
+        arrays = {'coef': self.coef_, 'intercept': np.array([self.intercept_])}
+        return arrays, {'residual_quantile': self.residual_quantile}
+
+    @classmethod
+    def from_exported(cls, arrays, params):
+        return cls(arrays['coef'], arrays['intercept'][0], params['residual_quantile'])
+
+
+class ScaledPredictor:
+    """Any fitted model behind its scaler, exposing the same predict() as the fused path"""
+
+    def __init__(self, model, scaler, residual_quantile=None):
+        self.model = model
+        self.scaler = scaler
+        self.residual_quantile = residual_quantile
+
+    def predict(self, X):
+        """Predict from raw (unscaled) encoded features"""
+        return self.model.predict(self.scaler.transform(X))
+
+    def predict_interval(self, X):
+        """Return (prediction, lower, upper) using the split-conformal residual quantile"""
+        prediction = self.predict(X)
+        return (prediction, *conformal_interval(prediction, self.residual_quantile))
+
+
+class ForestPredictor:
+    """A tree model evaluated by the array-backed ForestEngine behind its scaler"""
+
+    def __init__(self, engine, scaler, alpha=DEFAULT_INTERVAL_ALPHA, residual_quantile=None):
+        self.engine = engine
+        self.mean = np.asarray(scaler.mean_, dtype=np.float64)
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64)
+        self.alpha = alpha
+        self.residual_quantile = residual_quantile
+
+    def _scale(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+
+    def predict(self, X):
+        """Predict from raw (unscaled) encoded features; identical to scaler + model.predict"""
+        return self.engine.predict(self._scale(X))
+
+    def predict_interval(self, X):
+        """Return (prediction, lower, upper) from the same per-tree pass as the point estimate.
+
+        For a forest the bounds are the alpha/2 and 1 - alpha/2 quantiles of the per-tree
+        predictions, widened to at least the conformal interval: the trees agree more closely
+        than prices vary around them, so the spread alone covers well under 1 - alpha of
+        held-out prices. A single tree has no spread and uses the conformal interval alone.
+        """
+        per_tree = self.engine.predict_trees(self._scale(X))
+        prediction = self.engine.aggregate(per_tree)
+        conformal_lower, conformal_upper = conformal_interval(prediction, self.residual_quantile)
+        if self.engine.n_trees == 1:
+            return prediction, conformal_lower, conformal_upper
+        lower, upper = np.quantile(per_tree, [self.alpha / 2, 1 - self.alpha / 2], axis=1)
+        if self.residual_quantile is not None:
+            lower, upper = np.minimum(lower, conformal_lower), np.maximum(upper, conformal_upper)
+        return prediction, lower, upper
+
+    def export_arrays(self):
+        """Return (arrays, params) from which from_exported() rebuilds this predictor"""
+        arrays = {f'engine_{name}': array for name, array in self.engine.compiled_arrays().items()}
+        arrays.update({'mean': self.mean, 'scale': self.scale})
+        return arrays, {'max_depth': self.engine.max_depth, 'alpha': self.alpha,
+                        'residual_quantile': self.residual_quantile}
+
+    @classmethod
+    def from_exported(cls, arrays, params):
+        predictor = cls.__new__(cls)
+        predictor.engine = ForestEngine.from_compiled(
+            {name[len('engine_'):]: array for name, array in arrays.items() if name.startswith('engine_')},
+            params['max_depth'])
+        predictor.mean = arrays['mean']
+        predictor.scale = arrays['scale']
+        predictor.alpha = params['alpha']
+        predictor.residual_quantile = params['residual_quantile']
+        return predictor
+
+
+# Predictors that can be exported as plain arrays (e.g. into shared memory) and rebuilt
+EXPORTABLE_PREDICTORS = {cls.__name__: cls for cls in [FusedLinearPredictor, ForestPredictor]}
+
+
+def holdout_calibration(predictor, encoder, data_path, alpha=DEFAULT_INTERVAL_ALPHA):
+    """Split-conformal calibration on the held-out rows of the training data.
+
+    The rows are the test split of train_test_split(test_size=0.2, random_state=42), as
+    in housing_analysis.py, so a model trained by it has never seen them.
+    """
+    df = load_housing_data(data_path)
+    _, test_rows = train_test_split(np.arange(len(df)), test_size=HOLDOUT_TEST_SIZE,
+                                    random_state=HOLDOUT_RANDOM_STATE)
+    X_test = encoder.transform(df, rows=test_rows)
+    residuals = df['price'].to_numpy(dtype=np.float64)[test_rows] - predictor.predict(X_test)
+    return {'method': 'split_conformal', 'alpha': alpha, 'residual_quantile': conformal_quantile(residuals, alpha),
+            'n_calibration': len(test_rows)}
+
+
+def build_predictor(model, scaler, calibration=None):
+    """Return a predictor on raw encoded features.
+
+    Linear models are fused into one dot product and regression forests/trees run on the
+    array-backed ForestEngine; anything else goes through scaler.transform + model.predict.
+    calibration (from a bundle manifest or holdout_calibration) supplies alpha and the
+    conformal residual quantile.
+    """
+    calibration = calibration or {}
+    alpha = calibration.get('alpha', DEFAULT_INTERVAL_ALPHA)
+    residual_quantile = calibration.get('residual_quantile')
+    if isinstance(model, LinearRegression) and np.ndim(model.coef_) == 1:
+        return FusedLinearPredictor.from_estimators(model, scaler, residual_quantile)
+    if isinstance(model, (RandomForestRegressor, DecisionTreeRegressor)) and model.n_outputs_ == 1:
+        return ForestPredictor(ForestEngine.from_estimator(model), scaler, alpha, residual_quantile)
+    return ScaledPredictor(model, scaler, residual_quantile)
+
+
+def bundle_predictor(bundle):
+    """Return a predictor for a loaded ModelBundle straight from its arrays.
+
+    Linear models use the stored fused coefficients and trees/forests the stored node
+    arrays, so neither needs the sklearn estimator; only other models load estimator.pkl.
+    """
+    calibration = bundle.manifest.get('calibration', {})
+    alpha = calibration.get('alpha', DEFAULT_INTERVAL_ALPHA)
+    residual_quantile = calibration.get('residual_quantile')
+    arrays = bundle.arrays
+    if 'fused_coef' in arrays:
+        return FusedLinearPredictor(arrays['fused_coef'], arrays['fused_intercept'][0], residual_quantile)
+    if 'tree_offsets' in arrays:
+        return ForestPredictor(ForestEngine.from_arrays(arrays), bundle.scaler, alpha, residual_quantile)
+    return ScaledPredictor(bundle.model, bundle.scaler, residual_quantile)
+
+
+def load_predictor(directory='.'):
+    """Return (predictor, label_encoders, feature_names) for serving.
+
+    Uses the latest bundle under models/ (see bundle_predictor) and falls back to the
+    legacy pickles otherwise, calibrating their intervals on the holdout rows of
+    Housing.csv when it is next to them (see holdout_calibration).
+    """
+    root = os.path.join(directory, BUNDLE_ROOT)
+    if latest_version(root) is None:
+        model, scaler, label_encoders, feature_names = load_artifacts(directory)
+        predictor = build_predictor(model, scaler)
+        data_path = os.path.join(directory, DATA_FILE)
+        if os.path.exists(data_path):
+            calibration = holdout_calibration(predictor, FeatureEncoder(label_encoders, feature_names), data_path)
+            predictor = build_predictor(model, scaler, calibration)
+        return predictor, label_encoders, feature_names
+    bundle = load_bundle(root)
+    return bundle_predictor(bundle), bundle.label_encoders, bundle.feature_names
+
+
+def sensitivity_grid(predictor, encoder, record, areas, counts, vary='bedrooms'):
+    """Predict prices over an area x count grid around one property.
+
+    The base property is encoded once and tiled into a single (len(counts) * len(areas))-row
+    matrix with the area and ``vary`` columns overwritten, so the whole grid costs one
+    predict call. Returns a (len(counts), len(areas)) array.
+    """
+    base = encoder.transform_row(record)
+    X = np.repeat(base, len(counts) * len(areas), axis=0)
+    area_idx = encoder.feature_names.index('area')
+    count_idx = encoder.feature_names.index(vary)
+    X[:, area_idx] = np.tile(np.asarray(areas, dtype=np.float64), len(counts))
+    X[:, count_idx] = np.repeat(np.asarray(counts, dtype=np.float64), len(areas))
+    return predictor.predict(X).reshape(len(counts), len(areas))
+
+
+def predict_frame(frame, predictor, encoder):
+    """Return (prediction, lower, upper) arrays for every row of a raw property DataFrame"""
+    return predictor.predict_interval(encoder.transform(frame))
+
+
+class PredictionCache:
+    """Bounded LRU cache of predictions keyed on the normalized property input.
+
+    A cache belongs to one model version; create a new one when the artifacts change.
+    Safe to share between Streamlit sessions (threads).
+    """
+
+    def __init__(self, maxsize=1024, model_version=None):
+        self.maxsize = maxsize
+        self.model_version = model_version
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(record):
+        """Normalize a raw property dict into a hashable key"""
+        return (tuple(float(record[col]) for col in NUMERIC_COLS)
+                + tuple(str(record[col]).strip().lower() for col in BINARY_COLS)
+                + (str(record[FURNISHING_COL]).strip().lower(),))
+
+    def get_or_compute(self, record, compute):
+        """Return the cached prediction for record, calling compute(record) on a miss"""
+        key = self.make_key(record)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = compute(record)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'model_version': self.model_version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize
+            }
@@ -0,0 +1,194 @@
+"""
+Housing Price Prediction - HTTP Prediction Service
+A small local JSON service over the trained model. Requests that arrive at the same time
+are gathered into micro-batches and scored with one vectorized predict call.
+
+Usage:
+    python prediction_service.py --port 8000 --max-batch-size 64 --max-wait-ms 2
+
+    POST /predict   body: one property object, or an array of them
+    GET  /health    model version and batching counters
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import warnings
+warnings.filterwarnings('ignore')
+
+from prediction import FeatureEncoder, artifact_version, load_predictor
+
+
+class MicroBatcher:
+    """Collects encoded requests from many threads and scores them in shared batches.
+
+    A batch is closed when it holds max_batch_size rows or when max_wait_ms has passed
+    since its first request arrived, whichever comes first.
+    """
+
+    def __init__(self, predictor, max_batch_size=64, max_wait_ms=2.0):
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.rows = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, X):
+        """Queue an encoded (n, n_features) matrix and return a Future of its
+        (prediction, lower, upper) arrays"""
+        future = Future()
+        self._queue.put((X, future))
+        return future
+
+    def _run(self):
+        while True:
+            pending = [self._queue.get()]
+            n_rows = len(pending[0][0])
+            deadline = time.perf_counter() + self.max_wait
+            while n_rows < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(item)
+                n_rows += len(item[0])
+            self._score(pending)
+
+    def _score(self, pending):
+        try:
+            prediction, lower, upper = self.predictor.predict_interval(np.vstack([X for X, _ in pending]))
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(prediction)
+        offset = 0
+        for X, future in pending:
+            rows = slice(offset, offset + len(X))
+            future.set_result((prediction[rows], lower[rows], upper[rows]))
+            offset += len(X)
+
+    def stats(self):
+        """Return batching counters"""
+        return {
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_size': self.rows / self.batches if self.batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000
+        }
+
+
+def _finite_or_none(value):
+    """JSON has no NaN; uncalibrated interval bounds are reported as null"""
+    return float(value) if np.isfinite(value) else None
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    """JSON endpoints; the encoder, batcher and model version are set on the server"""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; avoid Nagle + delayed-ACK stalls on keep-alive
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._send(404, {'error': f'Unknown path {self.path}'})
+            return
+        self._send(200, {'status': 'ok', 'model_version': self.server.model_version, **self.server.batcher.stats()})
+
+    def do_POST(self):
+        if self.path != '/predict':
+            self._send(404, {'error': f'Unknown path {self.path}'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length))
+            records = payload if isinstance(payload, list) else [payload]
+            if not records or not all(isinstance(record, dict) for record in records):
+                raise ValueError("Expected a property object or a non-empty array of them")
+            X = np.zeros((len(records), self.server.encoder.n_features))
+            for i, record in enumerate(records):
+                self.server.encoder.transform_row(record, out=X[i:i + 1])
+        except KeyError as e:
+            self._send(400, {'error': f'Missing field {e.args[0]!r}'})
+            return
+        except (ValueError, TypeError) as e:
+            self._send(400, {'error': str(e)})
+            return
+
+        try:
+            prediction, lower, upper = self.server.batcher.submit(X).result()
+        except Exception as e:
+            self._send(500, {'error': f'Error making prediction: {e}'})
+            return
+        if not np.isfinite(prediction).all():
+            self._send(500, {'error': 'Model returned a non-finite prediction'})
+            return
+        results = [{'prediction': float(p), 'lower': _finite_or_none(lo), 'upper': _finite_or_none(hi)}
+                   for p, lo, hi in zip(prediction, lower, upper)]
+        if isinstance(payload, list):
+            self._send(200, {'predictions': results})
+        else:
+            self._send(200, results[0])
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def create_server(host='127.0.0.1', port=8000, model_dir='.', max_batch_size=64, max_wait_ms=2.0, verbose=False):
+    """Load the artifacts once and build a ready-to-serve HTTP server"""
+    predictor, label_encoders, feature_names = load_predictor(model_dir)
+    server = ThreadingHTTPServer((host, port), PredictionHandler)
+    server.daemon_threads = True
+    server.encoder = FeatureEncoder(label_encoders, feature_names)
+    server.batcher = MicroBatcher(predictor, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    server.model_version = artifact_version(model_dir)
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve house price predictions over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--model-dir', default='.', help="Directory holding the trained artifacts")
+    parser.add_argument('--max-batch-size', type=int, default=64, help="Most rows scored in one predict call")
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help="Longest a request waits for a batch to fill")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args(argv)
+
+    server = create_server(args.host, args.port, args.model_dir, args.max_batch_size, args.max_wait_ms, args.verbose)
+    print(f"✓ Serving predictions on http://{args.host}:{args.port}/predict "
+          f"(max batch {args.max_batch_size}, max wait {args.max_wait_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
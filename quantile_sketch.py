@@ -0,0 +1,282 @@
+"""
+Housing Price Prediction - Streaming Quantile Sketch
+Approximate Q1/median/Q3 and IQR outlier counts per column over a CSV read in chunks,
+in memory bounded by the sketch size rather than the file size.
+
+KLLSketch is the KLL sketch of Karnin, Lang and Liberty: a stack of compactors where
+level h holds items of weight 2**h. When a level exceeds its capacity (k at the top,
+shrinking by a factor 2/3 per level below), it is sorted and every other item (random
+offset) is promoted to the next level. The sketch keeps about 3k items, every quantile it
+returns has a normalized rank error of about 2.3 / k**0.97 (99% confidence), and two
+sketches merge level by level, so chunks or files can be summarized independently.
+
+Outlier counts take a second pass over the file, counting values outside the bounds
+computed from the sketched quartiles; --one-pass estimates them from the sketch instead.
+
+Usage:
+    python quantile_sketch.py                             # check against exact quantiles on Housing.csv
+    python quantile_sketch.py listing_history.csv --epsilon 0.005 --chunk-size 200000
+    python quantile_sketch.py part_*.csv --one-pass       # one sketch per file, merged
+"""
+
+import argparse
+import math
+import time
+import numpy as np
+import pandas as pd
+
+from housing_data import HOUSING_SCHEMA
+
+DEFAULT_K = 200
+# Capacity ratio between consecutive levels
+CAPACITY_RATIO = 2 / 3
+MIN_CAPACITY = 2
+QUANTILES = (0.25, 0.5, 0.75)
+IQR_MULTIPLIER = 1.5
+NUMERIC_COLUMNS = [col for col, dtype in HOUSING_SCHEMA.items()
+                   if isinstance(dtype, np.dtype) and np.issubdtype(dtype, np.integer)]
+
+
+class KLLSketch:
+    """Mergeable quantile sketch of a stream of numbers (NaNs are ignored)"""
+
+    def __init__(self, k=DEFAULT_K, seed=None):
+        self.k = int(k)
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def for_error(cls, epsilon, seed=None):
+        """A sketch whose normalized rank error is at most epsilon"""
+        return cls(max(8, math.ceil((2.296 / epsilon) ** (1 / 0.9723))), seed)
+
+    @property
+    def normalized_rank_error(self):
+        """Rank error bound as a fraction of n (99% confidence, the DataSketches KLL estimate)"""
+        return 2.296 / self.k ** 0.9723
+
+    @property
+    def n_retained(self):
+        return sum(len(items) for items in self.levels)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(MIN_CAPACITY, math.ceil(self.k * CAPACITY_RATIO ** depth))
+
+    def update(self, values):
+        """Add an array of values"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.n += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def _compress(self):
+        """Compact every level over capacity, from the bottom up"""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind, so the total weight is preserved exactly
+                keep = len(items) % 2
+                promoted = items[keep + self.rng.integers(2)::2]
+                self.levels[level] = items[:keep]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def merge(self, other):
+        """Return a sketch of both streams combined"""
+        merged = KLLSketch(max(self.k, other.k))
+        merged.rng = self.rng
+        merged.n = self.n + other.n
+        merged.min, merged.max = min(self.min, other.min), max(self.max, other.max)
+        depth = max(len(self.levels), len(other.levels))
+        merged.levels = [np.concatenate([a[h] if h < len(a) else np.empty(0) for a in (self.levels, other.levels)])
+                         for h in range(depth)]
+        merged._compress()
+        return merged
+
+    __add__ = merge
+
+    def _weighted(self):
+        """Retained items in sorted order with their cumulative weights"""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Approximate q-quantile(s): the smallest retained item whose weighted rank reaches q * n"""
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        items, cumulative = self._weighted()
+        q = np.asarray(q, dtype=np.float64)
+        index = np.searchsorted(cumulative, np.maximum(q * self.n, 1), side='left')
+        result = items[np.minimum(index, len(items) - 1)]
+        # The extremes are tracked exactly
+        result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, result))
+        return result if result.ndim else float(result)
+
+    def rank(self, value, inclusive=True):
+        """Approximate number of stream values <= value (< value if not inclusive)"""
+        if self.n == 0:
+            return 0
+        items, cumulative = self._weighted()
+        index = np.searchsorted(items, value, side='right' if inclusive else 'left')
+        return int(cumulative[index - 1]) if index else 0
+
+    def save(self, path):
+        np.savez(path, k=self.k, n=self.n, min=self.min, max=self.max,
+                 sizes=[len(items) for items in self.levels], items=np.concatenate(self.levels))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            sketch = cls(int(data['k']))
+            sketch.n, sketch.min, sketch.max = int(data['n']), float(data['min']), float(data['max'])
+            sketch.levels = np.split(data['items'], np.cumsum(data['sizes'])[:-1])
+        return sketch
+
+
+def iter_columns(paths, columns, chunk_size=100000):
+    """Yield DataFrame chunks of the given columns from one or more CSV files"""
+    for path in paths:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size)
+
+
+def sketch_columns(chunks, columns, k=DEFAULT_K, seed=42):
+    """One KLLSketch per column over a stream of DataFrame chunks"""
+    sketches = {col: KLLSketch(k, seed) for col in columns}
+    for chunk in chunks:
+        for col in columns:
+            sketches[col].update(chunk[col].to_numpy())
+    return sketches
+
+
+def outlier_bounds(sketch, iqr_multiplier=IQR_MULTIPLIER):
+    """Approximate quartiles, median and IQR bounds of one sketched column"""
+    q1, median, q3 = sketch.quantile(QUANTILES)
+    iqr = q3 - q1
+    return {'q1': q1, 'median': median, 'q3': q3, 'iqr': iqr,
+            'lower_bound': q1 - iqr_multiplier * iqr, 'upper_bound': q3 + iqr_multiplier * iqr}
+
+
+def count_outliers(chunks, bounds):
+    """Exact number of values strictly outside each column's bounds (one pass over the chunks)"""
+    counts = dict.fromkeys(bounds, 0)
+    for chunk in chunks:
+        for col, b in bounds.items():
+            values = chunk[col].to_numpy()
+            counts[col] += int(np.count_nonzero((values < b['lower_bound']) | (values > b['upper_bound'])))
+    return counts
+
+
+def streaming_outlier_report(paths, columns=NUMERIC_COLUMNS, chunk_size=100000, k=DEFAULT_K, one_pass=False,
+                             iqr_multiplier=IQR_MULTIPLIER):
+    """Per-column sketched quartiles, IQR bounds and outlier counts over chunked CSV input.
+
+    Returns ({column: statistics}, sketches). Outlier counts are exact for the sketched
+    bounds (a second pass) unless one_pass, in which case they are estimated from the sketch.
+    """
+    sketches = sketch_columns(iter_columns(paths, columns, chunk_size), columns, k)
+    report = {col: outlier_bounds(sketch, iqr_multiplier) for col, sketch in sketches.items()}
+    if one_pass:
+        for col, sketch in sketches.items():
+            b = report[col]
+            b['n_outliers'] = (sketch.rank(b['lower_bound'], inclusive=False)
+                               + sketch.n - sketch.rank(b['upper_bound']))
+    else:
+        counts = count_outliers(iter_columns(paths, columns, chunk_size), report)
+        for col in columns:
+            report[col]['n_outliers'] = counts[col]
+    for col, sketch in sketches.items():
+        report[col]['count'] = sketch.n
+    return report, sketches
+
+
+def print_report(report):
+    print(f"\n  {'Column':<12} {'Q1':>14} {'Median':>14} {'Q3':>14} {'Lower':>14} {'Upper':>14} {'Outliers':>10}")
+    for col, r in report.items():
+        print(f"  {col:<12} {r['q1']:>14,.2f} {r['median']:>14,.2f} {r['q3']:>14,.2f} "
+              f"{r['lower_bound']:>14,.2f} {r['upper_bound']:>14,.2f} "
+              f"{r['n_outliers']:>10,} ({r['n_outliers'] / max(r['count'], 1) * 100:.2f}%)")
+
+
+def validate(path='Housing.csv', k=DEFAULT_K, chunk_size=50, n_parts=4):
+    """Check sketched quantiles and outlier counts against the exact values on a CSV"""
+    df = pd.read_csv(path, usecols=NUMERIC_COLUMNS)
+    n = len(df)
+    report, sketches = streaming_outlier_report([path], chunk_size=chunk_size, k=k)
+    bound = sketches[NUMERIC_COLUMNS[0]].normalized_rank_error
+    print(f"k={k}: {sketches[NUMERIC_COLUMNS[0]].n_retained} of {n} values retained per column, "
+          f"rank error bound {bound:.2%}")
+
+    print(f"\n  {'Column':<12} {'q':>5} {'exact':>14} {'sketch':>14} {'rank error':>11}")
+    worst = 0.0
+    for col in NUMERIC_COLUMNS:
+        values = np.sort(df[col].to_numpy())
+        for q, estimate in zip(QUANTILES, sketches[col].quantile(QUANTILES)):
+            # Rank error: how far the estimate's rank range in the sorted data is from q * n
+            low, high = np.searchsorted(values, estimate, 'left'), np.searchsorted(values, estimate, 'right')
+            error = max(0, low - q * n, q * n - high) / n
+            worst = max(worst, error)
+            print(f"  {col:<12} {q:>5.2f} {df[col].quantile(q):>14,.2f} {estimate:>14,.2f} {error:>11.2%}")
+    assert worst <= bound, f"rank error {worst:.2%} exceeds the bound {bound:.2%}"
+    print(f"\n✓ Worst rank error {worst:.2%} (bound {bound:.2%})")
+
+    for col in NUMERIC_COLUMNS:
+        values = df[col].to_numpy()
+        r = report[col]
+        exact = int(np.count_nonzero((values < r['lower_bound']) | (values > r['upper_bound'])))
+        assert r['n_outliers'] == exact, (col, r['n_outliers'], exact)
+    print("✓ Streaming outlier counts match the exact counts for the sketched bounds")
+
+    # Sketches of separate parts merge into a sketch of the whole
+    parts = np.array_split(np.arange(n), n_parts)
+    for col in NUMERIC_COLUMNS:
+        values = df[col].to_numpy()
+        merged = sum((KLLSketch(k, seed=i).update(values[part]) for i, part in enumerate(parts)), KLLSketch(k))
+        assert merged.n == n and merged.min == values.min() and merged.max == values.max()
+        ranks = [np.searchsorted(np.sort(values), v, 'right') / n for v in merged.quantile(QUANTILES)]
+        assert all(r >= q - bound for q, r in zip(QUANTILES, ranks))
+    print(f"✓ Sketches of {n_parts} parts merge within the bound")
+
+    print_report(report)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streaming approximate quartiles and IQR outlier counts.")
+    parser.add_argument('paths', nargs='*', help="CSV files with Housing.csv's numeric columns")
+    parser.add_argument('--k', type=int, default=DEFAULT_K, help="Sketch size (larger is more accurate)")
+    parser.add_argument('--epsilon', type=float, help="Target normalized rank error (overrides --k)")
+    parser.add_argument('--chunk-size', type=int, default=100000, help="Rows read per chunk")
+    parser.add_argument('--one-pass', action='store_true', help="Estimate outlier counts from the sketch")
+    args = parser.parse_args(argv)
+    k = KLLSketch.for_error(args.epsilon).k if args.epsilon else args.k
+
+    if not args.paths:
+        print("Validating against exact quantiles on Housing.csv...")
+        validate(k=k)
+        return
+
+    start = time.perf_counter()
+    report, sketches = streaming_outlier_report(args.paths, chunk_size=args.chunk_size, k=k, one_pass=args.one_pass)
+    sketch = next(iter(sketches.values()))
+    print(f"✓ {sketch.n:,} rows from {len(args.paths)} file(s) in {time.perf_counter() - start:.2f}s "
+          f"(k={k}, {sketch.n_retained:,} values retained per column, rank error ≤ {sketch.normalized_rank_error:.2%})")
+    print_report(report)
+
+
+if __name__ == '__main__':
+    main()
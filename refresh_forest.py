@@ -0,0 +1,148 @@
+"""
+Housing Price Prediction - Incremental Random Forest Refresh
+Adds trees fitted on newly arrived sales to the current Random Forest (warm start) instead
+of retraining on the full history, optionally retires the oldest trees, re-evaluates on a
+holdout and writes the result as a new model bundle version.
+
+Only the new trees are fitted, on the new rows only, so refresh time grows with the size
+of the new data rather than with the history. The new rows are encoded and scaled with
+the bundle's existing encoders and scaler, which the old trees' split thresholds depend on.
+
+Usage:
+    python refresh_forest.py new_sales.csv --add-trees 20 --retire-oldest 20
+    python refresh_forest.py new_sales.csv --holdout recent_holdout.csv
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+from sklearn.model_selection import train_test_split
+import warnings
+warnings.filterwarnings('ignore')
+
+from model_bundle import BUNDLE_ROOT, file_sha256, load_bundle, save_bundle
+from prediction import DEFAULT_INTERVAL_ALPHA, FeatureEncoder, conformal_quantile
+
+
+def evaluate(model, X, y):
+    """Holdout RMSE, MAE and R² of a fitted model"""
+    prediction = model.predict(X)
+    return {
+        'rmse': float(np.sqrt(mean_squared_error(y, prediction))),
+        'mae': float(mean_absolute_error(y, prediction)),
+        'r2': float(r2_score(y, prediction))
+    }
+
+
+def check_forest(model):
+    """Raise ValueError unless the model can be refreshed with warm start"""
+    if not isinstance(model, RandomForestRegressor):
+        raise ValueError(f"The current model is a {type(model).__name__}; warm-start refresh needs a "
+                         f"RandomForestRegressor. Retrain with housing_analysis.py instead.")
+
+
+def refresh_forest(model, X_new, y_new, add_trees, retire_oldest=0):
+    """Warm-start add_trees trees fitted on (X_new, y_new), then drop the retire_oldest oldest.
+
+    Modifies and returns the model; raises ValueError if it is not a fitted RandomForestRegressor.
+    """
+    check_forest(model)
+    n_trees = len(model.estimators_)
+    if add_trees < 1:
+        raise ValueError("--add-trees must be at least 1")
+    if not 0 <= retire_oldest < n_trees + add_trees:
+        raise ValueError(f"Cannot retire {retire_oldest} of {n_trees + add_trees} trees")
+
+    # warm_start fits only the trees beyond the current estimators_ (each on a bootstrap of X_new)
+    model.set_params(warm_start=True, n_estimators=n_trees + add_trees)
+    model.fit(X_new, y_new)
+    if retire_oldest:
+        # estimators_ is in fitting order, so the first trees are the oldest
+        model.estimators_ = model.estimators_[retire_oldest:]
+    model.set_params(warm_start=False, n_estimators=len(model.estimators_))
+    return model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Add trees fitted on new sales to the current Random Forest.")
+    parser.add_argument('new_data', help="CSV of new sales with the Housing.csv columns (price required)")
+    parser.add_argument('--add-trees', type=int, default=20, help="Trees to fit on the new data")
+    parser.add_argument('--retire-oldest', type=int, default=0, help="Oldest trees to drop after adding")
+    parser.add_argument('--holdout', help="CSV to evaluate on (default: a split of the new data)")
+    parser.add_argument('--holdout-fraction', type=float, default=0.2,
+                        help="Share of the new data held out when --holdout is not given")
+    parser.add_argument('--model-root', default=BUNDLE_ROOT, help="Bundle directory to refresh")
+    parser.add_argument('--random-state', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    bundle = load_bundle(args.model_root, verify=True)
+    model, scaler = bundle.model, bundle.scaler
+    try:
+        check_forest(model)
+    except ValueError as e:
+        parser.exit(1, f"Error ({args.model_root}/{bundle.version}): {e}\n")
+    encoder = FeatureEncoder(bundle.label_encoders, bundle.feature_names)
+    print(f"Loaded {type(model).__name__} with {len(model.estimators_)} trees from {args.model_root}/{bundle.version}")
+
+    new_df = pd.read_csv(args.new_data)
+    X_new = scaler.transform(encoder.transform(new_df))
+    y_new = new_df['price'].to_numpy(dtype=np.float64)
+    if args.holdout:
+        holdout_df = pd.read_csv(args.holdout)
+        X_fit, y_fit = X_new, y_new
+        X_hold = scaler.transform(encoder.transform(holdout_df))
+        y_hold = holdout_df['price'].to_numpy(dtype=np.float64)
+    else:
+        X_fit, X_hold, y_fit, y_hold = train_test_split(X_new, y_new, test_size=args.holdout_fraction,
+                                                        random_state=args.random_state)
+    print(f"✓ {len(y_fit):,} new rows to fit, {len(y_hold):,} holdout rows")
+
+    before = evaluate(model, X_hold, y_hold)
+    n_before = len(model.estimators_)
+    start = time.perf_counter()
+    try:
+        refresh_forest(model, X_fit, y_fit, args.add_trees, args.retire_oldest)
+    except ValueError as e:
+        parser.exit(1, f"Error: {e}\n")
+    refresh_time = time.perf_counter() - start
+    after = evaluate(model, X_hold, y_hold)
+
+    print(f"\n✓ Added {args.add_trees} trees, retired {args.retire_oldest} "
+          f"({n_before} -> {len(model.estimators_)} trees) in {refresh_time:.2f}s")
+    print(f"\n  {'Holdout':<10} {'RMSE':>14} {'MAE':>14} {'R²':>8}")
+    for label, metrics in [('before', before), ('after', after)]:
+        print(f"  {label:<10} {metrics['rmse']:>14,.0f} {metrics['mae']:>14,.0f} {metrics['r2']:>8.4f}")
+
+    # Recalibrate on the holdout for the refreshed trees: the conformal quantile sets the
+    # minimum width of the forest's per-tree interval
+    calibration = dict(bundle.manifest.get('calibration', {}))
+    calibration.update({
+        'method': 'split_conformal',
+        'alpha': calibration.get('alpha', DEFAULT_INTERVAL_ALPHA),
+        'residual_quantile': conformal_quantile(y_hold - model.predict(X_hold),
+                                                calibration.get('alpha', DEFAULT_INTERVAL_ALPHA)),
+        'n_calibration': len(y_hold)
+    })
+    metrics = {
+        'best_model': bundle.metrics.get('best_model', 'Random Forest Regressor'),
+        'holdout_before_refresh': before,
+        'holdout_after_refresh': after
+    }
+    refresh = {
+        'parent_version': bundle.version,
+        'added_trees': args.add_trees,
+        'retired_trees': args.retire_oldest,
+        'n_new_rows': len(y_fit),
+        'refresh_time': refresh_time
+    }
+    version = save_bundle(model, scaler, bundle.label_encoders, bundle.feature_names, metrics=metrics,
+                          data_hash=file_sha256(args.new_data), root=args.model_root,
+                          extra={'calibration': calibration, 'refresh': refresh})
+    print(f"\n✓ Model bundle saved to {args.model_root}/{version} ({args.model_root}/LATEST updated)")
+
+
+if __name__ == '__main__':
+    main()
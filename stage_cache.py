@@ -0,0 +1,271 @@
+"""
+Housing Price Prediction - Content-Hashed Stage Cache
+Runs the named stages of housing_analysis.py and skips those whose inputs and code have
+not changed since a previous run.
+
+A stage's fingerprint is the SHA-256 of its name, the source code of its function (and of
+any helper functions or modules it declares), and its inputs: DataFrames and arrays by
+content, estimators by class and parameters, upstream stages by their own fingerprints.
+
+Layout:
+    .cache/stages/<stage>/<fingerprint>/value.pkl   the stage's return value
+    .cache/stages/<stage>/<fingerprint>/stdout.txt  console output, replayed on reuse
+    .cache/stages/<stage>/<fingerprint>/files/      copies of the files the stage wrote
+    .cache/stages/<stage>/<fingerprint>/meta.json   file checksums and the original run time
+
+Reusing a stage prints its captured output again and restores any of its output files
+that are missing or were changed since.
+
+run_parallel runs a batch of independent stages (e.g. one per figure) in a process pool:
+cached stages are reused as usual, the rest run as separate jobs, each timed, and a job
+that raises is reported and skipped instead of stopping the batch.
+"""
+
+import contextlib
+import hashlib
+import inspect
+import io
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from model_bundle import file_sha256
+
+STAGE_CACHE_ROOT = os.path.join('.cache', 'stages')
+# Fingerprints kept per stage; older entries are removed
+KEEP_ENTRIES = 3
+
+
+def _feed(digest, obj):
+    """Add a canonical byte representation of obj to the digest"""
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        digest.update(f'{type(obj).__name__}:{obj!r};'.encode())
+    elif isinstance(obj, bytes):
+        digest.update(b'bytes:' + obj)
+    elif isinstance(obj, dict):
+        digest.update(b'dict{')
+        for key in sorted(obj, key=repr):
+            _feed(digest, key)
+            _feed(digest, obj[key])
+        digest.update(b'}')
+    elif isinstance(obj, (list, tuple)):
+        digest.update(f'{type(obj).__name__}['.encode())
+        for item in obj:
+            _feed(digest, item)
+        digest.update(b']')
+    elif isinstance(obj, np.ndarray):
+        _feed(digest, (str(obj.dtype), obj.shape))
+        if obj.dtype == object:
+            _feed(digest, obj.tolist())
+        else:
+            digest.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (pd.DataFrame, pd.Series)):
+        columns = list(obj.columns) if isinstance(obj, pd.DataFrame) else [obj.name]
+        dtypes = obj.dtypes.astype(str).tolist() if isinstance(obj, pd.DataFrame) else [str(obj.dtype)]
+        _feed(digest, (columns, dtypes))
+        digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif inspect.ismodule(obj) or inspect.isfunction(obj) or inspect.isclass(obj):
+        digest.update(inspect.getsource(obj).encode())
+    elif hasattr(obj, 'get_params'):
+        _feed(digest, (type(obj).__module__, type(obj).__name__, obj.get_params(deep=False)))
+    else:
+        digest.update(pickle.dumps(obj, protocol=4))
+
+
+def fingerprint(*parts):
+    """Return the hex SHA-256 of the canonical representation of parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        _feed(digest, part)
+    return digest.hexdigest()
+
+
+class _Tee(io.TextIOBase):
+    """Writes to the real stdout and keeps a copy"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer_copy = io.StringIO()
+
+    def write(self, text):
+        self.stream.write(text)
+        self.buffer_copy.write(text)
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def _run_captured(func, inputs, setup=None):
+    """Run one stage in a worker; return (value, stdout, elapsed, error traceback or None)"""
+    start = time.perf_counter()
+    buffer = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buffer):
+            if setup is not None:
+                setup()
+            value = func(**inputs)
+        return value, buffer.getvalue(), time.perf_counter() - start, None
+    except Exception:
+        return None, buffer.getvalue(), time.perf_counter() - start, traceback.format_exc()
+
+
+class StageRunner:
+    """Runs stages through the cache and records which ones were reused"""
+
+    def __init__(self, root=STAGE_CACHE_ROOT, enabled=True, rerun=()):
+        self.root = root
+        self.enabled = enabled
+        self.rerun = set(rerun)
+        self.keys = {}
+        self.log = []
+        self.batches = []
+
+    def run(self, name, func, inputs=None, code=(), upstream=None, files=(), is_valid=None):
+        """Return func(**inputs), from the cache when the stage fingerprint is unchanged.
+
+        code lists extra functions or modules the stage depends on. upstream maps input
+        names to the stages that produced them; those inputs are fingerprinted by the
+        producing stage's fingerprint instead of by content. files lists the paths the
+        stage writes; is_valid(value) may reject a cached value that no longer matches the
+        outside world (e.g. a deleted model bundle).
+        """
+        inputs = inputs or {}
+        upstream = upstream or {}
+        hashed_inputs = {arg: ('stage', upstream[arg], self.keys[upstream[arg]]) if arg in upstream else value
+                         for arg, value in inputs.items()}
+        key = fingerprint(name, func, list(code), hashed_inputs)
+        self.keys[name] = key
+        entry = os.path.join(self.root, name, key[:20])
+        start = time.perf_counter()
+
+        forced = name in self.rerun or name.split('/')[0] in self.rerun
+        if self.enabled and not forced and os.path.exists(os.path.join(entry, 'meta.json')):
+            value = self._load(entry)
+            if is_valid is None or is_valid(value):
+                self.log.append((name, 'reused', time.perf_counter() - start))
+                return value
+
+        tee = _Tee(sys.stdout)
+        with contextlib.redirect_stdout(tee):
+            value = func(**inputs)
+        elapsed = time.perf_counter() - start
+        if self.enabled:
+            self._store(entry, value, tee.buffer_copy.getvalue(), files, elapsed)
+        self.log.append((name, 'ran', elapsed))
+        return value
+
+    def run_parallel(self, stages, n_jobs=1, setup=None, label='parallel'):
+        """Run independent stages in a process pool; return {name: value} for those that succeeded.
+
+        stages is a list of dicts with the keyword arguments of run() (name, func, inputs,
+        code, files). Cached stages are reused; the others run as separate jobs on up to
+        n_jobs loky workers, calling setup() first in each. Output is printed in stage
+        order once the batch is done. A stage that raises is logged as failed, its
+        traceback printed, and nothing is cached for it.
+        """
+        start = time.perf_counter()
+        planned = []
+        for stage in stages:
+            name = stage['name']
+            key = fingerprint(name, stage['func'], list(stage.get('code', ())), stage.get('inputs', {}))
+            self.keys[name] = key
+            entry = os.path.join(self.root, name, key[:20])
+            forced = name in self.rerun or name.split('/')[0] in self.rerun
+            cached = self.enabled and not forced and os.path.exists(os.path.join(entry, 'meta.json'))
+            planned.append((stage, entry, cached))
+
+        to_run = [(stage, entry) for stage, entry, cached in planned if not cached]
+        workers = max(1, min(n_jobs, len(to_run)))
+        outcomes = Parallel(n_jobs=workers, backend='loky')(
+            delayed(_run_captured)(stage['func'], stage.get('inputs', {}), setup) for stage, _ in to_run)
+        outcomes = dict(zip([stage['name'] for stage, _ in to_run], outcomes))
+
+        values = {}
+        job_time = 0.0
+        for stage, entry, cached in planned:
+            name = stage['name']
+            if cached:
+                load_start = time.perf_counter()
+                values[name] = self._load(entry)
+                self.log.append((name, 'reused', time.perf_counter() - load_start))
+                continue
+            value, stdout, elapsed, error = outcomes[name]
+            sys.stdout.write(stdout)
+            job_time += elapsed
+            if error is not None:
+                print(f"✗ Stage {name} failed after {elapsed:.2f}s:\n{error}")
+                self.log.append((name, 'failed', elapsed))
+                continue
+            if self.enabled:
+                self._store(entry, value, stdout, stage.get('files', ()), elapsed)
+            self.log.append((name, 'ran', elapsed))
+            values[name] = value
+        self.batches.append((label, len(to_run), workers, time.perf_counter() - start, job_time))
+        return values
+
+    def _load(self, entry):
+        with open(os.path.join(entry, 'meta.json')) as f:
+            meta = json.load(f)
+        with open(os.path.join(entry, 'stdout.txt'), encoding='utf-8') as f:
+            sys.stdout.write(f.read())
+        for index, (path, sha) in enumerate(meta['files']):
+            if not os.path.exists(path) or file_sha256(path) != sha:
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                shutil.copyfile(os.path.join(entry, 'files', str(index)), path)
+        with open(os.path.join(entry, 'value.pkl'), 'rb') as f:
+            return pickle.load(f)
+
+    def _store(self, entry, value, stdout, files, elapsed):
+        parent = os.path.dirname(entry)
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=parent)
+        try:
+            with open(os.path.join(staging, 'value.pkl'), 'wb') as f:
+                pickle.dump(value, f)
+            with open(os.path.join(staging, 'stdout.txt'), 'w', encoding='utf-8') as f:
+                f.write(stdout)
+            os.makedirs(os.path.join(staging, 'files'))
+            for index, path in enumerate(files):
+                shutil.copyfile(path, os.path.join(staging, 'files', str(index)))
+            with open(os.path.join(staging, 'meta.json'), 'w') as f:
+                json.dump({'files': [[path, file_sha256(path)] for path in files], 'elapsed': elapsed}, f)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.rename(staging, entry)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self._prune(parent)
+
+    def _prune(self, parent):
+        """Keep the KEEP_ENTRIES most recently written fingerprints of a stage"""
+        entries = [os.path.join(parent, name) for name in os.listdir(parent) if not name.startswith('.')]
+        entries = [path for path in entries if os.path.exists(os.path.join(path, 'meta.json'))]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for path in entries[KEEP_ENTRIES:]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def report(self):
+        """Print which stages were reused and which ran"""
+        print("\n" + "="*80)
+        print("STAGE SUMMARY")
+        print("="*80)
+        for name, status, elapsed in self.log:
+            print(f"  {name:<34} {status:<8} {elapsed:>8.2f}s")
+        reused = sum(status == 'reused' for _, status, _ in self.log)
+        print(f"\n✓ {reused} of {len(self.log)} stages reused from {self.root}/")
+        for label, n_ran, workers, wall, job_time in self.batches:
+            if n_ran:
+                print(f"✓ {label}: {n_ran} job(s) on {workers} worker(s) in {wall:.2f}s wall time "
+                      f"(sum of job times {job_time:.2f}s)")
+        failed = [name for name, status, _ in self.log if status == 'failed']
+        if failed:
+            print(f"✗ {len(failed)} stage(s) failed: {', '.join(failed)}")
@@ -0,0 +1,248 @@
+"""
+Housing Price Prediction - Streaming (Out-of-Core) Training
+Trains a linear model on a CSV of any size by reading it in fixed-size chunks. Memory use
+depends on the chunk size, not on the file size.
+
+    pass 0      running StandardScaler statistics (partial_fit) for features and target
+    epochs      SGDRegressor.partial_fit on standardized chunks, shuffled within each chunk
+    final pass  holdout metrics and a bounded residual sample for the prediction interval
+
+Every chunk is encoded with a fixed schema (the yes/no classes and furnishing
+categories of Housing.csv), so the encoding does not depend on which values a chunk
+happens to contain. The result is saved as a normal model bundle that the app, the
+batch scorer and the prediction service load unchanged.
+
+Usage:
+    python streaming_training.py listing_history.csv --chunk-size 100000 --epochs 5
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression, SGDRegressor
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+import warnings
+warnings.filterwarnings('ignore')
+
+from batch_predict import peak_rss_mb
+from model_bundle import BUNDLE_ROOT, file_sha256, save_bundle
+from prediction import (BINARY_COLS, DEFAULT_INTERVAL_ALPHA, FURNISHING_COL, FURNISHING_PREFIX, INPUT_COLS,
+                        FeatureEncoder, conformal_quantile)
+
+# Fixed schema: same classes and column order as housing_analysis.py produces on Housing.csv
+BINARY_CLASSES = ['no', 'yes']
+FURNISHING_CATEGORIES = ['furnished', 'semi-furnished', 'unfurnished']
+FEATURE_NAMES = ([col for col in INPUT_COLS if col != FURNISHING_COL] +
+                 [FURNISHING_PREFIX + value for value in FURNISHING_CATEGORIES[1:]])  # drop_first=True
+CSV_DTYPES = {**{col: 'int64' for col in ['price', 'area', 'bedrooms', 'bathrooms', 'stories', 'parking']},
+              **{col: 'object' for col in BINARY_COLS + [FURNISHING_COL]}}
+
+# Upper bound on holdout residuals kept for the conformal interval
+RESIDUAL_SAMPLE_SIZE = 100_000
+
+
+def fixed_label_encoders():
+    """LabelEncoders with the fixed yes/no classes (as LabelEncoder.fit would sort them)"""
+    label_encoders = {}
+    for col in BINARY_COLS:
+        le = LabelEncoder()
+        le.classes_ = np.asarray(BINARY_CLASSES, dtype=object)
+        label_encoders[col] = le
+    return label_encoders
+
+
+def iter_chunks(path, encoder, chunk_size):
+    """Yield (global row offset, X, y) for each chunk of the CSV, encoded with the fixed schema"""
+    offset = 0
+    for chunk in pd.read_csv(path, usecols=list(CSV_DTYPES), dtype=CSV_DTYPES, chunksize=chunk_size):
+        unknown = set(chunk[FURNISHING_COL].unique()) - set(FURNISHING_CATEGORIES)
+        if unknown:
+            raise ValueError(f"Unknown values {sorted(unknown)!r} for {FURNISHING_COL}")
+        yield offset, encoder.transform(chunk), chunk['price'].to_numpy(dtype=np.float64)
+        offset += len(chunk)
+
+
+def holdout_mask(offset, n_rows, holdout_every):
+    """Deterministic holdout: every holdout_every-th row of the file"""
+    return (np.arange(offset, offset + n_rows) % holdout_every) == 0
+
+
+class StreamingMetrics:
+    """Running RMSE / MAE / R² over (y, prediction) batches"""
+
+    def __init__(self):
+        self.n = 0
+        self.sum_y = 0.0
+        self.sum_y2 = 0.0
+        self.sse = 0.0
+        self.sae = 0.0
+
+    def update(self, y, prediction):
+        residual = y - prediction
+        self.n += len(y)
+        self.sum_y += y.sum()
+        self.sum_y2 += np.dot(y, y)
+        self.sse += np.dot(residual, residual)
+        self.sae += np.abs(residual).sum()
+
+    def result(self):
+        if self.n == 0:
+            return {'rmse': float('nan'), 'mae': float('nan'), 'r2': float('nan'), 'n': 0}
+        total = self.sum_y2 - self.sum_y ** 2 / self.n
+        return {
+            'rmse': float(np.sqrt(self.sse / self.n)),
+            'mae': self.sae / self.n,
+            'r2': 1 - self.sse / total if total > 0 else float('nan'),
+            'n': self.n
+        }
+
+
+class ResidualReservoir:
+    """Uniform fixed-size sample of a residual stream (reservoir sampling)"""
+
+    def __init__(self, size, rng):
+        self.size = size
+        self.rng = rng
+        self.seen = 0
+        self.sample = np.empty(size)
+
+    def update(self, values):
+        n_fill = min(max(self.size - self.seen, 0), len(values))
+        self.sample[self.seen:self.seen + n_fill] = values[:n_fill]
+        rest = values[n_fill:]
+        if len(rest):
+            # Item number t (0-based) replaces a random slot with probability size / (t + 1)
+            positions = self.rng.integers(0, self.seen + n_fill + np.arange(len(rest)) + 1)
+            keep = positions < self.size
+            self.sample[positions[keep]] = rest[keep]
+        self.seen += len(values)
+
+    def values(self):
+        return self.sample[:min(self.seen, self.size)]
+
+
+def train_streaming(path, chunk_size=50000, epochs=5, holdout_every=10, alpha=1e-4, eta0=0.01,
+                    random_state=42):
+    """Fit scaler and SGD model chunk by chunk; return (model, scaler, label_encoders, report)"""
+    label_encoders = fixed_label_encoders()
+    encoder = FeatureEncoder(label_encoders, FEATURE_NAMES)
+    rng = np.random.default_rng(random_state)
+
+    # Pass 0: running mean/variance of the training rows' features and target
+    start = time.perf_counter()
+    scaler = StandardScaler()
+    target_scaler = StandardScaler()
+    for offset, X, y in iter_chunks(path, encoder, chunk_size):
+        train = ~holdout_mask(offset, len(y), holdout_every)
+        if train.any():
+            scaler.partial_fit(X[train])
+            target_scaler.partial_fit(y[train, None])
+    if not hasattr(scaler, 'mean_'):
+        raise ValueError(f"No training rows in {path}")
+    y_mean, y_std = float(target_scaler.mean_[0]), float(target_scaler.scale_[0])
+    print(f"✓ Pass 0: scaler statistics over {int(np.max(scaler.n_samples_seen_)):,} training rows "
+          f"({time.perf_counter() - start:.2f}s)")
+
+    # Epochs: SGD on standardized features and target, so the step size does not depend on
+    # prices being in the millions
+    sgd = SGDRegressor(alpha=alpha, eta0=eta0, random_state=random_state)
+    epoch_report = []
+    for epoch in range(1, epochs + 1):
+        start = time.perf_counter()
+        progressive = StreamingMetrics()
+        for offset, X, y in iter_chunks(path, encoder, chunk_size):
+            holdout = holdout_mask(offset, len(y), holdout_every)
+            X = scaler.transform(X)
+            if epoch > 1 and holdout.any():
+                # Holdout rows scored with the model as it stands when their chunk arrives
+                progressive.update(y[holdout], sgd.predict(X[holdout]) * y_std + y_mean)
+            train = np.flatnonzero(~holdout)
+            rng.shuffle(train)
+            if len(train):
+                sgd.partial_fit(X[train], (y[train] - y_mean) / y_std)
+        metrics = progressive.result()
+        epoch_report.append({'epoch': epoch, 'seconds': time.perf_counter() - start, **metrics})
+        score = f"holdout RMSE {metrics['rmse']:,.0f}, R² {metrics['r2']:.4f}" if metrics['n'] else "warm-up"
+        print(f"  Epoch {epoch}/{epochs}: {score} ({epoch_report[-1]['seconds']:.2f}s)")
+
+    # Back to price units: a plain LinearRegression on scaled features, like housing_analysis.py
+    model = LinearRegression()
+    model.coef_ = sgd.coef_ * y_std
+    model.intercept_ = float(sgd.intercept_[0] * y_std + y_mean)
+    model.n_features_in_ = len(FEATURE_NAMES)
+    model.feature_names_in_ = np.asarray(FEATURE_NAMES, dtype=object)
+    scaler.feature_names_in_ = np.asarray(FEATURE_NAMES, dtype=object)
+
+    # Final pass: holdout metrics and residual sample for the interval
+    final = StreamingMetrics()
+    reservoir = ResidualReservoir(RESIDUAL_SAMPLE_SIZE, rng)
+    n_rows = 0
+    for offset, X, y in iter_chunks(path, encoder, chunk_size):
+        holdout = holdout_mask(offset, len(y), holdout_every)
+        n_rows += len(y)
+        if holdout.any():
+            prediction = model.predict(scaler.transform(X[holdout]))
+            final.update(y[holdout], prediction)
+            reservoir.update(y[holdout] - prediction)
+
+    report = {
+        'n_rows': n_rows,
+        'n_train': int(np.max(scaler.n_samples_seen_)),
+        'holdout': final.result(),
+        'epochs': epoch_report,
+        'residuals': reservoir.values()
+    }
+    return model, scaler, label_encoders, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the price model on a large CSV without loading it into memory.")
+    parser.add_argument('input', nargs='?', default='Housing.csv', help="Training CSV (Housing.csv schema)")
+    parser.add_argument('--chunk-size', type=int, default=50000, help="Rows read per chunk")
+    parser.add_argument('--epochs', type=int, default=5, help="Passes of partial_fit over the file")
+    parser.add_argument('--holdout-every', type=int, default=10, help="Hold out every N-th row for evaluation")
+    parser.add_argument('--alpha', type=float, default=1e-4, help="L2 regularization of the SGD regressor")
+    parser.add_argument('--eta0', type=float, default=0.01, help="Initial SGD learning rate")
+    parser.add_argument('--model-root', default=BUNDLE_ROOT, help="Bundle directory to write the new version into")
+    args = parser.parse_args(argv)
+
+    print(f"Streaming {args.input} in chunks of {args.chunk_size:,} rows...")
+    start = time.perf_counter()
+    model, scaler, label_encoders, report = train_streaming(
+        args.input, chunk_size=args.chunk_size, epochs=args.epochs, holdout_every=args.holdout_every,
+        alpha=args.alpha, eta0=args.eta0)
+    elapsed = time.perf_counter() - start
+
+    holdout = report['holdout']
+    residuals = report.pop('residuals')
+    print(f"\n✓ Trained on {report['n_train']:,} of {report['n_rows']:,} rows in {elapsed:.2f}s")
+    print(f"  Holdout ({holdout['n']:,} rows): RMSE {holdout['rmse']:,.2f}, MAE {holdout['mae']:,.2f}, "
+          f"R² {holdout['r2']:.4f}")
+
+    extra = {'training': {'mode': 'streaming', 'chunk_size': args.chunk_size, 'epochs': report['epochs'],
+                          'n_rows': report['n_rows']}}
+    if len(residuals):
+        residual_quantile = conformal_quantile(residuals, DEFAULT_INTERVAL_ALPHA)
+        extra['calibration'] = {
+            'method': 'split_conformal',
+            'alpha': DEFAULT_INTERVAL_ALPHA,
+            'residual_quantile': residual_quantile,
+            'n_calibration': len(residuals)
+        }
+        print(f"  {1 - DEFAULT_INTERVAL_ALPHA:.0%} prediction interval half-width: PKR {residual_quantile:,.0f}")
+
+    metrics = {'best_model': 'Linear Regression (streaming SGD)',
+               'models': {'Linear Regression (streaming SGD)': {'test_rmse': holdout['rmse'],
+                                                                'test_mae': holdout['mae'],
+                                                                'test_r2': holdout['r2']}}}
+    version = save_bundle(model, scaler, label_encoders, FEATURE_NAMES, metrics=metrics,
+                          data_hash=file_sha256(args.input), root=args.model_root, extra=extra)
+    print(f"✓ Model bundle saved to {args.model_root}/{version} ({args.model_root}/LATEST updated)")
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"  Peak RSS: {peak:,.1f} MB")
+
+
+if __name__ == '__main__':
+    main()